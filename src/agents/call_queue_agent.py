@@ -1,9 +1,9 @@
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 from pydantic_ai import Agent, RunContext
-from ..models.base import BaseResponse, AgentContext
-from ..services.database_service import DatabaseService
-from ..services.notification_service import NotificationService
+from models.base import BaseResponse, AgentContext
+from services.factory import ServiceFactory
+from utils.helpers import calculate_priority_scores
 
 class CallQueueAgent:
     def __init__(self, model: str = "openai:gpt-4"):
@@ -14,8 +14,10 @@ class CallQueueAgent:
             deps_type=Dict[str, Any],
             result_type=BaseResponse
         )
-        self.db_service = DatabaseService()
-        self.notification_service = NotificationService()
+        self.db_service = ServiceFactory.get_database_service()
+        self.notification_service = ServiceFactory.get_notification_service()
+        self.cadence_planner = ServiceFactory.get_cadence_planner()
+        self.live_queue = ServiceFactory.get_live_queue()
         self._setup_tools()
         
     def _setup_tools(self):
@@ -25,22 +27,15 @@ class CallQueueAgent:
             leads: List[Dict[str, Any]]
         ) -> List[Dict[str, Any]]:
             """Prioritize leads based on various factors"""
+            now = datetime.utcnow()
+            scores = calculate_priority_scores(
+                [(now - datetime.fromisoformat(lead['created_at'])).total_seconds() / 3600 for lead in leads],
+                [lead.get('attempt_count', 0) for lead in leads],
+                [lead.get('estimated_value') for lead in leads]
+            )
             prioritized = []
-            for lead in leads:
-                # Calculate priority score
-                age_hours = (datetime.utcnow() - datetime.fromisoformat(lead['created_at'])).total_seconds() / 3600
-                attempts = lead.get('attempt_count', 0)
-                
-                priority_score = (
-                    (24 - min(age_hours, 24)) * 2 +  # Newer leads get higher priority
-                    (3 - min(attempts, 3)) * 5       # Fewer attempts get higher priority
-                )
-                
-                # Add estimated value factor if available
-                if 'estimated_value' in lead:
-                    priority_score += min(lead['estimated_value'] / 10000, 5)
-                
-                lead['priority_score'] = priority_score
+            for lead, score in zip(leads, scores.tolist()):
+                lead['priority_score'] = score
                 prioritized.append(lead)
             
             return sorted(prioritized, key=lambda x: x['priority_score'], reverse=True)
@@ -51,17 +46,8 @@ class CallQueueAgent:
             lead_id: str,
             attempt_number: int
         ) -> Dict[str, Any]:
-            """Schedule the next call attempt"""
-            delays = {
-                1: timedelta(minutes=10),
-                2: timedelta(minutes=30),
-                3: timedelta(hours=1),
-                4: timedelta(hours=4),
-                5: timedelta(hours=24)
-            }
-            
-            delay = delays.get(attempt_number, timedelta(hours=24))
-            scheduled_time = datetime.utcnow() + delay
+            """Schedule the next call attempt within business hours"""
+            scheduled_time = self.cadence_planner.next_attempt(attempt_number)
             
             return {
                 'lead_id': lead_id,
@@ -194,6 +180,32 @@ class CallQueueAgent:
                 errors=[str(e)]
             )
 
+    async def schedule_follow_ups(self, leads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Schedule the next attempt for a batch of leads
+        
+        Due times are planned together on the business calendar and spread
+        across the capacity of the available agents.
+        """
+        if not leads:
+            return []
+        now = datetime.utcnow()
+        attempts = [lead.get('attempt_count', 0) + 1 for lead in leads]
+        last_attempts = [
+            datetime.fromisoformat(lead['last_attempt']) if lead.get('last_attempt') else now
+            for lead in leads
+        ]
+        agents = await self.db_service.get_available_agents()
+        due = self.cadence_planner.schedule_batch(attempts, last_attempts, agents=len(agents))
+        return [
+            {
+                'lead_id': lead['id'],
+                'attempt_number': attempt,
+                'scheduled_time': scheduled.isoformat(),
+                'status': 'scheduled'
+            }
+            for lead, attempt, scheduled in zip(leads, attempts, due.astype(datetime))
+        ]
+
     async def get_next_lead(self, agent_id: str) -> BaseResponse:
         """Get the next lead for an agent to call"""
         try:
@@ -229,3 +241,31 @@ class CallQueueAgent:
                 message=f"Error retrieving next lead: {str(e)}",
                 errors=[str(e)]
             )
+
+    async def get_queue_status(
+        self,
+        agent_id: Optional[str] = None,
+        context: Optional[AgentContext] = None
+    ) -> BaseResponse:
+        """Get queue depth, due and overdue counts for one agent or all agents
+        
+        Read from the live call queue's counters; the database aggregate is
+        only used until the queue has been loaded.
+        """
+        try:
+            if self.live_queue.is_ready:
+                metrics = self.live_queue.metrics(agent_id)
+            else:
+                metrics = await self.db_service.get_queue_metrics()
+            return BaseResponse(
+                success=True,
+                message="Queue status retrieved successfully",
+                data={'agent_id': agent_id, **(metrics or {})}
+            )
+            
+        except Exception as e:
+            return BaseResponse(
+                success=False,
+                message=f"Error retrieving queue status: {str(e)}",
+                errors=[str(e)]
+            )
@@ -1,8 +1,9 @@
 from typing import List, Dict, Any, Optional
 from pydantic_ai import Agent, RunContext
-from ..models.base import KnowledgeItem, AgentContext, BaseResponse
-from ..services.database_service import DatabaseService
-from ..utils.helpers import compute_embeddings
+from models.base import KnowledgeItem, AgentContext, BaseResponse
+from services.factory import ServiceFactory
+from utils.prompt_builder import PromptBuilder
+from config.settings import get_settings
 
 class KnowledgeManagementAgent:
     def __init__(self, model: str = "openai:gpt-4"):
@@ -12,7 +13,12 @@ class KnowledgeManagementAgent:
             deps_type=Dict[str, Any],
             result_type=BaseResponse
         )
-        self.db_service = DatabaseService()
+        self.db_service = ServiceFactory.get_database_service()
+        self.api_service = ServiceFactory.get_api_service()
+        self.rate_limiter = ServiceFactory.get_rate_limiter()
+        self.coalescer = ServiceFactory.get_request_coalescer()
+        self.model_name = model
+        self.prompt_token_budget = get_settings().PROMPT_TOKEN_BUDGET
         self._setup_tools()
 
     def _setup_tools(self):
@@ -24,7 +30,7 @@ class KnowledgeManagementAgent:
         ) -> List[KnowledgeItem]:
             """Search the knowledge base using semantic search"""
             # Generate query embedding
-            query_embedding = await compute_embeddings(query)
+            query_embedding = await self.api_service.get_embeddings(query)
             
             # Search vector database
             results = await self.db_service.similarity_search(
@@ -43,18 +49,18 @@ class KnowledgeManagementAgent:
         ) -> Dict[str, Any]:
             """Verify information against the knowledge base"""
             # Use RAG to verify the statement
-            verification_prompt = f"""
-            Given the following statement:
-            {statement}
-            
-            And the following context:
-            {[item.content for item in context]}
-            
-            Verify if the statement is accurate and provide:
-            1. Verification result (true/false)
-            2. Confidence score (0-1)
-            3. Supporting evidence or corrections
-            """
+            verification_prompt = (
+                PromptBuilder(self.prompt_token_budget, name="verification prompt")
+                .add_section(statement, title="Given the following statement")
+                .add_passages([item.content for item in context], title="And the following context")
+                .add_section(
+                    "Verify if the statement is accurate and provide:\n"
+                    "1. Verification result (true/false)\n"
+                    "2. Confidence score (0-1)\n"
+                    "3. Supporting evidence or corrections"
+                )
+                .build()
+            )
             
             result = await ctx.run(verification_prompt)
             return result.data
@@ -67,7 +73,7 @@ class KnowledgeManagementAgent:
             """Add or update an item in the knowledge base"""
             try:
                 # Generate embeddings for new content
-                embedding = await compute_embeddings(item.content)
+                embedding = await self.api_service.get_embeddings(item.content)
                 item.embedding = embedding
                 
                 # Store in vector database
@@ -88,25 +94,38 @@ class KnowledgeManagementAgent:
             # Search knowledge base
             relevant_items = await self.search_knowledge_base(query, max_results)
             
-            # Generate enhanced response using RAG
-            rag_prompt = f"""
-            Based on the following query: {query}
-            
-            And the retrieved knowledge:
-            {[item.content for item in relevant_items]}
-            
-            Provide a comprehensive response that:
-            1. Directly addresses the query
-            2. Incorporates relevant product/service information
-            3. Includes any necessary caveats or additional context
-            4. Suggests related information that might be helpful
-            """
-            
-            response = await self.agent.run(
-                rag_prompt,
-                deps={"context": context.dict()}
+            # Generate enhanced response using RAG; results arrive nearest
+            # first, and low-confidence items rank lower
+            rag_prompt = (
+                PromptBuilder(self.prompt_token_budget, name="RAG prompt")
+                .add_section(f"Based on the following query: {query}")
+                .add_passages(
+                    [item.content for item in relevant_items],
+                    scores=[item.confidence / (rank + 1) for rank, item in enumerate(relevant_items)],
+                    title="And the retrieved knowledge"
+                )
+                .add_section(
+                    "Provide a comprehensive response that:\n"
+                    "1. Directly addresses the query\n"
+                    "2. Incorporates relevant product/service information\n"
+                    "3. Includes any necessary caveats or additional context\n"
+                    "4. Suggests related information that might be helpful"
+                )
+                .build()
             )
             
+            async def run_rag():
+                await self.rate_limiter.acquire('openai')
+                return await self.agent.run(
+                    rag_prompt,
+                    deps={"context": context.dict()},
+                    model_settings={"temperature": 0}
+                )
+                
+            # Reps asking the same question at once share one model call;
+            # the tools never read deps, so the answer depends only on the prompt
+            response = await self.coalescer.completion(self.model_name, rag_prompt, 0, run_rag)
+            
             return BaseResponse(
                 success=True,
                 data={
@@ -1,13 +1,16 @@
 from typing import Dict, Any, List, Optional, cast, Set, ClassVar
 from datetime import datetime
 import logging
-from pydantic import BaseModel, Field, validator, root_validator
+from pydantic import BaseModel, Field, ValidationError, validator, root_validator
 from pydantic_ai import Agent, RunContext
 from models.base import BaseResponse, AgentContext
-from models.lead import LeadStatus, Lead, CallAttempt
+from models.lead import LeadStatus
+from models.lead_record import LeadRecord
 from services.interfaces.database import DatabaseServiceInterface
 from services.interfaces.notification import NotificationServiceInterface
 from services.factory import ServiceFactory
+from services.metrics_aggregator import MetricsAggregator
+from utils.business_calendar import BusinessCalendar
 from exceptions import LeadUpdateError
 
 class LeadStatusUpdate(BaseModel):
@@ -288,33 +291,29 @@ class LeadStatusUpdate(BaseModel):
             raise ValueError("Follow-up date must be in the future")
         return v
 
-    @validator('call_outcome', 'call_notes')
-    def validate_call_fields(cls, v: Optional[str], values: dict, field: str) -> Optional[str]:
-        """Validate call-related fields are provided together"""
-        call_fields = {'call_outcome', 'call_notes'}
-        other_field = next(f for f in call_fields if f != field)
-        
-        if v and not values.get(other_field):
-            raise ValueError("Both call outcome and notes must be provided together")
-        return v
-
 class LeadManagementAgent(Agent):
     """AI agent for managing sales leads through their lifecycle"""
     
     def __init__(
         self,
         db_service: Optional[DatabaseServiceInterface] = None,
-        notification_service: Optional[NotificationServiceInterface] = None
+        notification_service: Optional[NotificationServiceInterface] = None,
+        metrics_aggregator: Optional[MetricsAggregator] = None,
+        business_calendar: Optional[BusinessCalendar] = None
     ) -> None:
         """Initialize the LeadManagementAgent with required services
         
         Args:
             db_service: Optional database service implementation
             notification_service: Optional notification service implementation
+            metrics_aggregator: Optional aggregator fed with tracked metrics
+            business_calendar: Optional calendar for business-hours response times
         """
         super().__init__()
         self.db_service = db_service or ServiceFactory.get_database_service()
         self.notification_service = notification_service or ServiceFactory.get_notification_service()
+        self.metrics_aggregator = metrics_aggregator or ServiceFactory.get_metrics_aggregator()
+        self.business_calendar = business_calendar or ServiceFactory.get_business_calendar()
         self.logger = self._setup_logger()
         
     def _setup_logger(self) -> logging.Logger:
@@ -325,7 +324,7 @@ class LeadManagementAgent(Agent):
         
     async def _track_metrics(
         self,
-        lead: Lead,
+        lead: LeadRecord,
         status: LeadStatus,
         details: Dict[str, Any]
     ) -> None:
@@ -336,15 +335,24 @@ class LeadManagementAgent(Agent):
             status: New lead status
             details: Additional metric details
         """
-        await self.db_service.track_metric({
-            'timestamp': datetime.utcnow(),
+        now = datetime.utcnow()
+        metric = {
+            'timestamp': now,
             'lead_id': lead.id,
             'agent_id': lead.assigned_agent_id,
+            'source': lead.source,
             'old_status': lead.status,
             'new_status': status,
             'time_in_status': (datetime.utcnow() - lead.updated_at).days,
             **details
-        })
+        }
+        if lead.status == LeadStatus.NEW and status != LeadStatus.NEW and lead.created_at:
+            # First touch: lead response time in business hours
+            metric.setdefault('response_time', self.business_calendar.working_hours(lead.created_at, now))
+        await self.db_service.track_metric(metric)
+        
+        # Keep the in-process aggregates in step with the metrics table
+        self.metrics_aggregator.record(metric)
 
     async def update_lead_status(
         self,
@@ -372,7 +380,7 @@ class LeadManagementAgent(Agent):
             if not lead_data:
                 raise LeadUpdateError(f"Lead {lead_id} not found")
             
-            current_lead = Lead(**lead_data)
+            current_lead = LeadRecord.from_dict(lead_data)
             
             # Validate status update with current state
             update_data = {**status_update, 'current_status': current_lead.status}
@@ -397,7 +405,15 @@ class LeadManagementAgent(Agent):
                         notes=validated_update.call_notes,
                         next_attempt=validated_update.follow_up_date
                     )
-                    await self.db_service.update_lead(lead_id, current_lead.dict())
+                    await self.db_service.record_call_attempt(
+                        lead_id,
+                        current_lead.to_dict(),
+                        current_lead.call_attempts[-1].to_dict()
+                    )
+                
+                # Every transition feeds the funnel; closing handlers add deal details
+                if validated_update.status not in (LeadStatus.CLOSED_WON, LeadStatus.CLOSED_LOST):
+                    await self._track_metrics(current_lead, validated_update.status, {})
                 
                 # Handle status-specific actions
                 match validated_update.status:
@@ -410,24 +426,28 @@ class LeadManagementAgent(Agent):
                             f"New qualified lead: {current_lead.first_name} {current_lead.last_name}"
                         )
 
-            return BaseResponse.success(
+            return BaseResponse(
+                success=True,
                 message=f"Lead {lead_id} status updated to {validated_update.status.value}",
                 data=update_result
             )
             
         except ValidationError as e:
             self.logger.warning(f"Validation failed: {e.errors()}")
-            return BaseResponse.validation_error(e)
+            return BaseResponse(
+                success=False,
+                message="Invalid status update",
+                errors=[error['msg'] for error in e.errors()]
+            )
         except LeadUpdateError as e:
             self.logger.error(f"Business rule violation: {e}")
-            return BaseResponse.business_error(e)
+            return BaseResponse(success=False, message=str(e), errors=[str(e)])
         except Exception as e:
             self.logger.exception("Critical update failure")
-            return BaseResponse.system_error(
-                LeadUpdateError("Lead update failed", original_error=e)
-            )
+            error = LeadUpdateError("Lead update failed", original_error=e)
+            return BaseResponse(success=False, message=str(error), errors=[str(error)])
 
-    async def _handle_won_status(self, lead: Lead, update: LeadStatusUpdate) -> None:
+    async def _handle_won_status(self, lead: LeadRecord, update: LeadStatusUpdate) -> None:
         """Handle actions required when a lead is won
         
         Args:
@@ -455,15 +475,17 @@ class LeadManagementAgent(Agent):
         })
 
         # Create sale record with enhanced tracking
-        await self.db_service.create_sale({
+        sale = {
             'lead_id': lead.id,
+            'agent_id': lead.assigned_agent_id,
             'amount': update.sale_amount,
             'products': update.products,
             'close_date': datetime.utcnow(),
             'time_in_pipeline': (datetime.utcnow() - lead.created_at).days,
             'qualification_status': lead.is_qualified(),
             'total_calls': len(lead.call_attempts)
-        })
+        }
+        await self.db_service.create_sale(sale)
         
         # Send notifications with enriched data
         await self.notification_service.send_slack_message(
@@ -476,7 +498,7 @@ class LeadManagementAgent(Agent):
             )
         )
 
-    async def _handle_lost_status(self, lead: Lead, update: LeadStatusUpdate) -> None:
+    async def _handle_lost_status(self, lead: LeadRecord, update: LeadStatusUpdate) -> None:
         """Handle actions required when a lead is lost
         
         Args:
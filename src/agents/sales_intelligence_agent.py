@@ -1,20 +1,38 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
+import numpy as np
 from pydantic_ai import Agent, RunContext
-from ..models.base import BaseResponse, AgentContext
-from ..services.database_service import DatabaseService
-from ..services.analytics_service import AnalyticsService
+from models.base import BaseResponse, AgentContext
+from services.insights_cache import InsightsCache
+from services.factory import ServiceFactory
+from services.conversation_analysis import IncrementalConversationAnalyzer
+from services.forecasting import PipelineForecast, forecast_pipeline, predict_close_probabilities
+from services.rate_limiter import Priority
+from utils.prompt_builder import PromptBuilder, metrics_table
+from config.settings import get_settings
 
 class SalesIntelligenceAgent:
-    def __init__(self, model: str = "openai:gpt-4"):
+    def __init__(
+        self,
+        model: str = "openai:gpt-4",
+        insights_cache: Optional[InsightsCache] = None,
+        conversation_analyzer: Optional[IncrementalConversationAnalyzer] = None
+    ):
         self.agent = Agent(
             model,
             system_prompt="You are a sales intelligence agent focused on analyzing patterns, providing insights, and optimizing sales strategies.",
             deps_type=Dict[str, Any],
             result_type=BaseResponse
         )
-        self.db_service = DatabaseService()
-        self.analytics_service = AnalyticsService()
+        self.db_service = ServiceFactory.get_database_service()
+        self.analytics_service = ServiceFactory.get_analytics_service()
+        self.rate_limiter = ServiceFactory.get_rate_limiter()
+        self.coalescer = ServiceFactory.get_request_coalescer()
+        self.model_name = model
+        self.prompt_token_budget = get_settings().PROMPT_TOKEN_BUDGET
+        self.insights_cache = insights_cache or ServiceFactory.get_insights_cache()
+        self.conversation_analyzer = conversation_analyzer or ServiceFactory.get_conversation_analyzer()
+        self.similar_deals_index = ServiceFactory.get_similar_deals_index()
         self._setup_tools()
 
     def _setup_tools(self):
@@ -45,15 +63,21 @@ class SalesIntelligenceAgent:
             lead_data: Dict[str, Any]
         ) -> float:
             """Predict probability of closing a deal"""
-            key_factors = {
-                'budget_match': lead_data.get('budget_sufficient', False) * 0.3,
-                'decision_maker': lead_data.get('is_decision_maker', False) * 0.2,
-                'timeline_match': lead_data.get('timeline_match', False) * 0.15,
-                'engagement_score': min(lead_data.get('engagement_score', 0) / 100, 1) * 0.2,
-                'objections_handled': min(lead_data.get('resolved_objections', 0) / lead_data.get('total_objections', 1), 1) * 0.15
+            return float(self.predict_close_probabilities([lead_data])[0])
+
+        @self.agent.tool
+        async def forecast_open_pipeline(
+            ctx: RunContext[Dict[str, Any]],
+            leads: List[Dict[str, Any]]
+        ) -> Dict[str, Any]:
+            """Forecast close probabilities and expected revenue for many leads"""
+            forecast = self.forecast_pipeline(leads)
+            return {
+                'probabilities': forecast.probabilities.tolist(),
+                'expected_revenue': forecast.total_expected_revenue,
+                'revenue_by_agent': forecast.revenue_by_agent,
+                'revenue_by_stage': forecast.revenue_by_stage
             }
-            
-            return sum(key_factors.values())
 
         @self.agent.tool
         async def generate_sales_insights(
@@ -61,22 +85,59 @@ class SalesIntelligenceAgent:
             timeframe: str
         ) -> Dict[str, Any]:
             """Generate sales insights for a given timeframe"""
-            # Get sales data
-            sales_data = await self.analytics_service.get_sales_metrics(timeframe)
-            
-            analysis_prompt = f"""
-            Based on these sales metrics:
-            {sales_data}
+            return await self.generate_sales_insights(timeframe)
+
+    def predict_close_probabilities(self, leads: List[Dict[str, Any]]) -> np.ndarray:
+        """Score a batch of leads; the result is aligned to the input order"""
+        return predict_close_probabilities(leads)
+
+    def forecast_pipeline(self, leads: List[Dict[str, Any]]) -> PipelineForecast:
+        """Score all leads in one vectorized pass with per-agent and per-stage rollups"""
+        return forecast_pipeline(leads)
+
+    async def _analyze_transcript_chunk(self, chunk: str) -> Dict[str, Any]:
+        """Run the LLM analysis for one transcript chunk"""
+        analysis_prompt = f"""
+        Analyze this excerpt of a sales conversation:
+        {chunk}
+        
+        Return JSON with these list fields:
+        objections, pain_points, buying_signals, improvement_areas, follow_up_opportunities
+        """
+        
+        async def run_analysis():
+            await self.rate_limiter.acquire('openai')
+            return await self.agent.run(analysis_prompt, model_settings={"temperature": 0})
             
-            Provide insights on:
-            1. Trending products/services
-            2. Successful sales strategies
-            3. Common objections and effective responses
-            4. Opportunities for improvement
-            """
+        # The same chunk can be in flight for several leads at once
+        analysis = await self.coalescer.completion(self.model_name, analysis_prompt, 0, run_analysis)
+        return analysis.data.data or {}
+
+    async def generate_sales_insights(self, timeframe: str) -> Dict[str, Any]:
+        """Generate sales insights, reusing cached output while metrics are unchanged"""
+        # Get sales data
+        sales_data = await self.db_service.get_sales_metrics(timeframe)
+        
+        async def run_analysis() -> Dict[str, Any]:
+            analysis_prompt = (
+                PromptBuilder(self.prompt_token_budget, name="sales insights prompt")
+                .add_passages(metrics_table(sales_data).splitlines(), title="Based on these sales metrics")
+                .add_section(
+                    "Provide insights on:\n"
+                    "1. Trending products/services\n"
+                    "2. Successful sales strategies\n"
+                    "3. Common objections and effective responses\n"
+                    "4. Opportunities for improvement"
+                )
+                .build()
+            )
             
-            insights = await ctx.run(analysis_prompt)
+            # Insights are batch work: they yield to live-call traffic
+            await self.rate_limiter.acquire('openai', priority=Priority.BATCH)
+            insights = await self.agent.run(analysis_prompt)
             return insights.data
+            
+        return await self.insights_cache.get(timeframe, sales_data, run_analysis)
 
     async def get_lead_insights(
         self,
@@ -89,19 +150,39 @@ class SalesIntelligenceAgent:
             lead_data = await self.db_service.get_lead(lead_id)
             conversations = await self.db_service.get_lead_conversations(lead_id)
             
-            # Analyze conversations
-            conversation_insights = await self.analyze_conversation({
-                'transcript': conversations[-1]['transcript'] if conversations else ""
-            })
+            # Screen locally first; only ambiguous transcripts go to the LLM,
+            # reusing analyses of unchanged transcript chunks
+            transcript = conversations[-1]['transcript'] if conversations else ""
+            screening = await self.analytics_service.analyze_conversation({'transcript': transcript})
+            if screening['needs_deep_analysis']:
+                conversation_insights = await self.conversation_analyzer.analyze(
+                    lead_id,
+                    transcript,
+                    self._analyze_transcript_chunk
+                )
+            else:
+                conversation_insights = {
+                    'objections': list(screening['objections_handled']),
+                    'buying_signals': list(screening['buying_signals']),
+                    'follow_up_opportunities': screening['next_steps'],
+                    'sentiment_score': screening['sentiment_score'],
+                    'key_topics': screening['key_topics']
+                }
             
             # Predict close probability
-            close_probability = await self.predict_close_probability(lead_data)
+            close_probability = float(self.predict_close_probabilities([lead_data])[0])
             
-            # Get similar closed deals
-            similar_deals = await self.db_service.get_similar_deals(
-                lead_data.get('product_interest'),
-                lead_data.get('budget_range')
-            )
+            # Get similar closed deals, from the in-memory index once it is built
+            if self.similar_deals_index.is_ready:
+                similar_deals = self.similar_deals_index.similar(
+                    lead_data.get('product_interest'),
+                    lead_data.get('budget_range')
+                )
+            else:
+                similar_deals = await self.db_service.get_similar_deals(
+                    lead_data.get('product_interest'),
+                    lead_data.get('budget_range')
+                )
             
             return BaseResponse(
                 success=True,
@@ -124,7 +205,7 @@ class SalesIntelligenceAgent:
     async def get_sales_performance(
         self,
         timeframe: str = "7d",
-        context: AgentContext
+        context: Optional[AgentContext] = None
     ) -> BaseResponse:
         """Get sales performance analysis"""
         try:
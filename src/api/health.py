@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Request, Response
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live")
+async def liveness():
+    """The process is up and serving requests"""
+    return {'status': 'ok'}
+
+
+@router.get("/ready")
+async def readiness(request: Request, response: Response):
+    """Ready once warmup finished; includes per-step warmup timings"""
+    status = request.app.state.lifecycle.status()
+    if not status['ready']:
+        response.status_code = 503
+    return status
+
+
+@router.get("/coalescing")
+async def coalescing_stats():
+    """How many LLM calls were shared with an identical in-flight request"""
+    from services.factory import ServiceFactory
+    return ServiceFactory.get_request_coalescer().stats()
+
+
+@router.get("/insights-cache")
+async def insights_cache_stats():
+    """Sales insights cache hits, misses and refresh latency"""
+    from services.factory import ServiceFactory
+    return ServiceFactory.get_insights_cache().stats()
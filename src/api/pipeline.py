@@ -0,0 +1,58 @@
+from typing import List, Optional
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query
+from models.lead import LeadSource, LeadStatus
+from services.factory import ServiceFactory
+from services.lead_book import GROUP_COLUMNS
+
+router = APIRouter(prefix="/pipeline", tags=["pipeline"])
+
+
+@router.get("/leads")
+async def query_leads(
+    group_by: str = "agent",
+    status: Optional[List[LeadStatus]] = Query(default=None),
+    source: Optional[List[LeadSource]] = Query(default=None),
+    agent: Optional[List[str]] = Query(default=None),
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+    not_contacted_since: Optional[datetime] = None,
+    contacted_since: Optional[datetime] = None,
+    created_since: Optional[datetime] = None,
+    include_ids: int = Query(default=0, ge=0, le=1000)
+):
+    """Filter and aggregate leads from the in-process lead book"""
+    if group_by not in GROUP_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Cannot group by {group_by}")
+    return ServiceFactory.get_pipeline_view().query(
+        group_by=group_by,
+        include_ids=include_ids,
+        statuses=status,
+        sources=source,
+        agents=agent,
+        min_value=min_value,
+        max_value=max_value,
+        not_contacted_since=not_contacted_since,
+        contacted_since=contacted_since,
+        created_since=created_since
+    )
+
+
+@router.get("/stale")
+async def stale_opportunities(
+    min_value: float = 50_000,
+    idle_days: int = Query(default=7, ge=0),
+    agent: Optional[List[str]] = Query(default=None)
+):
+    """Open high-value leads nobody has contacted recently, by agent"""
+    return ServiceFactory.get_pipeline_view().stale_opportunities(
+        min_value=min_value,
+        idle_days=idle_days,
+        agents=agent
+    )
+
+
+@router.get("/stages")
+async def stage_summary(agent: Optional[List[str]] = Query(default=None)):
+    """Lead count and value per pipeline stage"""
+    return ServiceFactory.get_pipeline_view().stage_summary(agents=agent)
@@ -0,0 +1,16 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from services.factory import ServiceFactory
+
+router = APIRouter(prefix="/queue", tags=["queue"])
+
+
+@router.get("/status")
+async def get_queue_status(agent_id: Optional[str] = None):
+    """Queue depth, due and overdue counts for one agent or the whole queue"""
+    from agents.call_queue_agent import CallQueueAgent
+
+    response = await ServiceFactory.get_agent(CallQueueAgent).get_queue_status(agent_id)
+    if not response.success:
+        raise HTTPException(status_code=503, detail=response.message)
+    return response.data
@@ -0,0 +1,45 @@
+from typing import Optional
+import json
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from services.factory import ServiceFactory
+
+router = APIRouter(prefix="/realtime", tags=["realtime"])
+
+
+@router.websocket("/ws")
+async def realtime_updates(websocket: WebSocket, agent_id: Optional[str] = None, topics: str = ""):
+    """Push batched queue and pipeline diffs to a connected client
+
+    Connect with ``agent_id`` for that agent's queue and/or ``topics``
+    (comma-separated, e.g. ``pipeline``). Clients may send
+    ``{"subscribe": [...]}`` or ``{"unsubscribe": [...]}``; anything else
+    is treated as a keep-alive.
+    """
+    gateway = ServiceFactory.get_realtime_gateway()
+    names = [name for name in topics.split(",") if name]
+    if agent_id:
+        names.append(f"queue:{agent_id}")
+    await websocket.accept()
+    try:
+        connection = gateway.connect(websocket, names)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                request = json.loads(message)
+            except ValueError:
+                continue
+            if not isinstance(request, dict):
+                continue
+            try:
+                gateway.subscribe(connection, request.get('subscribe') or [])
+            except ValueError as e:
+                await websocket.send_text(json.dumps({'error': str(e)}))
+            gateway.unsubscribe(connection, request.get('unsubscribe') or [])
+    except WebSocketDisconnect:
+        pass
+    finally:
+        gateway.disconnect(connection)
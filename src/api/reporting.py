@@ -0,0 +1,61 @@
+from typing import Optional
+import asyncio
+from fastapi import APIRouter, Header, HTTPException, Response, WebSocket, WebSocketDisconnect
+from services.factory import ServiceFactory
+
+router = APIRouter(prefix="/reporting", tags=["reporting"])
+
+SNAPSHOTS = {
+    'performance': 'sales_performance',
+    'pipeline': 'pipeline_metrics'
+}
+
+
+@router.get("/{view}")
+async def get_report(
+    view: str,
+    response: Response,
+    timeframe: str = "7d",
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """Serve a materialized reporting snapshot with ETag revalidation"""
+    if view not in SNAPSHOTS:
+        raise HTTPException(status_code=404, detail=f"Unknown report: {view}")
+
+    snapshot = await ServiceFactory.get_snapshot_service().get(SNAPSHOTS[view], timeframe)
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if if_none_match and snapshot.etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return {
+        'timeframe': timeframe,
+        'generated_at': snapshot.generated_at.isoformat(),
+        'data': snapshot.data
+    }
+
+
+@router.websocket("/ws")
+async def report_updates(websocket: WebSocket):
+    """Push snapshot deltas to a connected dashboard"""
+    snapshots = ServiceFactory.get_snapshot_service()
+    await websocket.accept()
+    queue = snapshots.subscribe()
+    receiver = asyncio.create_task(websocket.receive_text())
+    sender = asyncio.create_task(queue.get())
+    try:
+        while True:
+            done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if sender in done:
+                await websocket.send_json(sender.result())
+                sender = asyncio.create_task(queue.get())
+            if receiver in done:
+                # Clients only send keep-alives; a closed socket raises here
+                receiver.result()
+                receiver = asyncio.create_task(websocket.receive_text())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        sender.cancel()
+        snapshots.unsubscribe(queue)
@@ -0,0 +1,148 @@
+"""Shared HTTP pool benchmark against a local mock upstream
+
+Starts a minimal keep-alive HTTP/1.1 server on localhost that answers after
+a fixed latency and fails a configurable share of requests with 503, then
+compares a fresh httpx client per request (the old APIService pattern) with
+the shared ResilientHTTPClient pool.
+
+Note that httpcore's pool bookkeeping grows with in-flight requests times
+open connections, so on small machines throughput peaks at modest
+concurrency; sweep --concurrency to find the knee for a deployment.
+
+Usage:
+    python src/benchmarks/http_pool_benchmark.py [--requests 2000] [--concurrency 20]
+"""
+from typing import List
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from exceptions import UpstreamError  # noqa: E402
+from services.http_client import ResilientHTTPClient, RetryPolicy  # noqa: E402
+
+BODY = b'{"data": [{"embedding": [0.1, 0.2, 0.3]}]}'
+
+
+class MockUpstream:
+    """Keep-alive HTTP server with fixed latency and random 503s"""
+
+    def __init__(self, latency: float, error_rate: float):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.connections = 0
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, '127.0.0.1', 0, backlog=4096)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b'\r\n\r\n')
+                length = 0
+                for line in head.split(b'\r\n'):
+                    if line.lower().startswith(b'content-length:'):
+                        length = int(line.split(b':')[1])
+                if length:
+                    await reader.readexactly(length)
+                await asyncio.sleep(self.latency)
+                if random.random() < self.error_rate:
+                    status, body = b'503 Service Unavailable', b'{}'
+                    extra = b'Retry-After: 0\r\n'
+                else:
+                    status, body, extra = b'200 OK', BODY, b''
+                writer.write(
+                    b'HTTP/1.1 ' + status + b'\r\nContent-Type: application/json\r\n' + extra
+                    + b'Content-Length: ' + str(len(body)).encode() + b'\r\n\r\n' + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def run_load(call, total: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await call()
+            except (UpstreamError, httpx.HTTPError):
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'rps': total / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        'errors': errors
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    upstream = MockUpstream(args.latency, args.error_rate)
+    port = await upstream.start()
+    url = f"http://127.0.0.1:{port}/v1/embeddings"
+    payload = {'input': 'benchmark', 'model': 'text-embedding-ada-002'}
+
+    async def per_request_client():
+        async with httpx.AsyncClient() as client:
+            response = await client.post(url, json=payload)
+            response.raise_for_status()
+
+    pool = ResilientHTTPClient(
+        max_connections=args.concurrency,
+        max_keepalive_connections=args.concurrency,
+        retry_policy=RetryPolicy(max_retries=3, base_delay=0.01),
+        failure_threshold=args.requests
+    )
+
+    async def pooled():
+        await pool.post('embeddings', url, json=payload)
+
+    for name, call in (('per-request client', per_request_client), ('shared pool', pooled)):
+        upstream.connections = 0
+        result = await run_load(call, args.requests, args.concurrency)
+        print(
+            f"{name:20} {result['rps']:8.0f} req/s  p50 {result['p50_ms']:7.2f}ms  "
+            f"p99 {result['p99_ms']:7.2f}ms  errors {result['errors']:5}  "
+            f"connections {upstream.connections}"
+        )
+
+    await pool.aclose()
+    await upstream.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.005, help='Upstream latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.02, help='Share of 503 responses')
+    # Keep per-retry warnings out of the results
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,90 @@
+"""Lead book filter and aggregate latency benchmark
+
+Loads N synthetic leads into a LeadBook and times the interactive
+pipeline queries (bitmap filter plus grouped aggregate), single-lead
+event updates, and the same filter done as a row scan over dicts.
+
+Usage:
+    python src/benchmarks/lead_book_benchmark.py [--leads 1000000]
+"""
+from typing import Any, Callable, Dict, List
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.lead_record import SOURCES, STATUSES  # noqa: E402
+from services.lead_book import LeadBook  # noqa: E402
+from services.pipeline_view import OPEN_STATUSES, PipelineView  # noqa: E402
+
+NOW = datetime(2025, 6, 1)
+
+
+def build_rows(count: int, agents: int = 200, seed: int = 5) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    statuses = rng.integers(0, len(STATUSES), count).tolist()
+    sources = rng.integers(0, len(SOURCES), count).tolist()
+    owners = rng.integers(0, agents, count).tolist()
+    values = rng.uniform(1000, 120000, count).round(2).tolist()
+    idle_hours = rng.integers(0, 24 * 60, count).tolist()
+    return [
+        {
+            'id': f"lead-{index:08d}",
+            'status': STATUSES[statuses[index]].value,
+            'source': SOURCES[sources[index]].value,
+            'assigned_agent_id': f"agent-{owners[index]}",
+            'estimated_value': values[index],
+            'last_contact': NOW - timedelta(hours=idle_hours[index])
+        }
+        for index in range(count)
+    ]
+
+
+def best_of(run: Callable[[], Any], repeat: int = 7) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main(args: argparse.Namespace) -> None:
+    rows = build_rows(args.leads)
+    book = LeadBook(capacity=args.leads)
+    started = time.perf_counter()
+    book.load(rows)
+    print(f"{args.leads} leads loaded in {time.perf_counter() - started:.2f}s")
+
+    view = PipelineView(book)
+    cutoff = NOW - timedelta(days=7)
+    open_values = {status.value for status in OPEN_STATUSES}
+    queries = {
+        'stale opportunities by agent': lambda: view.stale_opportunities(now=NOW),
+        'stage summary': view.stage_summary,
+        'referral leads > $100k': lambda: view.query(sources='referral', min_value=100_000),
+        'one agent, open leads': lambda: view.open_lead_ids('agent-7'),
+        'row scan over dicts (stale)': lambda: [
+            row for row in rows
+            if row['status'] in open_values and row['estimated_value'] >= 50_000 and row['last_contact'] < cutoff
+        ]
+    }
+    for name, query in queries.items():
+        print(f"{name:30} {best_of(query, 3 if 'scan' in name else 7):8.2f} ms")
+
+    events = [{'lead_id': row['id'], 'new_status': 'contacted', 'agent_id': 'agent-1'} for row in rows[:10000]]
+    started = time.perf_counter()
+    for event in events:
+        book.apply_event(event)
+    print(f"{'apply_event':30} {(time.perf_counter() - started) / len(events) * 1e6:8.2f} us/event")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--leads', type=int, default=1_000_000)
+    main(parser.parse_args())
@@ -0,0 +1,96 @@
+"""Lead vs LeadRecord memory and construction benchmark
+
+Builds N leads from database-shaped dicts (ISO timestamps, string enums,
+a few with call attempts and metadata) as pydantic Lead models and as
+slotted LeadRecords, and reports construction time, retained memory and
+the cost of converting records back to Lead at the API boundary.
+
+Usage:
+    python src/benchmarks/lead_record_benchmark.py [--leads 100000]
+"""
+from typing import Any, Callable, Dict, List
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.lead import Lead, LeadSource, LeadStatus  # noqa: E402
+from models.lead_record import LeadRecord  # noqa: E402
+
+
+def build_rows(count: int, seed: int = 3) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    statuses, sources = list(LeadStatus), list(LeadSource)
+    rows = []
+    for index in range(count):
+        created = start + timedelta(minutes=rng.randrange(0, 60 * 24 * 90))
+        row = {
+            'id': f"lead-{index:08d}",
+            'created_at': created.isoformat(),
+            'updated_at': (created + timedelta(hours=rng.randrange(0, 200))).isoformat(),
+            'first_name': rng.choice(["Ada", "Grace", "Alan", "Edsger", "Barbara"]),
+            'last_name': f"Example{index % 5000}",
+            'email': f"lead{index}@example.com",
+            'phone': f"+1212555{index % 10000:04d}",
+            'company': f"Company {index % 800}",
+            'status': rng.choice(statuses).value,
+            'source': rng.choice(sources).value,
+            'interest_level': rng.randint(1, 5),
+            'estimated_value': rng.choice([None, float(rng.randrange(1000, 90000))]),
+            'assigned_agent_id': f"agent-{index % 40}",
+            'budget_confirmed': rng.random() < 0.4,
+            'call_attempts': [],
+            'metadata': {}
+        }
+        if index % 10 == 0:
+            row['call_attempts'] = [{'timestamp': row['updated_at'], 'outcome': 'no_answer', 'notes': None}]
+            row['metadata'] = {'campaign': 'spring'}
+        rows.append(row)
+    return rows
+
+
+def measure(build: Callable[[], List[Any]]) -> Dict[str, float]:
+    """Time a build, then measure retained memory in a separate traced build"""
+    gc.collect()
+    started = time.perf_counter()
+    items = build()
+    elapsed = time.perf_counter() - started
+    del items
+    gc.collect()
+    # tracemalloc slows allocation-heavy code, so it is not on while timing
+    tracemalloc.start()
+    items = build()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return {'seconds': elapsed, 'megabytes': retained / 1e6}
+
+
+def main(args: argparse.Namespace) -> None:
+    rows = build_rows(args.leads)
+    print(f"{args.leads} leads")
+    results = {
+        'Lead(**row)': measure(lambda: [Lead(**row) for row in rows]),
+        'LeadRecord.from_dict': measure(lambda: [LeadRecord.from_dict(row) for row in rows])
+    }
+    for name, result in results.items():
+        print(f"{name:22} build {result['seconds']:6.2f}s  retained {result['megabytes']:7.1f} MB")
+
+    records = [LeadRecord.from_dict(row) for row in rows]
+    started = time.perf_counter()
+    for record in records:
+        record.to_lead()
+    print(f"{'LeadRecord.to_lead':22} build {time.perf_counter() - started:6.2f}s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--leads', type=int, default=100_000)
+    main(parser.parse_args())
@@ -0,0 +1,192 @@
+"""Realtime gateway idle-connection load test
+
+Holds N idle WebSocket connections on the /realtime/ws endpoint, one
+agent queue topic each (plus the pipeline topic for every tenth), then
+churns the live call queue and reports memory per connection, flush
+cost and frames delivered. By default connections are driven in-process
+through the ASGI app, so no server or client library is needed; with
+--url they are opened against a running server using aiohttp.
+
+Usage:
+    python src/benchmarks/realtime_gateway_benchmark.py [--connections 5000] [--url ws://host:8000/api/v1/realtime/ws]
+"""
+from typing import Any, Dict, List
+import argparse
+import asyncio
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI  # noqa: E402
+from api import realtime  # noqa: E402
+from services.factory import ServiceFactory  # noqa: E402
+from services.lead_book import LeadBook  # noqa: E402
+from services.live_queue import LiveCallQueue  # noqa: E402
+from services.pipeline_view import PipelineView  # noqa: E402
+from services.realtime_gateway import RealtimeGateway  # noqa: E402
+
+AGENTS = 500
+
+
+class IdleClient:
+    """ASGI side of one WebSocket connection that never sends anything"""
+
+    def __init__(self, app: FastAPI, query: str):
+        self.frames = 0
+        self.accepted = asyncio.Event()
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._inbox.put_nowait({'type': 'websocket.connect'})
+        scope = {
+            'type': 'websocket', 'asgi': {'version': '3.0'}, 'scheme': 'ws', 'http_version': '1.1',
+            'path': '/realtime/ws', 'raw_path': b'/realtime/ws', 'root_path': '',
+            'query_string': query.encode(), 'headers': [], 'subprotocols': [],
+            'client': ('127.0.0.1', 50000), 'server': ('127.0.0.1', 8000)
+        }
+        self.task = asyncio.create_task(app(scope, self._inbox.get, self._send))
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        if message['type'] == 'websocket.accept':
+            self.accepted.set()
+        elif message['type'] == 'websocket.send':
+            self.frames += 1
+
+    async def close(self) -> None:
+        self._inbox.put_nowait({'type': 'websocket.disconnect', 'code': 1000})
+        await self.task
+
+
+def setup_gateway(window: float) -> None:
+    # Built here rather than from settings, so no environment is needed
+    ServiceFactory.reset()
+    queue, gateway, book = LiveCallQueue(), RealtimeGateway(batch_window=window), LeadBook()
+    for service in (queue, gateway, book):
+        ServiceFactory.set_service_implementation(type(service), service)
+    view = PipelineView(book)
+    gateway.register('queue', queue.agent_state)
+    gateway.register('pipeline', lambda key: view.stage_summary()['groups'])
+    queue.add_listener(lambda agent_id: gateway.mark_dirty(f"queue:{agent_id}"))
+
+    start = datetime(2025, 3, 3, 9)
+    rows = [
+        {'id': f"lead-{i}", 'status': 'contacted', 'source': 'website', 'estimated_value': 1000.0 + i,
+         'assigned_agent_id': f"agent-{i % AGENTS}", 'next_attempt': start + timedelta(minutes=i % 600)}
+        for i in range(100_000)
+    ]
+    book.load(rows)
+    queue.load(rows)
+
+
+def query_for(index: int) -> str:
+    query = f"agent_id=agent-{index % AGENTS}"
+    return query + "&topics=pipeline" if index % 10 == 0 else query
+
+
+async def churn(seconds: float, updates_per_second: int) -> int:
+    queue = ServiceFactory.get_live_queue()
+    gateway = ServiceFactory.get_realtime_gateway()
+    rng = random.Random(9)
+    start, sent = datetime(2025, 3, 3, 9), 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(updates_per_second // 20):
+            queue.upsert({
+                'id': f"lead-{rng.randrange(100_000)}",
+                'next_attempt': start + timedelta(minutes=rng.randrange(0, 600))
+            })
+            sent += 1
+        gateway.mark_dirty('pipeline')
+        await asyncio.sleep(0.05)
+    return sent
+
+
+async def run_in_process(args: argparse.Namespace) -> None:
+    setup_gateway(args.window)
+    app = FastAPI()
+    app.include_router(realtime.router)
+    gateway = ServiceFactory.get_realtime_gateway()
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+    clients: List[IdleClient] = []
+    for index in range(args.connections):
+        clients.append(IdleClient(app, query_for(index)))
+        if index % 500 == 499:
+            await asyncio.sleep(0)
+    await asyncio.gather(*(client.accepted.wait() for client in clients))
+    await asyncio.sleep(args.window * 3)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{len(gateway)} connections open in {time.perf_counter() - started:.2f}s, "
+          f"{(after - before) / len(clients) / 1024:.1f} KB each")
+
+    flushes: List[float] = []
+    flush = gateway.flush
+
+    def timed_flush() -> int:
+        flush_started = time.perf_counter()
+        count = flush()
+        flushes.append(time.perf_counter() - flush_started)
+        return count
+
+    gateway.flush = timed_flush
+    frames_before = sum(client.frames for client in clients)
+    updates = await churn(args.seconds, args.updates)
+    await asyncio.sleep(args.window * 3)
+    frames = sum(client.frames for client in clients) - frames_before
+    flushes.sort()
+    print(f"{updates} queue updates over {args.seconds:.0f}s -> {frames} frames "
+          f"({frames / max(updates, 1):.2f} per update)")
+    if flushes:
+        print(f"flush p50 {flushes[len(flushes) // 2] * 1000:.2f} ms, max {flushes[-1] * 1000:.2f} ms "
+              f"over {len(flushes)} flushes")
+    await asyncio.gather(*(client.close() for client in clients))
+    print(f"{len(gateway)} connections after close")
+
+
+async def run_against_server(args: argparse.Namespace) -> None:
+    # Imported here: only the remote mode needs a WebSocket client
+    import aiohttp
+
+    frames = 0
+
+    async def hold(session: aiohttp.ClientSession, index: int, ready: asyncio.Event) -> None:
+        nonlocal frames
+        async with session.ws_connect(f"{args.url}?{query_for(index)}", heartbeat=30) as socket:
+            ready.set()
+            async for _ in socket:
+                frames += 1
+
+    started = time.perf_counter()
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        ready = [asyncio.Event() for _ in range(args.connections)]
+        tasks = [asyncio.create_task(hold(session, index, event)) for index, event in enumerate(ready)]
+        await asyncio.gather(*(event.wait() for event in ready))
+        print(f"{args.connections} connections open in {time.perf_counter() - started:.2f}s")
+        await asyncio.sleep(args.seconds)
+        print(f"{frames} frames received in {args.seconds:.0f}s")
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main(args: argparse.Namespace) -> None:
+    asyncio.run(run_against_server(args) if args.url else run_in_process(args))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connections', type=int, default=5000)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--updates', type=int, default=2000, help="queue updates per second")
+    parser.add_argument('--window', type=float, default=0.25, help="gateway batch window in seconds")
+    parser.add_argument('--url', help="ws:// URL of a running server's /realtime/ws endpoint")
+    main(parser.parse_args())
@@ -0,0 +1,127 @@
+"""Import-time and cold-start benchmark for the workflows
+
+Each measurement runs in a fresh interpreter so module caches from earlier
+runs do not hide import cost. Results are compared against a saved baseline
+when one exists; a run fails when any measurement regresses by more than the
+allowed tolerance.
+
+Usage:
+    python src/benchmarks/startup_benchmark.py [--runs 5] [--update-baseline]
+"""
+from typing import Dict, List
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(SRC_DIR)
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'startup_baseline.json')
+
+# name -> statement timed in a fresh interpreter
+SCENARIOS: Dict[str, str] = {
+    'import_factory': 'import services.factory',
+    'import_workflows': (
+        'import workflows.lead_workflow, workflows.call_queue_workflow, '
+        'workflows.knowledge_management_workflow, workflows.sales_intelligence_workflow'
+    ),
+    'construct_workflows': (
+        'from workflows.lead_workflow import LeadWorkflow\n'
+        'from workflows.call_queue_workflow import CallQueueWorkflow\n'
+        'LeadWorkflow(); CallQueueWorkflow()'
+    ),
+    'import_main': 'import main'
+}
+
+# Modules that must not be loaded by workflow construction alone
+DEFERRED_MODULES = ('supabase', 'slack_sdk', 'sendgrid', 'pydantic_ai')
+
+_RUNNER = """
+import sys, time, json
+start = time.perf_counter()
+exec(compile({statement!r}, '<benchmark>', 'exec'))
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {deferred!r} if m in sys.modules]}}))
+"""
+
+
+def run_scenario(statement: str) -> Dict[str, object]:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([SRC_DIR, ROOT_DIR, env.get('PYTHONPATH', '')])
+    output = subprocess.run(
+        [sys.executable, '-c', _RUNNER.format(statement=statement, deferred=DEFERRED_MODULES)],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def measure(runs: int) -> Dict[str, Dict[str, object]]:
+    results: Dict[str, Dict[str, object]] = {}
+    for name, statement in SCENARIOS.items():
+        try:
+            samples = [run_scenario(statement) for _ in range(runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"{name}: failed\n{e.stderr}", file=sys.stderr)
+            continue
+        timings: List[float] = [sample['seconds'] for sample in samples]
+        results[name] = {
+            'median_ms': round(statistics.median(timings) * 1000, 2),
+            'min_ms': round(min(timings) * 1000, 2),
+            'loaded': samples[-1]['loaded']
+        }
+    return results
+
+
+def compare(results: Dict[str, Dict[str, object]], baseline: Dict[str, Dict[str, object]], tolerance: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous and result['median_ms'] > previous['median_ms'] * (1 + tolerance):
+            regressions.append(
+                f"{name}: {result['median_ms']}ms vs baseline {previous['median_ms']}ms"
+            )
+    construct = results.get('construct_workflows')
+    if construct and construct['loaded']:
+        regressions.append(f"construct_workflows loaded deferred modules: {construct['loaded']}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown ratio')
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    results = measure(args.runs)
+    for name, result in results.items():
+        loaded = f" (loaded: {', '.join(result['loaded'])})" if result['loaded'] else ''
+        print(f"{name:22} median {result['median_ms']:8.2f}ms  min {result['min_ms']:8.2f}ms{loaded}")
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("No baseline recorded; run with --update-baseline to create one")
+        baseline = {}
+    else:
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
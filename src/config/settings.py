@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 from functools import lru_cache
 
 class Settings(BaseSettings):
@@ -22,6 +22,7 @@ class Settings(BaseSettings):
     # Models
     MODEL_NAME: str = "gpt-4-turbo-preview"
     EMBEDDING_MODEL: str = "text-embedding-3-small"
+    PROMPT_TOKEN_BUDGET: int = 3000  # max prompt tokens for RAG and insights prompts
     
     # Database
     DATABASE_URL: str
@@ -35,19 +36,46 @@ class Settings(BaseSettings):
     BUSINESS_START_HOUR: int = 9
     BUSINESS_END_HOUR: int = 17
     WEEKEND_EXCLUDED: bool = True
+    BUSINESS_TIMEZONE: Optional[str] = None  # IANA name; None keeps timestamps as given
+    BUSINESS_HOLIDAYS: List[str] = []  # ISO dates, e.g. ["2025-12-25"]
     
     # Lead Management
     MAX_CALL_ATTEMPTS: int = 6
     INITIAL_CALL_DELAY: int = 10  # minutes
+    CADENCE_SLOT_MINUTES: int = 15
+    CALLS_PER_AGENT_PER_HOUR: int = 8
+    IMPORT_BATCH_SIZE: int = 500
+    
+    # Shared HTTP Pool
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # seconds
+    HTTP_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    HTTP_CIRCUIT_RESET_TIMEOUT: float = 30.0  # seconds
     
     # Rate Limits
     RATE_LIMIT_CALLS: int = 100
     RATE_LIMIT_WINDOW: int = 3600  # seconds
+    RATE_LIMIT_TENANT_CALLS: Optional[int] = None  # per tenant and upstream, same window
+    RATE_LIMIT_RESERVE: float = 0.2  # bucket share batch work may not use
+    RATE_LIMIT_BACKEND: str = "local"  # "local" or "redis" (shared via REDIS_URL)
+    
+    # Change Events
+    EVENT_BUS_BACKEND: str = "local"  # "local" or "redis" (Redis Streams via REDIS_URL)
+    EVENT_STREAM: str = "attyx:events"
+    EVENT_STREAM_MAXLEN: int = 100_000
+    EVENT_SUBSCRIBER_QUEUE_SIZE: int = 1000
+    REALTIME_BATCH_WINDOW: float = 0.25  # seconds of updates batched per WebSocket frame
+    QUEUE_RECONCILE_INTERVAL: float = 600.0  # seconds between live call queue rebuilds from the database
     
     # Services
     NOTIFICATION_ENABLED: bool = True
     ANALYTICS_ENABLED: bool = True
     
+    # Sales Insights Cache
+    INSIGHTS_CACHE_TTL: int = 900  # seconds
+    INSIGHTS_STALE_TTL: int = 3600  # seconds
+    
     # Logging
     LOG_LEVEL: str = "INFO"
     
@@ -19,3 +19,35 @@ class LeadUpdateError(Exception):
         if self.original_error:
             return f"{base_msg} (Caused by: {self.original_error})"
         return base_msg
+
+
+class UpstreamError(Exception):
+    """Exception raised when an external API call fails"""
+    
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        original_error: Optional[Exception] = None
+    ) -> None:
+        """Initialize UpstreamError
+        
+        Args:
+            message: Error message
+            status_code: HTTP status of the last response, if any
+            original_error: Optional underlying exception
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.original_error = original_error
+        
+    def __str__(self) -> str:
+        """Format error message with original error if present"""
+        base_msg = super().__str__()
+        if self.original_error:
+            return f"{base_msg} (Caused by: {self.original_error})"
+        return base_msg
+
+
+class CircuitOpenError(UpstreamError):
+    """Exception raised when a call is shed because the upstream's circuit is open"""
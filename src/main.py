@@ -1,47 +1,156 @@
 import asyncio
 import logging
-from typing import Optional
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from config.settings import Settings
 from config.logging import setup_logging
-from services.database_service import DatabaseService
-from services.notification_service import NotificationService
-from services.api_service import APIService
-from services.analytics_service import AnalyticsService
+from api import health, pipeline, queue, realtime, reporting
+from services.event_bus import LEAD_EVENTS, LeadStatusChanged, SaleCreated
+from services.factory import ServiceFactory
+from services.lifecycle import AppLifecycle
 
-app = FastAPI(title="ATTYX AI", version="0.1.0")
 settings = Settings()
 logger = logging.getLogger(__name__)
+lifecycle = AppLifecycle()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm pools and caches before serving; drain and close them on exit"""
+    await startup()
+    try:
+        yield
+    finally:
+        await shutdown()
+
+app = FastAPI(title="ATTYX AI", version="0.1.0", lifespan=lifespan)
+app.state.lifecycle = lifecycle
+app.include_router(health.router)
+app.include_router(reporting.router, prefix=settings.API_PREFIX)
+app.include_router(pipeline.router, prefix=settings.API_PREFIX)
+app.include_router(queue.router, prefix=settings.API_PREFIX)
+app.include_router(realtime.router, prefix=settings.API_PREFIX)
+
+def register_snapshots() -> None:
+    """Wire the reporting snapshots to their producers and change events"""
+    snapshots = ServiceFactory.get_snapshot_service()
+    analytics = ServiceFactory.get_analytics_service()
+    
+    async def sales_performance(timeframe: str):
+        # Resolved per call so reporting does not depend on the agents warmup
+        from agents.sales_intelligence_agent import SalesIntelligenceAgent
+        sales_intelligence = ServiceFactory.get_agent(SalesIntelligenceAgent)
+        response = await sales_intelligence.get_sales_performance(timeframe)
+        if not response.success:
+            raise RuntimeError(response.message)
+        return response.data
+        
+    snapshots.register('sales_performance', sales_performance)
+    snapshots.register('pipeline_metrics', analytics.get_performance_metrics)
+    
+    # Recompute only when tracked lead/sale metrics change
+    ServiceFactory.get_metrics_aggregator().add_listener(
+        lambda event: snapshots.invalidate('metric')
+    )
+    events = ServiceFactory.get_event_bus()
+    events.add_handler(lambda event: snapshots.invalidate('sale'), SaleCreated)
+    events.add_handler(lambda event: snapshots.invalidate('lead'), LeadStatusChanged)
+
+def register_realtime() -> None:
+    """Feed the in-memory indexes from change events and push queue and pipeline to sockets"""
+    events = ServiceFactory.get_event_bus()
+    lead_book = ServiceFactory.get_lead_book()
+    similar_deals = ServiceFactory.get_similar_deals_index()
+    queue = ServiceFactory.get_live_queue()
+    gateway = ServiceFactory.get_realtime_gateway()
+    pipeline_view = ServiceFactory.get_pipeline_view()
+    
+    # Keep the pipeline lead book in step with committed lead changes
+    events.add_handler(lambda event: lead_book.upsert(event.lead_row()), LEAD_EVENTS)
+    events.add_handler(lambda event: queue.upsert(event.lead_row()), LEAD_EVENTS)
+    # Published on commit, so rolled-back sales never reach the index
+    events.add_handler(lambda event: similar_deals.add_sale(event.sale_row()), SaleCreated)
+    gateway.register('queue', queue.agent_state)
+    gateway.register('pipeline', lambda key: pipeline_view.stage_summary()['groups'])
+    
+    # Topics without subscribers ignore these marks
+    queue.add_listener(lambda agent_id: gateway.mark_dirty(f"queue:{agent_id}"))
+    events.add_handler(lambda event: gateway.mark_dirty('pipeline'), LEAD_EVENTS)
+
+def warm_agents() -> None:
+    """Build the agent roster up front so first requests skip construction"""
+    from agents.call_queue_agent import CallQueueAgent
+    from agents.knowledge_management_agent import KnowledgeManagementAgent
+    from agents.lead_management_agent import LeadManagementAgent
+    
+    for agent_class in (LeadManagementAgent, CallQueueAgent, KnowledgeManagementAgent):
+        ServiceFactory.get_agent(agent_class)
+
+def configure_lifecycle() -> None:
+    """Register warmup and shutdown steps"""
+    db = ServiceFactory.get_database_service()
+    
+    async def open_database():
+        # Touching the client creates the connection pool
+        await asyncio.to_thread(lambda: db.client)
+        
+    async def open_event_bus():
+        register_realtime()
+        await ServiceFactory.get_event_bus().start()
+        
+    async def open_http_pool():
+        ServiceFactory.get_api_service()
+        
+    async def build_agents():
+        await asyncio.to_thread(warm_agents)
+        
+    async def open_snapshots():
+        register_snapshots()
+        
+    async def load_similar_deals():
+        await ServiceFactory.get_similar_deals_index().rebuild_from_database(db)
+        
+    async def load_lead_book():
+        await ServiceFactory.get_lead_book().rebuild_from_database(db)
+        
+    async def load_live_queue():
+        queue = ServiceFactory.get_live_queue()
+        await queue.rebuild_from_database(db)
+        queue.start(db, reconcile_interval=settings.QUEUE_RECONCILE_INTERVAL)
+        
+    async def load_metric_history():
+        await ServiceFactory.get_metrics_aggregator().rebuild_from_history(db)
+        
+    lifecycle.add_warmup('database', open_database)
+    lifecycle.add_warmup('http_pool', open_http_pool)
+    lifecycle.add_warmup('event_bus', open_event_bus)
+    lifecycle.add_warmup('agents', build_agents)
+    lifecycle.add_warmup('snapshots', open_snapshots)
+    # Caches can be rebuilt lazily, so a failed backfill does not block readiness
+    lifecycle.add_warmup('similar_deals', load_similar_deals, required=False, timeout=60)
+    lifecycle.add_warmup('metric_history', load_metric_history, required=False, timeout=60)
+    lifecycle.add_warmup('lead_book', load_lead_book, required=False, timeout=120)
+    lifecycle.add_warmup('live_queue', load_live_queue, required=False, timeout=120)
+    lifecycle.add_shutdown('service_pools', ServiceFactory.close)
 
 async def startup():
-    """Initialize services and connections"""
+    """Initialize services and warm caches concurrently"""
     setup_logging()
     logger.info("Starting ATTYX AI Platform")
-    
-    # Initialize services
-    db = await DatabaseService.initialize(settings)
-    notification = await NotificationService.initialize(settings)
-    api = await APIService.initialize(settings)
-    analytics = await AnalyticsService.initialize(settings)
-    
-    return db, notification, api, analytics
+    configure_lifecycle()
+    await lifecycle.start()
 
 async def shutdown():
-    """Cleanup and close connections"""
+    """Drain buffers and close pooled connections"""
     logger.info("Shutting down ATTYX AI Platform")
-    # Cleanup code here
+    await lifecycle.stop()
 
 def main():
     """Main entry point for the application"""
-    try:
-        asyncio.run(startup())
-        # Additional startup code here
-    except Exception as e:
-        logger.error(f"Error during startup: {e}")
-        raise
-    finally:
-        asyncio.run(shutdown())
+    import uvicorn
+    
+    # Startup and shutdown run inside the server's event loop via the lifespan
+    uvicorn.run(app, host="0.0.0.0", port=8000)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
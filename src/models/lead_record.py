@@ -0,0 +1,289 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Union
+from .lead import CallAttempt, Lead, LeadSource, LeadStatus
+
+STATUSES: Tuple[LeadStatus, ...] = tuple(LeadStatus)
+SOURCES: Tuple[LeadSource, ...] = tuple(LeadSource)
+STATUS_CODES: Dict[str, int] = {status.value: code for code, status in enumerate(STATUSES)}
+SOURCE_CODES: Dict[str, int] = {source.value: code for code, source in enumerate(SOURCES)}
+
+_EPOCH = datetime(1970, 1, 1)
+_FLAGS = ('budget_confirmed', 'authority_confirmed', 'need_confirmed', 'timeline_confirmed')
+_ALL_FLAGS = (1 << len(_FLAGS)) - 1
+
+DateLike = Union[None, int, str, datetime]
+
+
+def to_epoch_us(value: DateLike) -> Optional[int]:
+    """Microseconds since the epoch; naive datetimes and strings are UTC"""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_epoch_us(value: Optional[int]) -> Optional[datetime]:
+    return None if value is None else _EPOCH + timedelta(microseconds=value)
+
+
+def _iso(value: Optional[int]) -> Optional[str]:
+    return None if value is None else from_epoch_us(value).isoformat()
+
+
+def _code(codes: Dict[str, int], value: Any) -> int:
+    return codes[value.value if hasattr(value, 'value') else value]
+
+
+class CallAttemptRecord(NamedTuple):
+    """Compact CallAttempt; timestamps in epoch microseconds"""
+    timestamp: int
+    outcome: str
+    notes: Optional[str] = None
+    next_attempt_scheduled: Optional[int] = None
+
+    @classmethod
+    def from_value(cls, attempt: Union[CallAttempt, Dict[str, Any]]) -> "CallAttemptRecord":
+        if isinstance(attempt, CallAttempt):
+            attempt = attempt.__dict__
+        return cls(
+            to_epoch_us(attempt['timestamp']),
+            attempt['outcome'],
+            attempt.get('notes'),
+            to_epoch_us(attempt.get('next_attempt_scheduled'))
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'timestamp': _iso(self.timestamp),
+            'outcome': self.outcome,
+            'notes': self.notes,
+            'next_attempt_scheduled': _iso(self.next_attempt_scheduled)
+        }
+
+
+class LeadRecord:
+    """Slotted internal form of Lead for queue and analytics hot paths
+
+    Statuses and sources are stored as small int codes, datetimes as epoch
+    microseconds, the four qualification flags as a bitmask, and empty
+    metadata and call histories as shared empty values. Properties named
+    like the Lead fields return the same types, so read-only code can use
+    either; raw codes are exposed for columnar consumers.
+
+    Records are built from trusted data (database rows or Lead models)
+    without validation; untrusted input goes through Lead first.
+    """
+
+    __slots__ = (
+        'id', 'first_name', 'last_name', 'email', 'phone', 'company',
+        'interest_level', 'estimated_value', 'assigned_agent_id',
+        'status_code', 'source_code', 'flags',
+        'created_at_us', 'updated_at_us', 'last_contact_us', 'next_follow_up_us',
+        '_call_attempts', '_metadata'
+    )
+
+    def __init__(
+        self,
+        id: str,
+        first_name: str,
+        last_name: str,
+        source_code: int,
+        interest_level: int,
+        created_at_us: int,
+        updated_at_us: int,
+        status_code: int = 0,
+        email: Optional[str] = None,
+        phone: Optional[str] = None,
+        company: Optional[str] = None,
+        estimated_value: Optional[float] = None,
+        assigned_agent_id: Optional[str] = None,
+        flags: int = 0,
+        last_contact_us: Optional[int] = None,
+        next_follow_up_us: Optional[int] = None,
+        call_attempts: Tuple[CallAttemptRecord, ...] = (),
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        self.id = id
+        self.first_name = first_name
+        self.last_name = last_name
+        self.email = email
+        self.phone = phone
+        self.company = company
+        self.interest_level = interest_level
+        self.estimated_value = estimated_value
+        self.assigned_agent_id = assigned_agent_id
+        self.status_code = status_code
+        self.source_code = source_code
+        self.flags = flags
+        self.created_at_us = created_at_us
+        self.updated_at_us = updated_at_us
+        self.last_contact_us = last_contact_us
+        self.next_follow_up_us = next_follow_up_us
+        self._call_attempts = call_attempts
+        self._metadata = metadata or None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LeadRecord":
+        """Build from a database row or a Lead-shaped dict"""
+        flags = 0
+        for bit, name in enumerate(_FLAGS):
+            if data.get(name):
+                flags |= 1 << bit
+        attempts = data.get('call_attempts')
+        return cls(
+            id=data['id'],
+            first_name=data['first_name'],
+            last_name=data['last_name'],
+            source_code=_code(SOURCE_CODES, data['source']),
+            interest_level=data['interest_level'],
+            created_at_us=to_epoch_us(data['created_at']),
+            updated_at_us=to_epoch_us(data.get('updated_at') or data['created_at']),
+            status_code=_code(STATUS_CODES, data.get('status') or LeadStatus.NEW),
+            email=data.get('email'),
+            phone=data.get('phone'),
+            company=data.get('company'),
+            estimated_value=data.get('estimated_value'),
+            assigned_agent_id=data.get('assigned_agent_id'),
+            flags=flags,
+            last_contact_us=to_epoch_us(data.get('last_contact')),
+            next_follow_up_us=to_epoch_us(data.get('next_follow_up')),
+            call_attempts=tuple(CallAttemptRecord.from_value(a) for a in attempts) if attempts else (),
+            metadata=data.get('metadata')
+        )
+
+    @classmethod
+    def from_lead(cls, lead: Lead) -> "LeadRecord":
+        return cls.from_dict(lead.__dict__)
+
+    def to_lead(self) -> Lead:
+        """Public model
+
+        Validation of already-typed values is cheaper in pydantic v2 than
+        model_construct, so the regular constructor is used.
+        """
+        return Lead(
+            **self._scalar_fields(),
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+            status=self.status,
+            source=self.source,
+            last_contact=self.last_contact,
+            next_follow_up=self.next_follow_up,
+            call_attempts=[
+                CallAttempt(
+                    timestamp=from_epoch_us(attempt.timestamp),
+                    outcome=attempt.outcome,
+                    notes=attempt.notes,
+                    next_attempt_scheduled=from_epoch_us(attempt.next_attempt_scheduled)
+                )
+                for attempt in self._call_attempts
+            ],
+            metadata=dict(self._metadata or {})
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready dict, matching Lead.model_dump(mode='json')"""
+        return {
+            **self._scalar_fields(),
+            'created_at': _iso(self.created_at_us),
+            'updated_at': _iso(self.updated_at_us),
+            'status': STATUSES[self.status_code].value,
+            'source': SOURCES[self.source_code].value,
+            'last_contact': _iso(self.last_contact_us),
+            'next_follow_up': _iso(self.next_follow_up_us),
+            'call_attempts': [attempt.to_dict() for attempt in self._call_attempts],
+            'metadata': dict(self._metadata or {})
+        }
+
+    def _scalar_fields(self) -> Dict[str, Any]:
+        fields = {
+            'id': self.id,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'email': self.email,
+            'phone': self.phone,
+            'company': self.company,
+            'interest_level': self.interest_level,
+            'estimated_value': self.estimated_value,
+            'assigned_agent_id': self.assigned_agent_id
+        }
+        for bit, name in enumerate(_FLAGS):
+            fields[name] = bool(self.flags >> bit & 1)
+        return fields
+
+    @property
+    def status(self) -> LeadStatus:
+        return STATUSES[self.status_code]
+
+    @property
+    def source(self) -> LeadSource:
+        return SOURCES[self.source_code]
+
+    @property
+    def created_at(self) -> datetime:
+        return from_epoch_us(self.created_at_us)
+
+    @property
+    def updated_at(self) -> datetime:
+        return from_epoch_us(self.updated_at_us)
+
+    @property
+    def last_contact(self) -> Optional[datetime]:
+        return from_epoch_us(self.last_contact_us)
+
+    @property
+    def next_follow_up(self) -> Optional[datetime]:
+        return from_epoch_us(self.next_follow_up_us)
+
+    @property
+    def call_attempts(self) -> Tuple[CallAttemptRecord, ...]:
+        return self._call_attempts
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+
+    @property
+    def budget_confirmed(self) -> bool:
+        return bool(self.flags & 1)
+
+    @property
+    def authority_confirmed(self) -> bool:
+        return bool(self.flags & 2)
+
+    @property
+    def need_confirmed(self) -> bool:
+        return bool(self.flags & 4)
+
+    @property
+    def timeline_confirmed(self) -> bool:
+        return bool(self.flags & 8)
+
+    def is_qualified(self) -> bool:
+        return self.flags == _ALL_FLAGS
+
+    def update_status(self, new_status: Union[LeadStatus, str]) -> None:
+        self.status_code = _code(STATUS_CODES, new_status)
+        self.updated_at_us = to_epoch_us(datetime.utcnow())
+
+    def add_call_attempt(
+        self,
+        outcome: str,
+        notes: Optional[str] = None,
+        next_attempt: Optional[datetime] = None
+    ) -> None:
+        now = to_epoch_us(datetime.utcnow())
+        attempt = CallAttemptRecord(now, outcome, notes, to_epoch_us(next_attempt))
+        self._call_attempts = self._call_attempts + (attempt,)
+        self.last_contact_us = now
+        self.next_follow_up_us = attempt.next_attempt_scheduled
+        self.updated_at_us = now
+
+    def __repr__(self) -> str:
+        return f"LeadRecord(id={self.id!r}, status={self.status.value!r})"
@@ -0,0 +1,127 @@
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+
+def _agent_of(row: Dict[str, Any]) -> Optional[str]:
+    return row.get('agent_id', row.get('assigned_agent_id'))
+
+
+class AgentMetricsFrame:
+    """Columnar view of a get_sales_metrics payload grouped by agent
+
+    The payload rows are loaded once into NumPy arrays keyed by an integer
+    agent code, so conversion, deal size and response time for every agent
+    come out of a single grouped pass instead of one scan per agent and
+    metric.
+
+    Expected payload rows (rows without an agent, and response rows without
+    a response_time, are ignored):
+        leads: [{'assigned_agent_id', 'status'}]
+        won_deals: [{'agent_id', 'amount'}]
+        response_times: [{'agent_id', 'response_time'}]
+    """
+
+    def __init__(
+        self,
+        agent_ids: np.ndarray,
+        lead_codes: np.ndarray,
+        lead_converted: np.ndarray,
+        deal_codes: np.ndarray,
+        deal_amounts: np.ndarray,
+        response_codes: np.ndarray,
+        response_values: np.ndarray
+    ):
+        self.agent_ids = agent_ids
+        self.lead_codes = lead_codes
+        self.lead_converted = lead_converted
+        self.deal_codes = deal_codes
+        self.deal_amounts = deal_amounts
+        self.response_codes = response_codes
+        self.response_values = response_values
+
+    @classmethod
+    def from_payload(cls, metrics: Dict[str, Any]) -> 'AgentMetricsFrame':
+        """Load the per-agent rows of a metrics payload into columns"""
+        leads = [row for row in metrics.get('leads', []) if _agent_of(row) is not None]
+        deals = [row for row in metrics.get('won_deals', []) if _agent_of(row) is not None]
+        responses = [
+            row for row in metrics.get('response_times', [])
+            if isinstance(row, dict) and _agent_of(row) is not None
+            and row.get('response_time') is not None
+        ]
+
+        agents = [_agent_of(row) for row in leads] + \
+                 [_agent_of(row) for row in deals] + \
+                 [_agent_of(row) for row in responses]
+        agent_ids, codes = np.unique(np.array(agents, dtype=object), return_inverse=True)
+        codes = codes.astype(np.intp)
+        lead_end = len(leads)
+        deal_end = lead_end + len(deals)
+
+        return cls(
+            agent_ids=agent_ids,
+            lead_codes=codes[:lead_end],
+            lead_converted=np.fromiter(
+                (row.get('status') == 'closed_won' or bool(row.get('converted')) for row in leads),
+                dtype=bool,
+                count=len(leads)
+            ),
+            deal_codes=codes[lead_end:deal_end],
+            deal_amounts=np.fromiter(
+                (row.get('amount') or 0.0 for row in deals), dtype=np.float64, count=len(deals)
+            ),
+            response_codes=codes[deal_end:],
+            response_values=np.fromiter(
+                (row['response_time'] for row in responses),
+                dtype=np.float64,
+                count=len(responses)
+            )
+        )
+
+    def compute(self) -> Dict[str, Dict[str, float]]:
+        """Compute the agent-specific metrics for every agent in one pass"""
+        size = len(self.agent_ids)
+        if not size:
+            return {}
+
+        lead_totals = np.bincount(self.lead_codes, minlength=size)
+        converted = np.bincount(self.lead_codes, weights=self.lead_converted, minlength=size)
+        deal_counts = np.bincount(self.deal_codes, minlength=size)
+        deal_sums = np.bincount(self.deal_codes, weights=self.deal_amounts, minlength=size)
+        response_counts = np.bincount(self.response_codes, minlength=size)
+        response_sums = np.bincount(self.response_codes, weights=self.response_values, minlength=size)
+
+        conversion = _safe_ratio(converted, lead_totals) * 100
+        deal_size = _safe_ratio(deal_sums, deal_counts)
+        response_time = _safe_ratio(response_sums, response_counts)
+
+        return {
+            agent_id: {
+                'personal_conversion_rate': float(conversion[code]),
+                'average_deal_size': float(deal_size[code]),
+                'response_time': float(response_time[code])
+            }
+            for code, agent_id in enumerate(self.agent_ids)
+        }
+
+    def leaderboard(
+        self,
+        sort_by: str = 'personal_conversion_rate',
+        descending: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Rank all agents by one of the computed metrics"""
+        per_agent = self.compute()
+        ranked: List[Tuple[str, Dict[str, float]]] = sorted(
+            per_agent.items(),
+            key=lambda item: item[1][sort_by],
+            reverse=descending
+        )
+        return [
+            {'rank': position, 'agent_id': agent_id, **values}
+            for position, (agent_id, values) in enumerate(ranked, start=1)
+        ]
+
+
+def _safe_ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    result = np.zeros(len(numerator), dtype=np.float64)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
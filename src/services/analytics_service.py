@@ -1,10 +1,24 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
-from ..services.database_service import DatabaseService
+from .factory import ServiceFactory
+from .metrics_aggregator import MetricsAggregator
+from .agent_metrics import AgentMetricsFrame
+from .conversation_heuristics import HeuristicConversationAnalyzer
+
+def _as_datetime(value: Any) -> datetime:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return value
 
 class AnalyticsService:
-    def __init__(self):
-        self.db_service = DatabaseService()
+    def __init__(
+        self,
+        aggregator: Optional[MetricsAggregator] = None,
+        conversation_analyzer: Optional[HeuristicConversationAnalyzer] = None
+    ):
+        self.db_service = ServiceFactory.get_database_service()
+        self.aggregator = aggregator or ServiceFactory.get_metrics_aggregator()
+        self.conversation_analyzer = conversation_analyzer or HeuristicConversationAnalyzer()
 
     async def get_performance_metrics(
         self,
@@ -12,7 +26,11 @@ class AnalyticsService:
         agent_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Get performance metrics for specified timeframe"""
+        if self.aggregator.is_ready:
+            return self._aggregated_metrics(timeframe, agent_id)
+
         metrics = await self.db_service.get_sales_metrics(timeframe)
+        self.backfill_response_times(metrics.get('response_times', []))
         
         processed_metrics = {
             'conversion_rate': self._calculate_conversion_rate(metrics),
@@ -28,17 +46,69 @@ class AnalyticsService:
             
         return processed_metrics
 
+    async def get_agent_leaderboard(
+        self,
+        timeframe: str,
+        sort_by: str = 'personal_conversion_rate'
+    ) -> List[Dict[str, Any]]:
+        """Rank every agent on the agent-specific metrics in one grouped pass"""
+        metrics = await self.db_service.get_sales_metrics(timeframe)
+        return AgentMetricsFrame.from_payload(metrics).leaderboard(sort_by=sort_by)
+
+    def get_response_time_percentiles(
+        self,
+        timeframe: str,
+        agent_id: Optional[str] = None,
+        source: Optional[str] = None,
+        quantiles: Tuple[float, ...] = (0.5, 0.9, 0.99)
+    ) -> Dict[str, Optional[float]]:
+        """Get lead response time percentiles from the streaming sketches"""
+        sketch = self.aggregator.response_time_sketch(timeframe, agent_id=agent_id, source=source)
+        return {f"p{round(q * 100)}": sketch.quantile(q) for q in quantiles}
+
+    async def rebuild_aggregates(self, since: Optional[datetime] = None) -> int:
+        """Backfill the incremental aggregates from the metrics table"""
+        return await self.aggregator.rebuild_from_history(self.db_service, since=since)
+
+    def _aggregated_metrics(
+        self,
+        timeframe: str,
+        agent_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Answer a performance query from pre-aggregated buckets"""
+        totals = self.aggregator.query(timeframe)
+        processed_metrics = {
+            'conversion_rate': totals.conversion_rate(),
+            'average_deal_size': totals.average_deal_size(),
+            'lead_response_time': totals.response_time(),
+            'qualification_accuracy': totals.qualification_accuracy(),
+            'win_rate': totals.win_rate()
+        }
+
+        if agent_id:
+            agent_totals = self.aggregator.query(timeframe, agent_id)
+            processed_metrics['agent_specific'] = {
+                'personal_conversion_rate': agent_totals.conversion_rate(),
+                'average_deal_size': agent_totals.average_deal_size(),
+                'response_time': agent_totals.response_time()
+            }
+
+        return processed_metrics
+
     async def analyze_conversation(
         self,
         conversation_data: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Analyze conversation for key metrics and insights"""
-        return {
-            'sentiment_score': self._analyze_sentiment(conversation_data),
-            'key_topics': self._extract_key_topics(conversation_data),
-            'objections_handled': self._count_objections(conversation_data),
-            'next_steps': self._identify_next_steps(conversation_data)
-        }
+        """Analyze conversation for key metrics and insights
+        
+        Runs the local heuristics in a single pass; the result includes
+        needs_deep_analysis for transcripts that should go to the LLM.
+        """
+        return self.conversation_analyzer.analyze(conversation_data.get('transcript', ''))
+
+    def ingest_conversation(self, conversation_data: Dict[str, Any]) -> None:
+        """Add a newly stored transcript to the corpus that ranks key topics"""
+        self.conversation_analyzer.add_transcript(conversation_data.get('transcript', ''))
 
     async def get_lead_analytics(
         self,
@@ -66,8 +136,33 @@ class AnalyticsService:
             return 0.0
         return sum(deal['amount'] for deal in won_deals) / len(won_deals)
 
+    def backfill_response_times(self, rows: List[Any]) -> int:
+        """Fill business-hours 'response_time' on rows that only carry timestamps
+        
+        Rows with 'created_at' and 'responded_at' but no 'response_time' are
+        computed in one vectorized pass; returns how many were filled.
+        """
+        pending = [
+            row for row in rows
+            if isinstance(row, dict) and row.get('response_time') is None
+            and row.get('created_at') and row.get('responded_at')
+        ]
+        if not pending:
+            return 0
+        hours = ServiceFactory.get_business_calendar().working_hours_many(
+            [_as_datetime(row['created_at']) for row in pending],
+            [_as_datetime(row['responded_at']) for row in pending]
+        )
+        for row, value in zip(pending, hours):
+            row['response_time'] = float(value)
+        return len(pending)
+
     def _calculate_response_time(self, metrics: Dict[str, Any]) -> float:
-        response_times = metrics.get('response_times', [])
+        response_times = [
+            row.get('response_time') if isinstance(row, dict) else row
+            for row in metrics.get('response_times', [])
+        ]
+        response_times = [value for value in response_times if value is not None]
         if not response_times:
             return 0.0
         return sum(response_times) / len(response_times)
@@ -92,37 +187,30 @@ class AnalyticsService:
         agent_id: str
     ) -> Dict[str, Any]:
         """Filter metrics for specific agent"""
-        return {
-            'personal_conversion_rate': self._calculate_conversion_rate(
-                self._filter_by_agent(metrics, agent_id)
-            ),
-            'average_deal_size': self._calculate_avg_deal_size(
-                self._filter_by_agent(metrics, agent_id)
-            ),
-            'response_time': self._calculate_response_time(
-                self._filter_by_agent(metrics, agent_id)
-            )
-        }
+        per_agent = AgentMetricsFrame.from_payload(metrics).compute()
+        return per_agent.get(agent_id, {
+            'personal_conversion_rate': 0.0,
+            'average_deal_size': 0.0,
+            'response_time': 0.0
+        })
 
     def _analyze_sentiment(self, conversation: Dict[str, Any]) -> float:
         """Analyze conversation sentiment"""
-        # Implement sentiment analysis
-        pass
+        return self.conversation_analyzer.sentiment(conversation.get('transcript', ''))
 
     def _extract_key_topics(self, conversation: Dict[str, Any]) -> List[str]:
         """Extract key topics from conversation"""
-        # Implement topic extraction
-        pass
+        return self.conversation_analyzer.topics(conversation.get('transcript', ''))
 
     def _count_objections(self, conversation: Dict[str, Any]) -> Dict[str, int]:
         """Count and categorize objections"""
-        # Implement objection counting
-        pass
+        matches = self.conversation_analyzer.match_phrases(conversation.get('transcript', ''))
+        return matches.get('objections', {})
 
     def _identify_next_steps(self, conversation: Dict[str, Any]) -> List[str]:
         """Identify next steps from conversation"""
-        # Implement next steps identification
-        pass
+        matches = self.conversation_analyzer.match_phrases(conversation.get('transcript', ''))
+        return list(matches.get('next_steps', {}))
 
     def _calculate_engagement(
         self,
@@ -1,37 +1,75 @@
 from typing import Dict, Any, Optional
-import httpx
-from ..config.settings import OPENAI_API_KEY
+from config.settings import get_settings
+from .http_client import ResilientHTTPClient, RetryPolicy
+from .rate_limiter import RateLimiter
+from .request_coalescer import RequestCoalescer
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
 
 class APIService:
-    def __init__(self):
-        self.http_client = httpx.AsyncClient()
-        self.openai_key = OPENAI_API_KEY
+    def __init__(
+        self,
+        http_client: Optional[ResilientHTTPClient] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        coalescer: Optional[RequestCoalescer] = None
+    ):
+        settings = get_settings()
+        # One pooled client per process, shared through ServiceFactory
+        self.http_client = http_client or ResilientHTTPClient(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            retry_policy=RetryPolicy(max_retries=settings.MAX_RETRIES),
+            failure_threshold=settings.HTTP_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.HTTP_CIRCUIT_RESET_TIMEOUT
+        )
+        self.openai_key = settings.OPENAI_API_KEY
+        self._rate_limiter = rate_limiter
+        self.coalescer = coalescer or RequestCoalescer()
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        if self._rate_limiter is None:
+            from .factory import ServiceFactory
+            self._rate_limiter = ServiceFactory.get_rate_limiter()
+        return self._rate_limiter
+
+    async def close(self) -> None:
+        """Close the pooled HTTP client"""
+        await self.http_client.aclose()
 
     async def get_embeddings(self, text: str) -> list[float]:
-        try:
-            response = await self.http_client.post(
-                "https://api.openai.com/v1/embeddings",
-                headers={"Authorization": f"Bearer {self.openai_key}"},
-                json={
-                    "input": text,
-                    "model": "text-embedding-ada-002"
-                }
-            )
-            return response.json()["data"][0]["embedding"]
-        except Exception as e:
-            print(f"Error getting embeddings: {e}")
-            return []
+        """Embed text; raises UpstreamError when the API call fails"""
+        await self.rate_limiter.acquire('openai')
+        response = await self.http_client.post(
+            'embeddings',
+            f"{OPENAI_BASE_URL}/embeddings",
+            headers={"Authorization": f"Bearer {self.openai_key}"},
+            json={
+                "input": text,
+                "model": "text-embedding-ada-002"
+            }
+        )
+        return response.json()["data"][0]["embedding"]
 
     async def get_completion(
         self,
         prompt: str,
         model: str = "gpt-4",
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        coalesce: Optional[bool] = None
     ) -> str:
-        try:
+        """Run a chat completion; raises UpstreamError when the API call fails
+        
+        Identical concurrent temperature-0 requests share one upstream call;
+        pass coalesce=False to always send a separate request.
+        """
+        async def request() -> str:
+            await self.rate_limiter.acquire('openai')
             response = await self.http_client.post(
-                "https://api.openai.com/v1/chat/completions",
+                'completions',
+                f"{OPENAI_BASE_URL}/chat/completions",
                 headers={"Authorization": f"Bearer {self.openai_key}"},
                 json={
                     "model": model,
@@ -41,9 +79,10 @@ class APIService:
                 }
             )
             return response.json()["choices"][0]["message"]["content"]
-        except Exception as e:
-            print(f"Error getting completion: {e}")
-            return ""
+            
+        return await self.coalescer.completion(
+            model, prompt, temperature, request, coalesce=coalesce, max_tokens=max_tokens
+        )
 
     async def lookup_property_info(self, address: str) -> Dict[str, Any]:
         # Implement property information lookup API
@@ -0,0 +1,127 @@
+from typing import Any, Optional, Sequence, Union
+from datetime import datetime, timedelta
+import logging
+import math
+import numpy as np
+from utils.business_calendar import BusinessCalendar
+
+logger = logging.getLogger(__name__)
+
+# Delay before each follow-up attempt; later attempts reuse the last entry.
+# Sub-day delays are working time, whole days are working days.
+DEFAULT_CADENCE = (
+    timedelta(minutes=10),
+    timedelta(minutes=30),
+    timedelta(hours=1),
+    timedelta(hours=4),
+    timedelta(days=1)
+)
+
+
+class CadencePlanner:
+    """Call-attempt scheduling on the business calendar
+
+    Attempt delays are measured in working time, so a delay that runs past
+    closing resumes at the next opening instead of landing at night or on
+    a weekend. Batches are planned in working-time offsets with NumPy, and
+    ``spread`` levels due-time spikes (the Monday-morning backlog) across
+    fixed slots sized to agent capacity.
+    """
+
+    def __init__(
+        self,
+        calendar: BusinessCalendar,
+        cadence: Sequence[timedelta] = DEFAULT_CADENCE,
+        slot_minutes: int = 15,
+        calls_per_agent_per_hour: float = 8
+    ):
+        """Configure the planner
+
+        Args:
+            calendar: Working schedule delays are projected onto
+            cadence: Delay before attempt 1, 2, ...
+            slot_minutes: Granularity used when spreading due times
+            calls_per_agent_per_hour: Dial capacity of one agent
+        """
+        if not cadence:
+            raise ValueError("Cadence needs at least one delay")
+        self.calendar = calendar
+        self.slot_seconds = slot_minutes * 60
+        self.calls_per_agent_per_hour = calls_per_agent_per_hour
+        self._delays = np.array([self._working_seconds(delay) for delay in cadence], dtype=np.float64)
+
+    @classmethod
+    def from_settings(cls, settings: Any, calendar: BusinessCalendar) -> "CadencePlanner":
+        return cls(
+            calendar,
+            slot_minutes=settings.CADENCE_SLOT_MINUTES,
+            calls_per_agent_per_hour=settings.CALLS_PER_AGENT_PER_HOUR
+        )
+
+    def _working_seconds(self, delay: timedelta) -> float:
+        days, rest = divmod(delay, timedelta(days=1))
+        return days * self.calendar.day_length + rest.total_seconds()
+
+    def delay_for(self, attempt_number: int) -> float:
+        """Working seconds to wait before the given attempt (1-based)"""
+        return float(self._delays[min(max(attempt_number, 1), len(self._delays)) - 1])
+
+    def next_attempt(self, attempt_number: int, now: Optional[datetime] = None) -> datetime:
+        now = now or datetime.utcnow()
+        return self.calendar.add_working_time(now, timedelta(seconds=self.delay_for(attempt_number)))
+
+    def plan_many(
+        self,
+        attempt_numbers: Union[Sequence[int], np.ndarray],
+        last_attempts: Union[Sequence[datetime], np.ndarray]
+    ) -> np.ndarray:
+        """Due times (datetime64[us]) for a batch of leads in one pass"""
+        attempts = np.clip(np.asarray(attempt_numbers, dtype=np.int64), 1, len(self._delays))
+        offsets = self.calendar.working_offsets(last_attempts) + self._delays[attempts - 1]
+        return self.calendar.at_working_offsets(offsets)
+
+    def slot_capacity(self, agents: int) -> int:
+        """Calls the team can start per slot"""
+        return max(1, math.floor(agents * self.calls_per_agent_per_hour * self.slot_seconds / 3600))
+
+    def spread(self, due_times: Union[Sequence[datetime], np.ndarray], agents: int) -> np.ndarray:
+        """Delay due times so no slot holds more calls than agents can make
+
+        Calls keep their order of due time and are never moved earlier;
+        overflow rolls into the following slots, which stay within business
+        hours because slots are counted in working time.
+        """
+        offsets = self.calendar.working_offsets(due_times)
+        if not len(offsets):
+            return self.calendar.at_working_offsets(offsets)
+        capacity = self.slot_capacity(agents)
+        order = np.argsort(offsets, kind='stable')
+        wanted = np.floor(offsets[order] / self.slot_seconds).astype(np.int64)
+
+        assigned = np.empty_like(wanted)
+        slot, used = wanted[0], 0
+        for index, desired in enumerate(wanted.tolist()):
+            if desired > slot:
+                slot, used = desired, 0
+            elif used == capacity:
+                slot, used = slot + 1, 0
+            assigned[index] = slot
+            used += 1
+
+        moved = np.maximum(offsets[order], assigned * float(self.slot_seconds))
+        spread_offsets = np.empty_like(offsets)
+        spread_offsets[order] = moved
+        deferred = int(np.count_nonzero(assigned > wanted))
+        if deferred:
+            logger.info(f"Spread {deferred} of {len(offsets)} calls over later slots ({capacity} per slot)")
+        return self.calendar.at_working_offsets(spread_offsets)
+
+    def schedule_batch(
+        self,
+        attempt_numbers: Union[Sequence[int], np.ndarray],
+        last_attempts: Union[Sequence[datetime], np.ndarray],
+        agents: Optional[int] = None
+    ) -> np.ndarray:
+        """plan_many followed by spread when the agent count is known"""
+        due = self.plan_many(attempt_numbers, last_attempts)
+        return self.spread(due, agents) if agents else due
@@ -0,0 +1,163 @@
+from typing import Dict, Any, Awaitable, Callable, List, Optional
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+import asyncio
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+ChunkAnalyzer = Callable[[str], Awaitable[Dict[str, Any]]]
+
+# Analysis fields merged across chunks by ordered, de-duplicated union
+LIST_FIELDS = (
+    'objections',
+    'pain_points',
+    'buying_signals',
+    'improvement_areas',
+    'follow_up_opportunities'
+)
+
+
+def split_transcript(transcript: str, chunk_size: int = 2000) -> List[str]:
+    """Split a transcript into chunks on line boundaries
+
+    Lines are packed greedily from the start, so appending to a transcript
+    leaves every chunk but the last one unchanged. Lines longer than
+    chunk_size are split on their own.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in transcript.splitlines(keepends=True):
+        while len(line) > chunk_size:
+            if current:
+                chunks.append(''.join(current))
+                current, size = [], 0
+            chunks.append(line[:chunk_size])
+            line = line[chunk_size:]
+        if size + len(line) > chunk_size and current:
+            chunks.append(''.join(current))
+            current, size = [], 0
+        if line:
+            current.append(line)
+            size += len(line)
+    if current:
+        chunks.append(''.join(current))
+    return chunks
+
+
+def chunk_hash(chunk: str) -> str:
+    return hashlib.sha256(chunk.encode()).hexdigest()
+
+
+def merge_analyses(analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-chunk analyses into one rolling summary"""
+    merged: Dict[str, Any] = {name: [] for name in LIST_FIELDS}
+    seen: Dict[str, set] = {name: set() for name in LIST_FIELDS}
+    for analysis in analyses:
+        for name, value in analysis.items():
+            if name in LIST_FIELDS:
+                items = value if isinstance(value, list) else [value]
+                for item in items:
+                    marker = str(item).strip().lower()
+                    if marker and marker not in seen[name]:
+                        seen[name].add(marker)
+                        merged[name].append(item)
+            else:
+                # Scalar fields (e.g. sentiment) reflect the latest chunk
+                merged[name] = value
+    return merged
+
+
+@dataclass
+class ConversationSummary:
+    """Rolling analysis state for one lead's latest conversation"""
+    lead_id: str
+    chunk_hashes: List[str] = field(default_factory=list)
+    analyses: List[Dict[str, Any]] = field(default_factory=list)
+    summary: Dict[str, Any] = field(default_factory=dict)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+
+
+class IncrementalConversationAnalyzer:
+    """Analyze transcripts chunk by chunk, reusing cached chunk analyses
+
+    Each chunk's analysis is cached by content hash, so when a transcript
+    grows only the new (or changed last) chunks are sent to the LLM and the
+    cost per request stays flat. Results are merged into a rolling summary
+    kept per lead.
+    """
+
+    def __init__(self, chunk_size: int = 2000, max_cached_chunks: int = 10000):
+        self.chunk_size = chunk_size
+        self.max_cached_chunks = max_cached_chunks
+        self._chunk_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._summaries: Dict[str, ConversationSummary] = {}
+        self.chunks_analyzed = 0
+        self.chunks_reused = 0
+
+    async def analyze(
+        self,
+        lead_id: str,
+        transcript: str,
+        analyze_chunk: ChunkAnalyzer
+    ) -> Dict[str, Any]:
+        """Update and return the rolling summary for a lead's transcript
+
+        Args:
+            lead_id: Lead the conversation belongs to
+            transcript: Full current transcript
+            analyze_chunk: Coroutine that runs the LLM analysis for one chunk
+        """
+        chunks = split_transcript(transcript or "", self.chunk_size)
+        hashes = [chunk_hash(chunk) for chunk in chunks]
+        previous = self._summaries.get(lead_id)
+        if previous is not None and previous.chunk_hashes == hashes:
+            return previous.summary
+
+        # Take cached analyses up front so evictions during the LLM calls cannot drop them
+        known: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[str, str] = {}
+        for digest, chunk in zip(hashes, chunks):
+            if digest in self._chunk_cache:
+                known[digest] = self._chunk_cache[digest]
+                self._chunk_cache.move_to_end(digest)
+            else:
+                pending[digest] = chunk
+        self.chunks_reused += len(hashes) - len(pending)
+
+        if pending:
+            results = await asyncio.gather(*(analyze_chunk(chunk) for chunk in pending.values()))
+            for digest, result in zip(pending, results):
+                known[digest] = result or {}
+                self._remember(digest, known[digest])
+            self.chunks_analyzed += len(pending)
+
+        analyses = [known[digest] for digest in hashes]
+
+        summary = ConversationSummary(
+            lead_id=lead_id,
+            chunk_hashes=hashes,
+            analyses=analyses,
+            summary=merge_analyses(analyses)
+        )
+        self._summaries[lead_id] = summary
+        logger.debug(
+            f"Conversation analysis for lead {lead_id}: "
+            f"{len(pending)} new chunks, {len(hashes) - len(pending)} reused"
+        )
+        return summary.summary
+
+    def get_summary(self, lead_id: str) -> Optional[ConversationSummary]:
+        return self._summaries.get(lead_id)
+
+    def forget(self, lead_id: str) -> None:
+        self._summaries.pop(lead_id, None)
+
+    def _remember(self, digest: str, analysis: Dict[str, Any]) -> None:
+        self._chunk_cache[digest] = analysis
+        self._chunk_cache.move_to_end(digest)
+        while len(self._chunk_cache) > self.max_cached_chunks:
+            self._chunk_cache.popitem(last=False)
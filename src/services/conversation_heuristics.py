@@ -0,0 +1,174 @@
+from typing import Dict, Any, List, Optional
+from collections import Counter
+import math
+import re
+from utils.aho_corasick import AhoCorasick
+
+# Phrase lexicon: category -> label -> trigger phrases
+DEFAULT_LEXICON: Dict[str, Dict[str, List[str]]] = {
+    'objections': {
+        'price': ['too expensive', 'too much', 'can\'t afford', 'cannot afford', 'out of our budget',
+                  'over budget', 'cheaper', 'lower price', 'price is high'],
+        'timing': ['not right now', 'not a good time', 'maybe next year', 'call me later',
+                   'not ready', 'too soon'],
+        'competitor': ['another company', 'other quote', 'competitor', 'already have a provider',
+                       'going with someone else'],
+        'authority': ['talk to my wife', 'talk to my husband', 'check with my partner',
+                      'not the decision maker', 'need approval'],
+        'trust': ['sounds like a scam', 'not sure i trust', 'bad reviews', 'too good to be true'],
+        'need': ['don\'t need', 'do not need', 'not interested', 'happy with what we have']
+    },
+    'buying_signals': {
+        'pricing_request': ['how much', 'what does it cost', 'send me a quote', 'pricing'],
+        'financing': ['financing', 'monthly payment', 'payment plan', 'tax credit'],
+        'timeline': ['how soon', 'when can you start', 'installation date', 'how long does installation'],
+        'commitment': ['sounds good', 'let\'s do it', 'sign up', 'move forward', 'ready to go']
+    },
+    'next_steps': {
+        'Send quote': ['send a quote', 'send me a quote', 'send the quote', 'send over a proposal',
+                       'send the proposal'],
+        'Schedule appointment': ['schedule an appointment', 'book a visit', 'site visit',
+                                 'come out and look', 'schedule a consultation'],
+        'Follow-up call': ['call me back', 'follow up', 'call you next week', 'talk next week'],
+        'Send information': ['email me', 'send me information', 'send some info', 'send details']
+    }
+}
+
+POSITIVE_WORDS = {
+    'great', 'good', 'excellent', 'interested', 'love', 'perfect', 'helpful', 'thanks',
+    'thank', 'happy', 'excited', 'yes', 'definitely', 'awesome', 'appreciate', 'nice', 'sure'
+}
+NEGATIVE_WORDS = {
+    'bad', 'expensive', 'worried', 'concerned', 'problem', 'angry', 'frustrated', 'scam',
+    'annoyed', 'unhappy', 'disappointed', 'hate', 'confusing', 'difficult'
+}
+NEGATIONS = {'not', "don't", "didn't", "isn't", "wasn't", "won't", "can't", 'never', 'no'}
+
+STOPWORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'if', 'to', 'of', 'in', 'on', 'for', 'with', 'at', 'by',
+    'from', 'is', 'are', 'was', 'were', 'be', 'been', 'it', 'its', 'this', 'that', 'these', 'those',
+    'i', 'you', 'we', 'they', 'he', 'she', 'me', 'my', 'your', 'our', 'their', 'us', 'them', 'so',
+    'do', 'does', 'did', 'have', 'has', 'had', 'just', 'can', 'could', 'would', 'will', 'about',
+    'what', 'when', 'how', 'yeah', 'okay', 'ok', 'um', 'uh', 'like', 'know', 'think', 'well',
+    'there', 'here', 'then', 'than', 'get', 'got', 'go', 'going', 'really', 'right', 'rep',
+    'customer', 'agent', 'not', 'no', 'yes', 'all', 'any', 'some', 'more', 'very', 'also'
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z][a-z']+")
+
+
+class HeuristicConversationAnalyzer:
+    """Fast local conversation analysis
+
+    Objections, buying signals and next steps are found in one pass by a
+    compiled Aho-Corasick matcher over a configurable lexicon. Sentiment is
+    lexicon-based with simple negation handling, and topics are ranked by
+    TF-IDF against the transcripts ingested so far. Transcripts the heuristics
+    cannot settle are flagged for deep (LLM) analysis.
+    """
+
+    def __init__(
+        self,
+        lexicon: Optional[Dict[str, Dict[str, List[str]]]] = None,
+        deep_analysis_objections: int = 3,
+        max_topics: int = 5
+    ):
+        self.lexicon = lexicon or DEFAULT_LEXICON
+        self.deep_analysis_objections = deep_analysis_objections
+        self.max_topics = max_topics
+        self.matcher = AhoCorasick(
+            (phrase, (category, label))
+            for category, labels in self.lexicon.items()
+            for label, phrases in labels.items()
+            for phrase in phrases
+        )
+        self._document_count = 0
+        self._document_frequency: Counter = Counter()
+
+    def analyze(self, transcript: str, update_corpus: bool = False) -> Dict[str, Any]:
+        """Run every heuristic over a transcript in a single tokenization pass
+
+        Analysis is read-only unless update_corpus is set, which should only
+        happen once per transcript, when it is first ingested; re-analyzing
+        a transcript then gives the same topics.
+        """
+        tokens = _TOKEN_PATTERN.findall((transcript or "").lower())
+        matches = self.match_phrases(transcript)
+        if update_corpus:
+            self.add_to_corpus(tokens)
+
+        sentiment = self._sentiment_from_tokens(tokens)
+        objections = matches.get('objections', {})
+        result = {
+            'sentiment_score': sentiment,
+            'key_topics': self._topics_from_tokens(tokens),
+            'objections_handled': objections,
+            'buying_signals': matches.get('buying_signals', {}),
+            'next_steps': list(matches.get('next_steps', {}))
+        }
+        result['needs_deep_analysis'] = self._needs_deep_analysis(result)
+        return result
+
+    def match_phrases(self, transcript: str) -> Dict[str, Dict[str, int]]:
+        """Count lexicon matches as {category: {label: count}}"""
+        grouped: Dict[str, Dict[str, int]] = {}
+        for (category, label), count in self.matcher.count(transcript or "").items():
+            grouped.setdefault(category, {})[label] = count
+        return grouped
+
+    def sentiment(self, transcript: str) -> float:
+        return self._sentiment_from_tokens(_TOKEN_PATTERN.findall((transcript or "").lower()))
+
+    def topics(self, transcript: str) -> List[str]:
+        return self._topics_from_tokens(_TOKEN_PATTERN.findall((transcript or "").lower()))
+
+    def add_transcript(self, transcript: str) -> None:
+        """Count a newly ingested transcript in the IDF corpus"""
+        self.add_to_corpus(_TOKEN_PATTERN.findall((transcript or "").lower()))
+
+    def add_to_corpus(self, tokens: List[str]) -> None:
+        """Update document frequencies used for IDF"""
+        self._document_count += 1
+        self._document_frequency.update(set(tokens))
+
+    def _sentiment_from_tokens(self, tokens: List[str]) -> float:
+        """Score in [-1, 1]; a negation within two tokens flips a word's polarity"""
+        positive = negative = 0
+        for index, token in enumerate(tokens):
+            if token in POSITIVE_WORDS:
+                polarity = 1
+            elif token in NEGATIVE_WORDS:
+                polarity = -1
+            else:
+                continue
+            if any(previous in NEGATIONS for previous in tokens[max(0, index - 2):index]):
+                polarity = -polarity
+            if polarity > 0:
+                positive += 1
+            else:
+                negative += 1
+        total = positive + negative
+        if not total:
+            return 0.0
+        return (positive - negative) / total
+
+    def _topics_from_tokens(self, tokens: List[str]) -> List[str]:
+        terms = Counter(token for token in tokens if token not in STOPWORDS and len(token) > 2)
+        if not terms:
+            return []
+        documents = max(self._document_count, 1)
+        scores = {
+            term: (count / len(tokens)) * (math.log((documents + 1) / (self._document_frequency[term] + 1)) + 1)
+            for term, count in terms.items()
+        }
+        return sorted(scores, key=lambda term: (-scores[term], term))[:self.max_topics]
+
+    def _needs_deep_analysis(self, result: Dict[str, Any]) -> bool:
+        """Flag transcripts whose outcome the heuristics cannot settle"""
+        objection_count = sum(result['objections_handled'].values())
+        if objection_count >= self.deep_analysis_objections:
+            return True
+        # Mixed signals: buying interest alongside objections or negative tone
+        if result['buying_signals'] and (objection_count or result['sentiment_score'] < 0):
+            return True
+        return False
@@ -1,22 +1,84 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional, TYPE_CHECKING
 from datetime import datetime
 import json
-from contextlib import AbstractAsyncContextManager
-from supabase import create_client, Client
-from config.settings import SUPABASE_URL, SUPABASE_KEY
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from config.settings import get_settings
 from models.base import KnowledgeItem
+from models.lead import LeadStatus
 from .interfaces.database import DatabaseServiceInterface
+from .event_bus import (
+    CallAttemptRecorded, ChangeEvent, EventBus, LeadCreated, LeadStatusChanged, LeadUpdated, SaleCreated
+)
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+# Change events held back until the enclosing transaction commits
+_pending_events: ContextVar[Optional[List[ChangeEvent]]] = ContextVar('pending_change_events', default=None)
 
 class DatabaseService(DatabaseServiceInterface):
-    def __init__(self):
-        self.client: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    def __init__(self, client: Optional["Client"] = None, event_bus: Optional[EventBus] = None):
+        self._client = client
+        self.event_bus = event_bus
+
+    async def _emit(self, event: ChangeEvent) -> None:
+        """Publish a change event after the write, or at commit inside a transaction"""
+        if self.event_bus is None:
+            return
+        pending = _pending_events.get()
+        if pending is not None:
+            pending.append(event)
+        else:
+            await self.event_bus.publish(event)
+
+    @property
+    def client(self) -> "Client":
+        """Supabase client, created (and supabase imported) on first use"""
+        if self._client is None:
+            from supabase import create_client
+            settings = get_settings()
+            self._client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+        return self._client
 
     async def create_lead(self, lead_data: Dict[str, Any]) -> str:
         result = await self.client.table('leads').insert(lead_data).execute()
-        return result.data[0]['id']
+        row = result.data[0]
+        await self._emit(LeadCreated(lead_id=row['id'], lead=row))
+        return row['id']
+
+    async def create_leads(self, leads: List[Dict[str, Any]]) -> List[str]:
+        """Insert a batch of leads in one request"""
+        if not leads:
+            return []
+        result = await self.client.table('leads').insert(leads).execute()
+        for row in result.data:
+            await self._emit(LeadCreated(lead_id=row['id'], lead=row))
+        return [row['id'] for row in result.data]
 
     async def update_lead(self, lead_id: str, update_data: Dict[str, Any]) -> bool:
         await self.client.table('leads').update(update_data).eq('id', lead_id).execute()
+        await self._emit(LeadUpdated(lead_id=lead_id, changes=update_data))
+        return True
+
+    async def record_call_attempt(
+        self,
+        lead_id: str,
+        lead_data: Dict[str, Any],
+        attempt: Dict[str, Any]
+    ) -> bool:
+        """Store a lead with a newly appended call attempt"""
+        await self.client.table('leads').update(lead_data).eq('id', lead_id).execute()
+        await self._emit(CallAttemptRecorded(
+            lead_id=lead_id,
+            outcome=attempt['outcome'],
+            timestamp=_as_datetime(attempt['timestamp']),
+            next_attempt=_as_datetime(attempt.get('next_attempt_scheduled')),
+            agent_id=lead_data.get('assigned_agent_id')
+        ))
         return True
 
     async def get_lead(self, lead_id: str) -> Dict[str, Any]:
@@ -81,19 +143,99 @@ class DatabaseService(DatabaseServiceInterface):
         await self.client.table('metrics').insert(metric_data).execute()
         return True
 
-    async def transaction(self):
-        """Context manager for database transactions"""
-        return self.client.transaction()
+    async def get_metric_events(
+        self,
+        since: Optional[datetime] = None,
+        limit: int = 1000,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Page through tracked metric events in timestamp order"""
+        query = self.client.table('metrics').select('*')
+        if since:
+            query = query.gte('timestamp', since.isoformat())
+        result = await query.order('timestamp').range(offset, offset + limit - 1).execute()
+        return result.data
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """Context manager for database transactions
+        
+        Change events from writes inside the block are published once it
+        commits and discarded if it raises.
+        """
+        outer = _pending_events.get()
+        pending: List[ChangeEvent] = []
+        token = _pending_events.set(pending)
+        try:
+            async with self.client.transaction():
+                yield
+        finally:
+            _pending_events.reset(token)
+        if outer is not None:
+            # Nested block: the outermost transaction decides
+            outer.extend(pending)
+            return
+        for event in pending:
+            await self.event_bus.publish(event)
 
     async def update_lead_status(self, lead_id: str, status_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update lead status and return updated lead data"""
         result = await self.client.table('leads').update(status_data).eq('id', lead_id).execute()
-        return result.data[0] if result.data else None
+        row = result.data[0] if result.data else None
+        if row is not None:
+            await self._emit(LeadStatusChanged(
+                lead_id=lead_id,
+                new_status=row.get('status', status_data.get('status')),
+                old_status=status_data.get('current_status'),
+                agent_id=row.get('assigned_agent_id')
+            ))
+        return row
 
     async def create_sale(self, sale_data: Dict[str, Any]) -> str:
         """Create a new sale record"""
         result = await self.client.table('sales').insert(sale_data).execute()
-        return result.data[0]['id']
+        sale_id = result.data[0]['id']
+        await self._emit(SaleCreated(
+            sale_id=sale_id,
+            lead_id=sale_data.get('lead_id'),
+            agent_id=sale_data.get('agent_id'),
+            amount=float(sale_data.get('amount') or 0),
+            sale=sale_data
+        ))
+        return sale_id
+
+    async def get_sales(self, limit: int = 1000, offset: int = 0) -> List[Dict[str, Any]]:
+        """Page through closed sales"""
+        result = await self.client.table('sales').select('*').order('close_date').range(offset, offset + limit - 1).execute()
+        return result.data
+
+    async def get_leads(self, limit: int = 1000, offset: int = 0) -> List[Dict[str, Any]]:
+        """Page through leads, with only the columns the lead book and call queue keep"""
+        result = await self.client.table('leads').select(
+            'id,status,source,assigned_agent_id,estimated_value,last_contact,next_attempt,created_at'
+        ).order('created_at').range(offset, offset + limit - 1).execute()
+        return result.data
+
+    async def get_queued_leads(self, limit: int = 1000, offset: int = 0) -> List[Dict[str, Any]]:
+        """Page through open leads that have a next attempt scheduled"""
+        result = await self.client.table('leads').select(
+            'id,status,assigned_agent_id,next_attempt'
+        ).not_.is_('next_attempt', 'null').not_.in_(
+            'status', [LeadStatus.CLOSED_WON.value, LeadStatus.CLOSED_LOST.value]
+        ).order('id').range(offset, offset + limit - 1).execute()
+        return result.data
+
+    async def get_similar_deals(
+        self,
+        product_interest: Optional[str],
+        budget_range: Optional[Any] = None,
+        limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Query closed sales for the same product"""
+        if not product_interest:
+            return []
+        result = await self.client.table('sales').select('*').contains('products', [product_interest]).limit(limit).execute()
+        return result.data
 
     async def log_loss_reason(
         self,
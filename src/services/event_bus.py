@@ -0,0 +1,339 @@
+from typing import Dict, Any, Callable, ClassVar, Iterable, List, Optional, Set, Tuple, Type, Union
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from uuid import uuid4
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, kw_only=True)
+class ChangeEvent:
+    """A committed mutation of a lead, sale or metric"""
+    event_id: str = field(default_factory=lambda: uuid4().hex)
+    occurred_at: datetime = field(default_factory=datetime.utcnow)
+
+    _datetime_fields: ClassVar[Tuple[str, ...]] = ('occurred_at',)
+
+    @property
+    def event_type(self) -> str:
+        return type(self).__name__
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChangeEvent":
+        data = dict(data)
+        for name in cls._datetime_fields:
+            if isinstance(data.get(name), str):
+                data[name] = datetime.fromisoformat(data[name])
+        return cls(**data)
+
+
+@dataclass(frozen=True, kw_only=True)
+class LeadEvent(ChangeEvent):
+    lead_id: str
+
+    def lead_row(self) -> Dict[str, Any]:
+        """Partial lead row with the columns this event changed"""
+        return {'id': self.lead_id}
+
+
+@dataclass(frozen=True, kw_only=True)
+class LeadCreated(LeadEvent):
+    lead: Dict[str, Any]
+
+    def lead_row(self) -> Dict[str, Any]:
+        return {**self.lead, 'id': self.lead_id}
+
+
+@dataclass(frozen=True, kw_only=True)
+class LeadUpdated(LeadEvent):
+    changes: Dict[str, Any]
+
+    def lead_row(self) -> Dict[str, Any]:
+        return {**self.changes, 'id': self.lead_id}
+
+
+@dataclass(frozen=True, kw_only=True)
+class LeadStatusChanged(LeadEvent):
+    new_status: str
+    old_status: Optional[str] = None
+    agent_id: Optional[str] = None
+
+    def lead_row(self) -> Dict[str, Any]:
+        row = {'id': self.lead_id, 'status': self.new_status}
+        if self.agent_id is not None:
+            row['assigned_agent_id'] = self.agent_id
+        return row
+
+
+@dataclass(frozen=True, kw_only=True)
+class CallAttemptRecorded(LeadEvent):
+    outcome: str
+    timestamp: datetime
+    next_attempt: Optional[datetime] = None
+    agent_id: Optional[str] = None
+
+    _datetime_fields: ClassVar[Tuple[str, ...]] = ('occurred_at', 'timestamp', 'next_attempt')
+
+    def lead_row(self) -> Dict[str, Any]:
+        row = {'id': self.lead_id, 'last_contact': self.timestamp, 'next_attempt': self.next_attempt}
+        if self.agent_id is not None:
+            row['assigned_agent_id'] = self.agent_id
+        return row
+
+
+@dataclass(frozen=True, kw_only=True)
+class SaleCreated(ChangeEvent):
+    sale_id: str
+    lead_id: Optional[str] = None
+    agent_id: Optional[str] = None
+    amount: float = 0.0
+    sale: Dict[str, Any] = field(default_factory=dict)
+
+    def sale_row(self) -> Dict[str, Any]:
+        """The inserted sale row"""
+        return {**self.sale, 'id': self.sale_id}
+
+
+EVENT_TYPES: Dict[str, Type[ChangeEvent]] = {
+    event_class.__name__: event_class
+    for event_class in (LeadCreated, LeadUpdated, LeadStatusChanged, CallAttemptRecorded, SaleCreated)
+}
+LEAD_EVENTS = (LeadCreated, LeadUpdated, LeadStatusChanged, CallAttemptRecorded)
+
+EventTypes = Union[None, Type[ChangeEvent], Iterable[Type[ChangeEvent]]]
+Handler = Callable[[ChangeEvent], None]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, 'value'):
+        return value.value
+    raise TypeError(f"Cannot serialize {type(value).__name__} in a change event")
+
+
+def encode_event(event: ChangeEvent) -> str:
+    return json.dumps(event.to_dict(), default=_json_default)
+
+
+def decode_event(event_type: str, data: str) -> ChangeEvent:
+    return EVENT_TYPES[event_type].from_dict(json.loads(data))
+
+
+def _type_filter(event_types: EventTypes) -> Optional[Tuple[Type[ChangeEvent], ...]]:
+    if event_types is None:
+        return None
+    if isinstance(event_types, type):
+        return (event_types,)
+    return tuple(event_types)
+
+
+class Subscription:
+    """Bounded queue of events for one async consumer
+
+    A consumer that falls behind loses its oldest events rather than
+    blocking publishers; ``dropped`` counts them so it can resync.
+    """
+
+    def __init__(self, bus: "EventBus", event_types: EventTypes, maxsize: int):
+        self._bus = bus
+        self.event_types = _type_filter(event_types)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def matches(self, event: ChangeEvent) -> bool:
+        return self.event_types is None or isinstance(event, self.event_types)
+
+    def offer(self, event: ChangeEvent) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            if self.dropped == 1:
+                logger.warning("Event subscriber is falling behind; dropping oldest events")
+        self.queue.put_nowait(event)
+
+    async def get(self) -> ChangeEvent:
+        return await self.queue.get()
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> ChangeEvent:
+        return await self.queue.get()
+
+    def close(self) -> None:
+        self._bus.unsubscribe(self)
+
+
+class RedisStreamTransport:
+    """Carries change events between workers over a Redis stream
+
+    Every worker appends its events to one capped stream and tails it for
+    events from the others; its own entries are skipped because they were
+    already delivered in-process. Delivery is at-most-once: a worker only
+    sees entries added while it is reading.
+    """
+
+    def __init__(
+        self,
+        redis_client: Any,
+        stream: str = 'attyx:events',
+        maxlen: int = 100_000,
+        block_ms: int = 5000
+    ):
+        self.redis = redis_client
+        self.stream = stream
+        self.maxlen = maxlen
+        self.block_ms = block_ms
+        self.origin = uuid4().hex
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisStreamTransport":
+        # Imported here: redis is only needed in distributed mode
+        import redis.asyncio as redis_asyncio
+        return cls(redis_asyncio.from_url(url), **kwargs)
+
+    async def send(self, event: ChangeEvent) -> None:
+        await self.redis.xadd(
+            self.stream,
+            {'type': event.event_type, 'origin': self.origin, 'data': encode_event(event)},
+            maxlen=self.maxlen,
+            approximate=True
+        )
+
+    async def receive(self, deliver: Handler) -> None:
+        """Deliver events from other workers until cancelled"""
+        last_id: Union[str, bytes] = '$'
+        while True:
+            response = await self.redis.xread({self.stream: last_id}, count=100, block=self.block_ms)
+            for _, entries in response or []:
+                for entry_id, fields in entries:
+                    last_id = entry_id
+                    fields = {_text(key): _text(value) for key, value in fields.items()}
+                    if fields.get('origin') != self.origin:
+                        deliver(decode_event(fields['type'], fields['data']))
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+def _text(value: Union[str, bytes]) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class InMemoryTransport:
+    """Stand-in for RedisStreamTransport in tests
+
+    Transports created on the same ``stream`` list behave like workers
+    sharing a Redis stream, including the JSON round trip.
+    """
+
+    def __init__(self, stream: Optional[List[Tuple[str, str, str]]] = None):
+        self.stream = stream if stream is not None else []
+        self.origin = uuid4().hex
+        self.poll_interval = 0.001
+
+    def peer(self) -> "InMemoryTransport":
+        """Another worker's transport on the same stream"""
+        return InMemoryTransport(self.stream)
+
+    async def send(self, event: ChangeEvent) -> None:
+        self.stream.append((self.origin, event.event_type, encode_event(event)))
+
+    async def receive(self, deliver: Handler) -> None:
+        position = len(self.stream)
+        while True:
+            while position < len(self.stream):
+                origin, event_type, data = self.stream[position]
+                position += 1
+                if origin != self.origin:
+                    deliver(decode_event(event_type, data))
+            await asyncio.sleep(self.poll_interval)
+
+    async def close(self) -> None:
+        pass
+
+
+class EventBus:
+    """In-process fan-out of change events, optionally shared across workers
+
+    Handlers run inline on publish and must be cheap (in-memory indexes,
+    cache invalidation); slower consumers take a bounded Subscription and
+    process events at their own pace. With a transport, published events
+    are also sent to other workers and theirs are delivered here.
+    """
+
+    def __init__(self, transport: Optional[Any] = None, subscriber_queue_size: int = 1000):
+        self.transport = transport
+        self.subscriber_queue_size = subscriber_queue_size
+        self._handlers: List[Tuple[Optional[Tuple[Type[ChangeEvent], ...]], Handler]] = []
+        self._subscriptions: Set[Subscription] = set()
+        self._receiver: Optional[asyncio.Task] = None
+        self.events_published = 0
+
+    def add_handler(self, handler: Handler, event_types: EventTypes = None) -> None:
+        """Call handler synchronously for every matching event"""
+        self._handlers.append((_type_filter(event_types), handler))
+
+    def subscribe(self, event_types: EventTypes = None, maxsize: Optional[int] = None) -> Subscription:
+        subscription = Subscription(self, event_types, maxsize or self.subscriber_queue_size)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    async def publish(self, event: ChangeEvent) -> None:
+        """Deliver an event locally, then send it to other workers"""
+        self.events_published += 1
+        self.deliver(event)
+        if self.transport is not None:
+            try:
+                await self.transport.send(event)
+            except Exception as e:
+                # Local consumers already have it; other workers resync on reconcile
+                logger.error(f"Error sending {event.event_type} to other workers: {e}")
+
+    def deliver(self, event: ChangeEvent) -> None:
+        for event_types, handler in self._handlers:
+            if event_types is None or isinstance(event, event_types):
+                try:
+                    handler(event)
+                except Exception as e:
+                    logger.error(f"Error handling {event.event_type}: {e}")
+        for subscription in list(self._subscriptions):
+            if subscription.matches(event):
+                subscription.offer(event)
+
+    async def start(self) -> None:
+        """Start receiving events from other workers"""
+        if self.transport is not None and (self._receiver is None or self._receiver.done()):
+            self._receiver = asyncio.create_task(self._receive())
+
+    async def _receive(self, retry_delay: float = 1.0) -> None:
+        while True:
+            try:
+                await self.transport.receive(self.deliver)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event transport receive failed, retrying: {e}")
+                await asyncio.sleep(retry_delay)
+
+    async def close(self) -> None:
+        if self._receiver is not None:
+            self._receiver.cancel()
+            try:
+                await self._receiver
+            except asyncio.CancelledError:
+                pass
+            self._receiver = None
+        if self.transport is not None:
+            await self.transport.close()
+
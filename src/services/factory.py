@@ -1,16 +1,59 @@
-from typing import Optional, Type, TypeVar
+from typing import Any, Dict, Optional, Type, TypeVar
+import threading
 from .interfaces.database import DatabaseServiceInterface
 from .interfaces.notification import NotificationServiceInterface
 from .database_service import DatabaseService
 from .notification_service import NotificationService
+from .metrics_aggregator import MetricsAggregator
+from .snapshot_service import DashboardSnapshotService
+from .insights_cache import InsightsCache
+from .conversation_analysis import IncrementalConversationAnalyzer
+from .similar_deals import SimilarDealsIndex
+from .rate_limiter import RateLimiter, RedisBucketBackend
+from .request_coalescer import RequestCoalescer
+from .cadence_planner import CadencePlanner
+from .lead_import import LeadImporter
+from .lead_book import LeadBook
+from .event_bus import EventBus, RedisStreamTransport
+from .live_queue import LiveCallQueue
+from .realtime_gateway import RealtimeGateway
+from .pipeline_view import PipelineView
+from config.settings import get_settings
+from utils.business_calendar import BusinessCalendar
+from utils.contact_normalizer import ContactNormalizer
 
 T = TypeVar('T')
 
 class ServiceFactory:
-    """Factory for creating service instances with dependency injection support"""
+    """Factory for creating service instances with dependency injection support
     
+    Getters are thread-safe: the agents warmup builds agents in a worker
+    thread while other warmup steps fetch services on the event loop.
+    Agents have their own lock so a slow agent build does not hold up
+    service lookups.
+    """
+    
+    _lock = threading.RLock()
+    _agents_lock = threading.RLock()
     _database_service: Optional[DatabaseServiceInterface] = None
     _notification_service: Optional[NotificationServiceInterface] = None
+    _metrics_aggregator: Optional[MetricsAggregator] = None
+    _snapshot_service: Optional[DashboardSnapshotService] = None
+    _insights_cache: Optional[InsightsCache] = None
+    _conversation_analyzer: Optional[IncrementalConversationAnalyzer] = None
+    _similar_deals_index: Optional[SimilarDealsIndex] = None
+    _analytics_service: Optional[Any] = None
+    _api_service: Optional[Any] = None
+    _rate_limiter: Optional[RateLimiter] = None
+    _request_coalescer: Optional[RequestCoalescer] = None
+    _business_calendar: Optional[BusinessCalendar] = None
+    _cadence_planner: Optional[CadencePlanner] = None
+    _contact_normalizer: Optional[ContactNormalizer] = None
+    _lead_book: Optional[LeadBook] = None
+    _event_bus: Optional[EventBus] = None
+    _live_queue: Optional[LiveCallQueue] = None
+    _realtime_gateway: Optional[RealtimeGateway] = None
+    _agents: Dict[type, Any] = {}
     
     @classmethod
     def get_database_service(
@@ -25,10 +68,35 @@ class ServiceFactory:
         Returns:
             Database service instance
         """
-        if not cls._database_service:
-            service_class = implementation or DatabaseService
-            cls._database_service = service_class()
-        return cls._database_service
+        with cls._lock:
+            if not cls._database_service:
+                service_class = implementation or DatabaseService
+                if issubclass(service_class, DatabaseService):
+                    cls._database_service = service_class(event_bus=cls.get_event_bus())
+                else:
+                    cls._database_service = service_class()
+            return cls._database_service
+        
+    @classmethod
+    def get_event_bus(cls) -> EventBus:
+        """Get the change event bus configured from settings
+        
+        Returns:
+            Shared EventBus; with the redis backend it also carries
+            events between workers over a Redis stream
+        """
+        with cls._lock:
+            if not cls._event_bus:
+                settings = get_settings()
+                transport = None
+                if settings.EVENT_BUS_BACKEND == "redis":
+                    transport = RedisStreamTransport.from_url(
+                        settings.REDIS_URL,
+                        stream=settings.EVENT_STREAM,
+                        maxlen=settings.EVENT_STREAM_MAXLEN
+                    )
+                cls._event_bus = EventBus(transport, subscriber_queue_size=settings.EVENT_SUBSCRIBER_QUEUE_SIZE)
+            return cls._event_bus
         
     @classmethod
     def get_notification_service(
@@ -43,10 +111,242 @@ class ServiceFactory:
         Returns:
             Notification service instance
         """
-        if not cls._notification_service:
-            service_class = implementation or NotificationService
-            cls._notification_service = service_class()
-        return cls._notification_service
+        with cls._lock:
+            if not cls._notification_service:
+                service_class = implementation or NotificationService
+                cls._notification_service = service_class()
+            return cls._notification_service
+        
+    @classmethod
+    def get_metrics_aggregator(cls) -> MetricsAggregator:
+        """Get the process-wide metrics aggregator
+        
+        Returns:
+            Shared metrics aggregator instance
+        """
+        with cls._lock:
+            if not cls._metrics_aggregator:
+                cls._metrics_aggregator = MetricsAggregator()
+            return cls._metrics_aggregator
+        
+    @classmethod
+    def get_snapshot_service(cls) -> DashboardSnapshotService:
+        """Get the process-wide dashboard snapshot service
+        
+        Returns:
+            Shared snapshot service instance
+        """
+        with cls._lock:
+            if not cls._snapshot_service:
+                cls._snapshot_service = DashboardSnapshotService()
+            return cls._snapshot_service
+        
+    @classmethod
+    def get_insights_cache(cls) -> InsightsCache:
+        """Get the process-wide sales insights cache
+        
+        Returns:
+            Shared insights cache configured from settings
+        """
+        with cls._lock:
+            if not cls._insights_cache:
+                settings = get_settings()
+                cls._insights_cache = InsightsCache(
+                    ttl=settings.INSIGHTS_CACHE_TTL,
+                    stale_ttl=settings.INSIGHTS_STALE_TTL
+                )
+            return cls._insights_cache
+        
+    @classmethod
+    def get_conversation_analyzer(cls) -> IncrementalConversationAnalyzer:
+        """Get the process-wide incremental conversation analyzer
+        
+        Returns:
+            Shared analyzer holding the chunk cache and per-lead summaries
+        """
+        with cls._lock:
+            if not cls._conversation_analyzer:
+                cls._conversation_analyzer = IncrementalConversationAnalyzer()
+            return cls._conversation_analyzer
+        
+    @classmethod
+    def get_similar_deals_index(cls) -> SimilarDealsIndex:
+        """Get the process-wide similar deals index
+        
+        Returns:
+            Shared index, empty until rebuilt from the sales table
+        """
+        with cls._lock:
+            if not cls._similar_deals_index:
+                cls._similar_deals_index = SimilarDealsIndex()
+            return cls._similar_deals_index
+        
+    @classmethod
+    def get_analytics_service(cls) -> Any:
+        """Get the process-wide analytics service
+        
+        Returns:
+            Shared AnalyticsService instance
+        """
+        with cls._lock:
+            if not cls._analytics_service:
+                # Imported here: analytics_service depends on this factory
+                from .analytics_service import AnalyticsService
+                cls._analytics_service = AnalyticsService()
+            return cls._analytics_service
+        
+    @classmethod
+    def get_rate_limiter(cls) -> RateLimiter:
+        """Get the upstream rate limiter configured from settings
+        
+        Returns:
+            Shared RateLimiter instance
+        """
+        with cls._lock:
+            if not cls._rate_limiter:
+                settings = get_settings()
+                backend = None
+                if settings.RATE_LIMIT_BACKEND == "redis":
+                    backend = RedisBucketBackend.from_url(settings.REDIS_URL)
+                tenant_limit = None
+                if settings.RATE_LIMIT_TENANT_CALLS:
+                    tenant_limit = (settings.RATE_LIMIT_TENANT_CALLS, settings.RATE_LIMIT_WINDOW)
+                cls._rate_limiter = RateLimiter(
+                    calls=settings.RATE_LIMIT_CALLS,
+                    window=settings.RATE_LIMIT_WINDOW,
+                    tenant_limit=tenant_limit,
+                    reserve_fraction=settings.RATE_LIMIT_RESERVE,
+                    backend=backend
+                )
+            return cls._rate_limiter
+        
+    @classmethod
+    def get_request_coalescer(cls) -> RequestCoalescer:
+        """Get the single-flight layer shared by all LLM callers
+        
+        Returns:
+            Shared RequestCoalescer instance
+        """
+        with cls._lock:
+            if not cls._request_coalescer:
+                cls._request_coalescer = RequestCoalescer()
+            return cls._request_coalescer
+        
+    @classmethod
+    def get_business_calendar(cls) -> BusinessCalendar:
+        """Get the business-hours calendar configured from settings
+        
+        Returns:
+            Shared BusinessCalendar instance
+        """
+        with cls._lock:
+            if not cls._business_calendar:
+                cls._business_calendar = BusinessCalendar.from_settings(get_settings())
+            return cls._business_calendar
+        
+    @classmethod
+    def get_cadence_planner(cls) -> CadencePlanner:
+        """Get the call-attempt planner on the shared business calendar
+        
+        Returns:
+            Shared CadencePlanner instance
+        """
+        with cls._lock:
+            if not cls._cadence_planner:
+                cls._cadence_planner = CadencePlanner.from_settings(get_settings(), cls.get_business_calendar())
+            return cls._cadence_planner
+        
+    @classmethod
+    def get_lead_importer(cls) -> LeadImporter:
+        """Get a streaming lead importer writing through the database service
+        
+        Returns:
+            LeadImporter instance; a fresh one per call, sharing the
+            process-wide contact normalizer and its parse cache
+        """
+        with cls._lock:
+            if not cls._contact_normalizer:
+                cls._contact_normalizer = ContactNormalizer()
+            return LeadImporter(
+                cls.get_database_service(),
+                batch_size=get_settings().IMPORT_BATCH_SIZE,
+                normalizer=cls._contact_normalizer
+            )
+        
+    @classmethod
+    def get_lead_book(cls) -> LeadBook:
+        """Get the process-wide columnar lead book
+        
+        Returns:
+            Shared LeadBook, empty until loaded from the leads table
+        """
+        with cls._lock:
+            # Compared with None: an empty book is falsy
+            if cls._lead_book is None:
+                cls._lead_book = LeadBook()
+            return cls._lead_book
+        
+    @classmethod
+    def get_pipeline_view(cls) -> PipelineView:
+        """Get pipeline queries over the shared lead book
+        
+        Returns:
+            PipelineView instance
+        """
+        return PipelineView(cls.get_lead_book())
+        
+    @classmethod
+    def get_live_queue(cls) -> LiveCallQueue:
+        """Get the process-wide in-memory call queue
+        
+        Returns:
+            Shared LiveCallQueue, empty until loaded from the leads table
+        """
+        with cls._lock:
+            if cls._live_queue is None:
+                cls._live_queue = LiveCallQueue()
+            return cls._live_queue
+        
+    @classmethod
+    def get_realtime_gateway(cls) -> RealtimeGateway:
+        """Get the WebSocket push gateway
+        
+        Returns:
+            Shared RealtimeGateway instance
+        """
+        with cls._lock:
+            if cls._realtime_gateway is None:
+                cls._realtime_gateway = RealtimeGateway(batch_window=get_settings().REALTIME_BATCH_WINDOW)
+            return cls._realtime_gateway
+        
+    @classmethod
+    def get_api_service(cls) -> Any:
+        """Get the process-wide API service and its pooled HTTP client
+        
+        Returns:
+            Shared APIService instance
+        """
+        with cls._lock:
+            if not cls._api_service:
+                from .api_service import APIService
+                cls._api_service = APIService(coalescer=cls.get_request_coalescer())
+            return cls._api_service
+        
+    @classmethod
+    def get_agent(cls, agent_class: Type[T]) -> T:
+        """Get the process-wide instance of an agent, constructing it on first use
+        
+        Args:
+            agent_class: Agent class to build with its default arguments
+            
+        Returns:
+            Cached agent instance
+        """
+        with cls._agents_lock:
+            agent = cls._agents.get(agent_class)
+            if agent is None:
+                agent = cls._agents[agent_class] = agent_class()
+            return agent
         
     @classmethod
     def set_service_implementation(cls, interface_type: Type[T], implementation: T) -> None:
@@ -60,11 +360,68 @@ class ServiceFactory:
             cls._database_service = implementation
         elif issubclass(interface_type, NotificationServiceInterface):
             cls._notification_service = implementation
+        elif issubclass(interface_type, MetricsAggregator):
+            cls._metrics_aggregator = implementation
+        elif issubclass(interface_type, DashboardSnapshotService):
+            cls._snapshot_service = implementation
+        elif issubclass(interface_type, InsightsCache):
+            cls._insights_cache = implementation
+        elif issubclass(interface_type, IncrementalConversationAnalyzer):
+            cls._conversation_analyzer = implementation
+        elif issubclass(interface_type, SimilarDealsIndex):
+            cls._similar_deals_index = implementation
+        elif issubclass(interface_type, RateLimiter):
+            cls._rate_limiter = implementation
+        elif issubclass(interface_type, RequestCoalescer):
+            cls._request_coalescer = implementation
+        elif issubclass(interface_type, BusinessCalendar):
+            cls._business_calendar = implementation
+        elif issubclass(interface_type, CadencePlanner):
+            cls._cadence_planner = implementation
+        elif issubclass(interface_type, LeadBook):
+            cls._lead_book = implementation
+        elif issubclass(interface_type, EventBus):
+            cls._event_bus = implementation
+        elif issubclass(interface_type, LiveCallQueue):
+            cls._live_queue = implementation
+        elif issubclass(interface_type, RealtimeGateway):
+            cls._realtime_gateway = implementation
         else:
             raise ValueError(f"Unknown service type: {interface_type}")
             
+    @classmethod
+    async def close(cls) -> None:
+        """Close pooled clients held by services created so far"""
+        if cls._snapshot_service:
+            await cls._snapshot_service.close()
+        if cls._api_service:
+            await cls._api_service.close()
+        if cls._live_queue is not None:
+            await cls._live_queue.close()
+        if cls._realtime_gateway is not None:
+            await cls._realtime_gateway.close()
+        if cls._event_bus:
+            await cls._event_bus.close()
+            
     @classmethod
     def reset(cls) -> None:
         """Reset all service instances (useful for testing)"""
         cls._database_service = None
         cls._notification_service = None
+        cls._metrics_aggregator = None
+        cls._snapshot_service = None
+        cls._insights_cache = None
+        cls._conversation_analyzer = None
+        cls._similar_deals_index = None
+        cls._analytics_service = None
+        cls._api_service = None
+        cls._rate_limiter = None
+        cls._request_coalescer = None
+        cls._business_calendar = None
+        cls._cadence_planner = None
+        cls._contact_normalizer = None
+        cls._lead_book = None
+        cls._event_bus = None
+        cls._live_queue = None
+        cls._realtime_gateway = None
+        cls._agents = {}
@@ -0,0 +1,95 @@
+from typing import Dict, Any, List, Sequence
+from dataclasses import dataclass
+import numpy as np
+
+# Weights for the close-probability factors, in column order
+CLOSE_PROBABILITY_FACTORS = (
+    'budget_match',
+    'decision_maker',
+    'timeline_match',
+    'engagement_score',
+    'objections_handled'
+)
+CLOSE_PROBABILITY_WEIGHTS = np.array([0.3, 0.2, 0.15, 0.2, 0.15])
+
+
+@dataclass
+class PipelineForecast:
+    """Close probabilities and expected revenue for a batch of leads"""
+    probabilities: np.ndarray
+    expected_revenue: np.ndarray
+    revenue_by_agent: Dict[str, float]
+    revenue_by_stage: Dict[str, float]
+
+    @property
+    def total_expected_revenue(self) -> float:
+        return float(self.expected_revenue.sum())
+
+
+def _column(leads: Sequence[Dict[str, Any]], key: str) -> np.ndarray:
+    return np.fromiter(
+        (float(lead.get(key) or 0) for lead in leads),
+        dtype=np.float64,
+        count=len(leads)
+    )
+
+
+def close_probability_factors(leads: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """Build the (leads x factors) matrix of unweighted factor scores"""
+    factors = np.empty((len(leads), len(CLOSE_PROBABILITY_FACTORS)), dtype=np.float64)
+    factors[:, 0] = _column(leads, 'budget_sufficient') != 0
+    factors[:, 1] = _column(leads, 'is_decision_maker') != 0
+    factors[:, 2] = _column(leads, 'timeline_match') != 0
+    factors[:, 3] = np.minimum(_column(leads, 'engagement_score') / 100, 1)
+
+    # A lead with no recorded objections keeps the single-lead default denominator of 1
+    total_objections = np.fromiter(
+        (float(lead.get('total_objections', 1) or 0) for lead in leads),
+        dtype=np.float64,
+        count=len(leads)
+    )
+    factors[:, 4] = np.minimum(
+        _column(leads, 'resolved_objections') / np.maximum(total_objections, 1),
+        1
+    )
+    return factors
+
+
+def predict_close_probabilities(leads: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """Score every lead at once; the result is aligned to the input order"""
+    if not leads:
+        return np.zeros(0, dtype=np.float64)
+    return close_probability_factors(leads) @ CLOSE_PROBABILITY_WEIGHTS
+
+
+def _rollup(keys: List[Any], values: np.ndarray) -> Dict[str, float]:
+    labels, codes = np.unique(
+        np.array([str(getattr(key, 'value', key)) for key in keys], dtype=object),
+        return_inverse=True
+    )
+    sums = np.bincount(codes.astype(np.intp), weights=values, minlength=len(labels))
+    return {label: float(total) for label, total in zip(labels, sums)}
+
+
+def forecast_pipeline(leads: Sequence[Dict[str, Any]]) -> PipelineForecast:
+    """Score leads and roll expected revenue up per agent and per stage
+
+    Leads without an assigned agent are grouped under "unassigned".
+    """
+    probabilities = predict_close_probabilities(leads)
+    expected_revenue = probabilities * _column(leads, 'estimated_value')
+    if not len(leads):
+        return PipelineForecast(probabilities, expected_revenue, {}, {})
+
+    return PipelineForecast(
+        probabilities=probabilities,
+        expected_revenue=expected_revenue,
+        revenue_by_agent=_rollup(
+            [lead.get('assigned_agent_id') or 'unassigned' for lead in leads],
+            expected_revenue
+        ),
+        revenue_by_stage=_rollup(
+            [lead.get('status') or 'unknown' for lead in leads],
+            expected_revenue
+        )
+    )
@@ -0,0 +1,245 @@
+from typing import Dict, Any, Callable, Optional
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import asyncio
+import logging
+import random
+import time
+import httpx
+from exceptions import CircuitOpenError, UpstreamError
+
+logger = logging.getLogger(__name__)
+
+# Per-endpoint request timeouts in seconds (connect timeout is shared)
+ENDPOINT_TIMEOUTS: Dict[str, float] = {
+    'embeddings': 10.0,
+    'completions': 60.0,
+    'property_info': 10.0,
+    'credit_check': 15.0,
+    'utility_rates': 10.0
+}
+DEFAULT_TIMEOUT = 30.0
+CONNECT_TIMEOUT = 5.0
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parse a Retry-After header given as seconds or an HTTP date"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+@dataclass
+class RetryPolicy:
+    """Retries for 429/5xx and transport errors with full-jitter backoff"""
+    max_retries: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            # The server's hint wins, within our own ceiling
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one upstream
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast for ``reset_timeout`` seconds. Then a single trial call
+    is let through (half-open); its outcome closes or re-opens the circuit,
+    and a trial without an outcome is released for the next caller.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return 'closed'
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half_open' and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._trial_in_flight or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """End a call that says nothing about the upstream's health
+
+        A half-open trial is handed to the next caller instead of keeping
+        the circuit waiting for an outcome that will never be recorded.
+        """
+        self._trial_in_flight = False
+
+
+class ResilientHTTPClient:
+    """Process-wide pooled HTTP client with timeouts, retries and circuit breaking
+
+    One httpx.AsyncClient (HTTP/2 when available) is shared by every caller.
+    Each request names an endpoint, which selects its timeout and its circuit
+    breaker, so a degraded upstream sheds load without affecting others.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        retry_policy: Optional[RetryPolicy] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        endpoint_timeouts: Optional[Dict[str, float]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        http2: Optional[bool] = None
+    ):
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.endpoint_timeouts = {**ENDPOINT_TIMEOUTS, **(endpoint_timeouts or {})}
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.client = httpx.AsyncClient(
+            http2=http2_available() if http2 is None else http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            timeout=httpx.Timeout(DEFAULT_TIMEOUT, connect=CONNECT_TIMEOUT),
+            transport=transport
+        )
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker(
+                self.failure_threshold, self.reset_timeout
+            )
+        return breaker
+
+    def timeout_for(self, endpoint: str) -> httpx.Timeout:
+        return httpx.Timeout(self.endpoint_timeouts.get(endpoint, DEFAULT_TIMEOUT), connect=CONNECT_TIMEOUT)
+
+    async def request(self, endpoint: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request, retrying 429/5xx and transport errors
+
+        Args:
+            endpoint: Logical endpoint name selecting timeout and circuit breaker
+            method: HTTP method
+            url: Request URL
+            **kwargs: Passed through to httpx
+
+        Returns:
+            The successful response
+
+        Raises:
+            CircuitOpenError: The endpoint's circuit is open
+            UpstreamError: The request failed after all retries
+        """
+        breaker = self.breaker(endpoint)
+        kwargs.setdefault('timeout', self.timeout_for(endpoint))
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {endpoint}")
+
+            retry_after = None
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                breaker.record_failure()
+                error: UpstreamError = UpstreamError(f"{endpoint} request failed", original_error=e)
+            except BaseException:
+                # Cancelled, or failed on our side (bad URL, undecodable body)
+                breaker.release_trial()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    if response.status_code >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                    if response.is_error:
+                        raise UpstreamError(
+                            f"{endpoint} returned {response.status_code}",
+                            status_code=response.status_code
+                        )
+                    return response
+                if response.status_code == 429:
+                    # Throttling is retried but does not count against the circuit
+                    breaker.release_trial()
+                else:
+                    breaker.record_failure()
+                retry_after = retry_after_seconds(response)
+                error = UpstreamError(
+                    f"{endpoint} returned {response.status_code}",
+                    status_code=response.status_code
+                )
+
+            if attempt >= self.retry_policy.max_retries:
+                raise error
+            delay = self.retry_policy.backoff(attempt, retry_after)
+            logger.warning(f"Retrying {endpoint} in {delay:.2f}s after: {error}")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def post(self, endpoint: str, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request(endpoint, 'POST', url, **kwargs)
+
+    async def get(self, endpoint: str, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request(endpoint, 'GET', url, **kwargs)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
@@ -0,0 +1,163 @@
+from typing import Dict, Any, Awaitable, Callable, Optional
+from dataclasses import dataclass
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(data: Any) -> str:
+    """Stable hash of a JSON-serializable payload"""
+    encoded = json.dumps(data, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+@dataclass
+class CachedInsights:
+    value: Any
+    input_hash: str
+    created_at: float
+
+
+class InsightsCache:
+    """TTL cache for LLM-generated insights with stale-while-revalidate
+
+    Entries are keyed by timeframe and remember the hash of the metrics they
+    were generated from. An entry is fresh while it is younger than ``ttl``
+    and the metrics are unchanged. Otherwise, for up to ``stale_ttl`` more
+    seconds, the old value is served while a background refresh runs. Past
+    that, callers wait for a new value. Concurrent computations for the same
+    timeframe share a single LLM call.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 900,
+        stale_ttl: float = 3600,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries: Dict[str, CachedInsights] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'shared_calls': 0,
+            'refreshes': 0,
+            'refresh_errors': 0,
+            'refresh_seconds_total': 0.0,
+            'last_refresh_seconds': 0.0
+        }
+
+    async def get(
+        self,
+        timeframe: str,
+        metrics: Any,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return insights for the timeframe, calling compute only when needed
+
+        Args:
+            timeframe: Cache key, e.g. "7d"
+            metrics: Input payload the insights are generated from
+            compute: Coroutine factory that calls the LLM
+        """
+        input_hash = content_hash(metrics)
+        entry = self._entries.get(timeframe)
+        now = self._clock()
+
+        if entry is not None:
+            age = now - entry.created_at
+            if age < self.ttl and entry.input_hash == input_hash:
+                self._stats['hits'] += 1
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self._stats['stale_hits'] += 1
+                if timeframe not in self._inflight:
+                    self._start_refresh(timeframe, input_hash, compute).add_done_callback(
+                        self._log_background_error
+                    )
+                return entry.value
+
+        self._stats['misses'] += 1
+        return await self._refresh(timeframe, input_hash, compute)
+
+    def invalidate(self, timeframe: Optional[str] = None) -> None:
+        """Drop one timeframe, or every entry when timeframe is None"""
+        if timeframe is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(timeframe, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and refresh latency"""
+        refreshes = self._stats['refreshes']
+        return {
+            **self._stats,
+            'entries': len(self._entries),
+            'avg_refresh_seconds': (
+                self._stats['refresh_seconds_total'] / refreshes if refreshes else 0.0
+            )
+        }
+
+    async def _refresh(
+        self,
+        timeframe: str,
+        input_hash: str,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Wait for a new value, sharing the call with concurrent requests"""
+        return await asyncio.shield(self._start_refresh(timeframe, input_hash, compute))
+
+    def _start_refresh(
+        self,
+        timeframe: str,
+        input_hash: str,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Future:
+        task = self._inflight.get(timeframe)
+        if task is not None:
+            self._stats['shared_calls'] += 1
+            return task
+        # A separate task, so a cancelled caller cannot strand the others waiting on it
+        task = asyncio.ensure_future(self._compute(timeframe, input_hash, compute))
+        self._inflight[timeframe] = task
+        task.add_done_callback(lambda done: self._finish_refresh(timeframe, done))
+        return task
+
+    async def _compute(
+        self,
+        timeframe: str,
+        input_hash: str,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        started = self._clock()
+        try:
+            value = await compute()
+        except Exception:
+            self._stats['refresh_errors'] += 1
+            raise
+        elapsed = self._clock() - started
+        self._stats['refreshes'] += 1
+        self._stats['refresh_seconds_total'] += elapsed
+        self._stats['last_refresh_seconds'] = elapsed
+        self._entries[timeframe] = CachedInsights(value, input_hash, self._clock())
+        return value
+
+    def _finish_refresh(self, timeframe: str, task: asyncio.Future) -> None:
+        if self._inflight.get(timeframe) is task:
+            del self._inflight[timeframe]
+        if not task.cancelled():
+            # Mark retrieved so a failure nobody is left to await does not warn
+            task.exception()
+
+    @staticmethod
+    def _log_background_error(task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background insights refresh failed: {task.exception()}")
@@ -11,11 +11,24 @@ class DatabaseServiceInterface(ABC):
         """Create a new lead record"""
         pass
         
+    async def create_leads(self, leads: List[Dict[str, Any]]) -> List[str]:
+        """Create several lead records; implementations may batch the insert"""
+        return [await self.create_lead(lead) for lead in leads]
+        
     @abstractmethod
     async def update_lead(self, lead_id: str, update_data: Dict[str, Any]) -> bool:
         """Update an existing lead"""
         pass
         
+    async def record_call_attempt(
+        self,
+        lead_id: str,
+        lead_data: Dict[str, Any],
+        attempt: Dict[str, Any]
+    ) -> bool:
+        """Store a lead with a newly appended call attempt"""
+        return await self.update_lead(lead_id, lead_data)
+        
     @abstractmethod
     async def get_lead(self, lead_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve a lead by ID"""
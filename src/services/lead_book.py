@@ -0,0 +1,336 @@
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Union
+from datetime import datetime
+import logging
+import numpy as np
+from models.lead_record import SOURCE_CODES, SOURCES, STATUS_CODES, STATUSES, to_epoch_us
+
+logger = logging.getLogger(__name__)
+
+NEVER = np.iinfo(np.int64).min  # last_contact of leads never contacted
+NO_AGENT = -1
+GROUP_COLUMNS = ('status', 'source', 'agent')
+
+EnumFilter = Union[None, str, Any, Sequence[Any]]
+
+
+def _epoch_seconds(value: Any) -> int:
+    micros = to_epoch_us(value)
+    return NEVER if micros is None else micros // 1_000_000
+
+
+def _enum_value(value: Any) -> str:
+    return value.value if hasattr(value, 'value') else value
+
+
+class LeadBook:
+    """Columnar in-process copy of the leads table for pipeline queries
+
+    Each lead is a row in NumPy columns: status and source codes, agent
+    code, estimated value (NaN when unknown), last contact and creation
+    time in epoch seconds. Every status and source value also has a packed
+    bitmap, so enum filters are byte-wise ORs/ANDs that are then narrowed
+    by vectorized comparisons on the numeric columns. Rows are updated in
+    place from lead change events; removed rows are cleared from the
+    bitmaps and reused.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._initial_capacity = max(capacity, 8)
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def clear(self) -> None:
+        self._size = 0
+        self._capacity = 0
+        self._free: List[int] = []
+        self._rows: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._agents: List[str] = []
+        self._agent_codes: Dict[str, int] = {}
+        self.status = np.empty(0, dtype=np.int8)
+        self.source = np.empty(0, dtype=np.int8)
+        self.agent = np.empty(0, dtype=np.int32)
+        self.value = np.empty(0, dtype=np.float64)
+        self.last_contact = np.empty(0, dtype=np.int64)
+        self.created_at = np.empty(0, dtype=np.int64)
+        self._status_bitmaps = np.zeros((len(STATUSES), 0), dtype=np.uint8)
+        self._source_bitmaps = np.zeros((len(SOURCES), 0), dtype=np.uint8)
+        self._grow(self._initial_capacity)
+
+    def _grow(self, capacity: int) -> None:
+        # Whole bytes of bitmap per row block
+        capacity = -(-capacity // 8) * 8
+        added = capacity - self._capacity
+
+        def extend(column: np.ndarray, fill: Any) -> np.ndarray:
+            return np.concatenate([column, np.full(added, fill, dtype=column.dtype)])
+
+        def extend_bitmaps(bitmaps: np.ndarray) -> np.ndarray:
+            return np.concatenate([bitmaps, np.zeros((len(bitmaps), added // 8), dtype=np.uint8)], axis=1)
+
+        self.status = extend(self.status, -1)
+        self.source = extend(self.source, -1)
+        self.agent = extend(self.agent, NO_AGENT)
+        self.value = extend(self.value, np.nan)
+        self.last_contact = extend(self.last_contact, NEVER)
+        self.created_at = extend(self.created_at, NEVER)
+        self._status_bitmaps = extend_bitmaps(self._status_bitmaps)
+        self._source_bitmaps = extend_bitmaps(self._source_bitmaps)
+        self._ids.extend([None] * added)
+        self._capacity = capacity
+
+    @staticmethod
+    def _set_bit(bitmaps: np.ndarray, code: int, row: int, on: bool) -> None:
+        if code < 0:
+            return
+        mask = np.uint8(0x80 >> (row & 7))
+        if on:
+            bitmaps[code, row >> 3] |= mask
+        else:
+            bitmaps[code, row >> 3] &= ~mask
+
+    def _agent_code(self, agent_id: Optional[str]) -> int:
+        if agent_id is None:
+            return NO_AGENT
+        code = self._agent_codes.get(agent_id)
+        if code is None:
+            code = self._agent_codes[agent_id] = len(self._agents)
+            self._agents.append(agent_id)
+        return code
+
+    def _row_for(self, lead_id: str) -> int:
+        row = self._rows.get(lead_id)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+            else:
+                if self._size == self._capacity:
+                    self._grow(self._capacity * 2)
+                row = self._size
+                self._size += 1
+            self._rows[lead_id] = row
+            self._ids[row] = lead_id
+        return row
+
+    def upsert(self, lead: Dict[str, Any]) -> None:
+        """Insert a lead or update the columns present in a (partial) row
+
+        Accepts database rows as well as lead change events, where the
+        lead is ``lead_id``, the status ``new_status`` and the agent
+        ``agent_id``. A ``deleted`` flag removes the lead.
+        """
+        lead_id = lead.get('id') or lead.get('lead_id')
+        if lead_id is None:
+            return
+        if lead.get('deleted'):
+            self.remove(lead_id)
+            return
+        is_new = lead_id not in self._rows
+        row = self._row_for(lead_id)
+
+        status = lead.get('new_status', lead.get('status'))
+        if status is not None or is_new:
+            code = STATUS_CODES[_enum_value(status or 'new')]
+            self._set_bit(self._status_bitmaps, int(self.status[row]), row, False)
+            self.status[row] = code
+            self._set_bit(self._status_bitmaps, code, row, True)
+        source = lead.get('source')
+        if source is not None:
+            code = SOURCE_CODES.get(_enum_value(source), -1)
+            self._set_bit(self._source_bitmaps, int(self.source[row]), row, False)
+            self.source[row] = code
+            self._set_bit(self._source_bitmaps, code, row, True)
+        if 'assigned_agent_id' in lead or 'agent_id' in lead:
+            self.agent[row] = self._agent_code(lead.get('assigned_agent_id', lead.get('agent_id')))
+        if 'estimated_value' in lead:
+            value = lead['estimated_value']
+            self.value[row] = np.nan if value is None else float(value)
+        if 'last_contact' in lead:
+            self.last_contact[row] = _epoch_seconds(lead['last_contact'])
+        if lead.get('created_at') is not None:
+            self.created_at[row] = _epoch_seconds(lead['created_at'])
+
+    apply_event = upsert
+
+    def load(self, leads: Iterable[Dict[str, Any]]) -> int:
+        """Upsert a batch of leads; leads not yet in the book are appended column-wise"""
+        fresh: List[Dict[str, Any]] = []
+        updates: List[Dict[str, Any]] = []
+        seen = set()
+        for lead in leads:
+            lead_id = lead.get('id') or lead.get('lead_id')
+            if lead_id in self._rows or lead_id in seen or lead_id is None or lead.get('deleted'):
+                updates.append(lead)
+            else:
+                seen.add(lead_id)
+                fresh.append(lead)
+        if fresh:
+            self._append(fresh)
+        for lead in updates:
+            self.upsert(lead)
+        return len(fresh) + len(updates)
+
+    def _append(self, leads: List[Dict[str, Any]]) -> None:
+        start, count = self._size, len(leads)
+        if start + count > self._capacity:
+            self._grow(max(self._capacity * 2, start + count))
+        stop = start + count
+        self._size = stop
+        for row, lead in enumerate(leads, start):
+            lead_id = lead.get('id') or lead.get('lead_id')
+            self._rows[lead_id] = row
+            self._ids[row] = lead_id
+
+        statuses = [_enum_value(lead.get('new_status', lead.get('status')) or 'new') for lead in leads]
+        sources = [lead.get('source') for lead in leads]
+        values = [lead.get('estimated_value') for lead in leads]
+        self.status[start:stop] = [STATUS_CODES[status] for status in statuses]
+        self.source[start:stop] = [-1 if source is None else SOURCE_CODES.get(_enum_value(source), -1) for source in sources]
+        self.agent[start:stop] = [
+            self._agent_code(lead.get('assigned_agent_id', lead.get('agent_id'))) for lead in leads
+        ]
+        self.value[start:stop] = [np.nan if value is None else float(value) for value in values]
+        self.last_contact[start:stop] = [_epoch_seconds(lead.get('last_contact')) for lead in leads]
+        self.created_at[start:stop] = [_epoch_seconds(lead.get('created_at')) for lead in leads]
+        self._set_bits(self._status_bitmaps, self.status, start, stop)
+        self._set_bits(self._source_bitmaps, self.source, start, stop)
+
+    @staticmethod
+    def _set_bits(bitmaps: np.ndarray, column: np.ndarray, start: int, stop: int) -> None:
+        """Set the bitmap bits of rows start:stop from their codes in column"""
+        first, last = start >> 3, -(-stop // 8)
+        block = column[first * 8:last * 8]
+        for code in range(len(bitmaps)):
+            bits = np.unpackbits(bitmaps[code, first:last])
+            bits[start - first * 8:stop - first * 8] = block[start - first * 8:stop - first * 8] == code
+            bitmaps[code, first:last] = np.packbits(bits)
+
+    def remove(self, lead_id: str) -> bool:
+        row = self._rows.pop(lead_id, None)
+        if row is None:
+            return False
+        self._set_bit(self._status_bitmaps, int(self.status[row]), row, False)
+        self._set_bit(self._source_bitmaps, int(self.source[row]), row, False)
+        self.status[row] = self.source[row] = -1
+        self.agent[row] = NO_AGENT
+        self.value[row] = np.nan
+        self.last_contact[row] = self.created_at[row] = NEVER
+        self._ids[row] = None
+        self._free.append(row)
+        return True
+
+    async def rebuild_from_database(self, db_service: Any, page_size: int = 5000) -> int:
+        """Cold-start the book from the leads table and return the lead count"""
+        self.clear()
+        offset = 0
+        while True:
+            rows = await db_service.get_leads(limit=page_size, offset=offset)
+            self.load(rows or [])
+            offset += len(rows or [])
+            if not rows or len(rows) < page_size:
+                break
+        logger.info(f"Loaded {len(self)} leads into the lead book")
+        return len(self)
+
+    def _enum_mask(self, bitmaps: np.ndarray, codes: Dict[str, int], values: EnumFilter) -> Optional[np.ndarray]:
+        if values is None:
+            return None
+        if isinstance(values, str) or hasattr(values, 'value'):
+            values = [values]
+        words = np.zeros(bitmaps.shape[1], dtype=np.uint8)
+        for value in values:
+            words |= bitmaps[codes[_enum_value(value)]]
+        return words
+
+    def filter(
+        self,
+        statuses: EnumFilter = None,
+        sources: EnumFilter = None,
+        agents: Optional[Sequence[str]] = None,
+        min_value: Optional[float] = None,
+        max_value: Optional[float] = None,
+        not_contacted_since: Optional[datetime] = None,
+        contacted_since: Optional[datetime] = None,
+        created_since: Optional[datetime] = None
+    ) -> np.ndarray:
+        """Row numbers of leads matching every given condition
+
+        Enum conditions accept one value or several (any of them matches).
+        """
+        size = self._size
+        words = None
+        for mask in (
+            self._enum_mask(self._status_bitmaps, STATUS_CODES, statuses),
+            self._enum_mask(self._source_bitmaps, SOURCE_CODES, sources)
+        ):
+            if mask is not None:
+                words = mask if words is None else words & mask
+        # Full-column comparisons beat gathering candidate rows at any
+        # selectivity interactive filters see, so predicates build a mask
+        if words is None:
+            mask = self.status[:size] >= 0
+        else:
+            mask = np.unpackbits(words, count=size).view(bool)
+
+        if agents is not None:
+            codes = [self._agent_codes[agent] for agent in agents if agent in self._agent_codes]
+            if len(codes) == 1:
+                mask &= self.agent[:size] == codes[0]
+            else:
+                mask &= np.isin(self.agent[:size], codes)
+        if min_value is not None:
+            mask &= self.value[:size] >= min_value
+        if max_value is not None:
+            mask &= self.value[:size] <= max_value
+        if not_contacted_since is not None:
+            mask &= self.last_contact[:size] < _epoch_seconds(not_contacted_since)
+        if contacted_since is not None:
+            mask &= self.last_contact[:size] >= _epoch_seconds(contacted_since)
+        if created_since is not None:
+            mask &= self.created_at[:size] >= _epoch_seconds(created_since)
+        return np.flatnonzero(mask)
+
+    def count(self, **conditions: Any) -> int:
+        return len(self.filter(**conditions))
+
+    def lead_ids(self, rows: np.ndarray) -> List[str]:
+        ids = self._ids
+        return [ids[row] for row in rows.tolist()]
+
+    def _group_labels(self, column: str) -> List[Optional[str]]:
+        if column == 'status':
+            return [status.value for status in STATUSES]
+        if column == 'source':
+            return [source.value for source in SOURCES]
+        return list(self._agents)
+
+    def aggregate(self, rows: np.ndarray, by: str = 'agent') -> Dict[Optional[str], Dict[str, float]]:
+        """Lead count, total and average known value per group for the given rows
+
+        Unassigned leads are grouped under None when grouping by agent.
+        """
+        if by not in GROUP_COLUMNS:
+            raise ValueError(f"Cannot group by {by!r}; expected one of {GROUP_COLUMNS}")
+        labels = self._group_labels(by)
+        if len(rows) == self._size:
+            # Every row matched (rows from filter are unique), so skip the gather
+            rows = slice(0, self._size)
+        # Shift codes by one so unassigned/unknown (-1) lands in bin 0
+        codes = getattr(self, by)[rows].astype(np.intp) + 1
+        values = self.value[rows]
+        known = ~np.isnan(values)
+        size = len(labels) + 1
+        counts = np.bincount(codes, minlength=size)
+        totals = np.bincount(codes, weights=np.where(known, values, 0.0), minlength=size)
+        valued = np.bincount(codes, weights=known, minlength=size)
+
+        result: Dict[Optional[str], Dict[str, float]] = {}
+        for index in np.flatnonzero(counts).tolist():
+            result[labels[index - 1] if index else None] = {
+                'count': int(counts[index]),
+                'total_value': float(totals[index]),
+                'average_value': float(totals[index] / valued[index]) if valued[index] else 0.0
+            }
+        return result
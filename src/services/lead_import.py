@@ -0,0 +1,375 @@
+from typing import Dict, Any, BinaryIO, Iterable, Iterator, List, Optional, Set, Tuple
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from uuid import uuid4
+import codecs
+import csv
+import json
+import logging
+import os
+import time
+from pydantic import ValidationError
+from models.lead import Lead, LeadSource, LeadStatus
+from utils.contact_normalizer import ContactError, ContactNormalizer
+from utils.helpers import calculate_priority_scores
+from .interfaces.database import DatabaseServiceInterface
+from .rate_limiter import Priority, rate_limit_scope
+
+logger = logging.getLogger(__name__)
+
+_SOURCES = {source.value for source in LeadSource}
+_TEXT_FIELDS = ('email', 'phone', 'company')
+_KNOWN_FIELDS = {'first_name', 'last_name', 'source', 'interest_level', 'estimated_value', *_TEXT_FIELDS}
+
+
+def fast_validate(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Build a lead record from an already-clean row, or None
+
+    Covers what Lead validation would do for the common case (plain
+    strings, a known source, an interest level of 1-5); anything else
+    returns None and goes through the model for coercion and errors.
+    """
+    first_name, last_name = row.get('first_name'), row.get('last_name')
+    if not (isinstance(first_name, str) and first_name and isinstance(last_name, str) and last_name):
+        return None
+    source = row.get('source')
+    if source not in _SOURCES:
+        return None
+    interest_level = row.get('interest_level')
+    if isinstance(interest_level, str) and interest_level.isdigit():
+        interest_level = int(interest_level)
+    if type(interest_level) is not int or not 1 <= interest_level <= 5:
+        return None
+    estimated_value = row.get('estimated_value')
+    if estimated_value in (None, ''):
+        estimated_value = None
+    else:
+        try:
+            estimated_value = float(estimated_value)
+        except (TypeError, ValueError):
+            return None
+
+    now = datetime.utcnow().isoformat()
+    record = {
+        'id': str(uuid4()),
+        'created_at': now,
+        'updated_at': now,
+        'first_name': first_name,
+        'last_name': last_name,
+        'status': LeadStatus.NEW.value,
+        'source': source,
+        'interest_level': interest_level,
+        'estimated_value': estimated_value,
+        'metadata': {key: value for key, value in row.items() if key not in _KNOWN_FIELDS}
+    }
+    for name in _TEXT_FIELDS:
+        value = row.get(name)
+        if value is not None and not isinstance(value, str):
+            return None
+        record[name] = value or None
+    return record
+
+
+def validate_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Lead record for a row; raises ValidationError for invalid rows"""
+    record = fast_validate(row)
+    if record is not None:
+        return record
+    known = {key: value for key, value in row.items() if key in _KNOWN_FIELDS and value != ''}
+    lead = Lead(**known, metadata={key: value for key, value in row.items() if key not in _KNOWN_FIELDS})
+    return lead.model_dump(
+        mode='json',
+        include={'id', 'created_at', 'updated_at', 'status', 'metadata', *_KNOWN_FIELDS}
+    )
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        first = error.errors()[0]
+        location = ".".join(str(part) for part in first['loc'])
+        return f"{location}: {first['msg']}" if location else first['msg']
+    return str(error)
+
+
+class _OffsetLines:
+    """Decoded lines of a binary file, tracking the byte offset consumed"""
+
+    def __init__(self, handle: BinaryIO, offset: int):
+        handle.seek(offset)
+        self._handle = handle
+        self._decoder = codecs.getincrementaldecoder('utf-8-sig' if offset == 0 else 'utf-8')()
+        self.offset = offset
+
+    def __iter__(self) -> "_OffsetLines":
+        return self
+
+    def __next__(self) -> str:
+        raw = self._handle.readline()
+        if not raw:
+            raise StopIteration
+        self.offset += len(raw)
+        return self._decoder.decode(raw)
+
+
+class _SeenContacts:
+    """Normalized phones and emails already imported from one file
+
+    Kept in an append-only file next to the checkpoint, which records its
+    length; a resume truncates anything written after that checkpoint.
+    """
+
+    def __init__(self, path: str, size: int = 0):
+        self.path = path
+        self.keys: Set[str] = set()
+        if size:
+            with open(path, 'r+b') as handle:
+                self.keys.update(line.decode() for line in handle.read(size).splitlines())
+                handle.truncate(size)
+        self._handle = open(path, 'ab' if size else 'wb')
+
+    @property
+    def size(self) -> int:
+        return self._handle.tell()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def add(self, keys: Iterable[str]) -> None:
+        new = [key for key in dict.fromkeys(keys) if key not in self.keys]
+        if new:
+            self.keys.update(new)
+            self._handle.write("".join(f"{key}\n" for key in new).encode())
+            self._handle.flush()
+
+    def __enter__(self) -> "_SeenContacts":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._handle.close()
+
+
+@dataclass
+class ImportReport:
+    path: str
+    rows_read: int = 0
+    imported: int = 0
+    rejected: int = 0
+    duplicates: int = 0
+    offset: int = 0
+    elapsed: float = 0.0
+    resumed_from: int = 0
+    resumed_rows: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        """Throughput of this run, excluding rows read before a resume"""
+        return (self.rows_read - self.resumed_rows) / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), 'rows_per_second': self.rows_per_second}
+
+
+class LeadImporter:
+    """Streaming import of partner lead files (CSV or JSONL)
+
+    Files are read line by line from a byte offset, so memory stays
+    bounded by the batch size whatever the file size. Each batch is
+    validated, normalized and deduplicated on phone and email (against
+    the whole file so far), scored for the call queue and inserted in one
+    request; a checkpoint with the byte offset after the batch is then
+    written, and a rerun resumes there. Writes run in the batch
+    rate-limit lane.
+    """
+
+    def __init__(
+        self,
+        db_service: DatabaseServiceInterface,
+        batch_size: int = 500,
+        normalizer: Optional[ContactNormalizer] = None,
+        checkpoint_dir: Optional[str] = None,
+        max_errors: int = 100
+    ):
+        """Configure the importer
+
+        Args:
+            db_service: Target for create_leads
+            batch_size: Rows per insert (and the bound on rows held in memory)
+            normalizer: Phone/email normalizer, shared across imports
+            checkpoint_dir: Where checkpoints live; next to the file by default
+            max_errors: Row errors kept in the report
+        """
+        self.db_service = db_service
+        self.batch_size = batch_size
+        self.normalizer = normalizer or ContactNormalizer()
+        self.checkpoint_dir = checkpoint_dir
+        self.max_errors = max_errors
+
+    def checkpoint_path(self, path: str) -> str:
+        directory = self.checkpoint_dir or os.path.dirname(os.path.abspath(path))
+        return os.path.join(directory, f".{os.path.basename(path)}.import-checkpoint.json")
+
+    def contacts_path(self, path: str) -> str:
+        directory = self.checkpoint_dir or os.path.dirname(os.path.abspath(path))
+        return os.path.join(directory, f".{os.path.basename(path)}.import-contacts")
+
+    def _load_checkpoint(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.checkpoint_path(path)) as handle:
+                checkpoint = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        # A replaced or truncated file invalidates the offset
+        if checkpoint.get('size') != os.path.getsize(path):
+            logger.warning(f"Ignoring stale import checkpoint for {path}")
+            return None
+        return checkpoint
+
+    def _save_checkpoint(self, path: str, report: ImportReport, seen: _SeenContacts) -> None:
+        target = self.checkpoint_path(path)
+        temporary = f"{target}.tmp"
+        with open(temporary, 'w') as handle:
+            json.dump(
+                {**report.to_dict(), 'errors': [], 'size': os.path.getsize(path), 'contacts_size': seen.size},
+                handle
+            )
+        os.replace(temporary, target)
+
+    @staticmethod
+    def _file_format(path: str, file_format: Optional[str]) -> str:
+        file_format = (file_format or os.path.splitext(path)[1].lstrip('.')).lower()
+        if file_format in ('jsonl', 'ndjson'):
+            return 'jsonl'
+        if file_format == 'csv':
+            return 'csv'
+        raise ValueError(f"Unsupported lead file format: {file_format!r}")
+
+    def iter_rows(
+        self,
+        path: str,
+        offset: int = 0,
+        file_format: Optional[str] = None
+    ) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+        """Yield (offset after the row, row) from a byte offset
+
+        Unparseable JSONL lines yield a None row. For CSV the header is
+        always read from the start of the file.
+        """
+        file_format = self._file_format(path, file_format)
+        with open(path, 'rb') as handle:
+            if file_format == 'jsonl':
+                lines = _OffsetLines(handle, offset)
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        row = None
+                    yield lines.offset, row if isinstance(row, dict) else None
+                return
+
+            header_lines = _OffsetLines(handle, 0)
+            header = next(csv.reader(header_lines), None)
+            if header is None:
+                return
+            lines = _OffsetLines(handle, max(offset, header_lines.offset))
+            # csv pulls further lines for quoted newlines, so the offset
+            # after each row is the end of its last physical line
+            for values in csv.reader(lines):
+                if values:
+                    yield lines.offset, dict(zip(header, values))
+
+    async def run(self, path: str, file_format: Optional[str] = None, resume: bool = True) -> ImportReport:
+        """Import a file, resuming from its checkpoint when there is one"""
+        checkpoint = self._load_checkpoint(path) if resume else None
+        report = ImportReport(path=path)
+        if checkpoint:
+            for name in ('rows_read', 'imported', 'rejected', 'duplicates', 'offset'):
+                setattr(report, name, checkpoint[name])
+            report.resumed_from = report.offset
+            report.resumed_rows = report.rows_read
+            logger.info(f"Resuming import of {path} at byte {report.offset}")
+
+        seen = _SeenContacts(self.contacts_path(path), checkpoint.get('contacts_size', 0) if checkpoint else 0)
+        started = time.perf_counter()
+        batch: List[Dict[str, Any]] = []
+        batch_end = report.offset
+        with seen, rate_limit_scope(Priority.BATCH):
+            for offset, row in self.iter_rows(path, report.offset, file_format):
+                report.rows_read += 1
+                try:
+                    if row is None:
+                        raise ValueError("Malformed row")
+                    batch.append(validate_row(row))
+                except (ValidationError, ValueError) as e:
+                    report.rejected += 1
+                    if len(report.errors) < self.max_errors:
+                        report.errors.append((report.rows_read, _describe(e)))
+                batch_end = offset
+                if len(batch) >= self.batch_size:
+                    await self._flush(batch, report, batch_end, started, path, seen)
+                    batch = []
+            await self._flush(batch, report, batch_end, started, path, seen)
+
+        report.elapsed = time.perf_counter() - started
+        for finished in (self.checkpoint_path(path), self.contacts_path(path)):
+            try:
+                os.remove(finished)
+            except OSError:
+                pass
+        logger.info(
+            f"Imported {report.imported} leads from {path} ({report.rejected} rejected, "
+            f"{report.duplicates} duplicates) at {report.rows_per_second:.0f} rows/s"
+        )
+        return report
+
+    async def _flush(
+        self,
+        batch: List[Dict[str, Any]],
+        report: ImportReport,
+        offset: int,
+        started: float,
+        path: str,
+        seen: _SeenContacts
+    ) -> None:
+        if batch:
+            contacts = self.normalizer.normalize(
+                [record['phone'] for record in batch],
+                [record['email'] for record in batch]
+            )
+            records = []
+            batch_keys: List[str] = []
+            for index, record in enumerate(batch):
+                keys = []
+                if contacts.phone_errors[index] == ContactError.OK:
+                    keys.append(f"phone:{contacts.phones[index]}")
+                if contacts.email_errors[index] == ContactError.OK:
+                    keys.append(f"email:{contacts.emails[index]}")
+                batch_keys.extend(keys)
+                # duplicate_of covers this batch; seen covers earlier ones
+                if contacts.duplicate_of[index] >= 0 or any(key in seen for key in keys):
+                    report.duplicates += 1
+                    continue
+                # Invalid contacts are kept as given; valid ones are stored normalized
+                if contacts.phone_errors[index] == ContactError.OK:
+                    record['phone'] = str(contacts.phones[index])
+                if contacts.email_errors[index] == ContactError.OK:
+                    record['email'] = str(contacts.emails[index])
+                records.append(record)
+
+            scores = calculate_priority_scores(
+                [0.0] * len(records),
+                [0] * len(records),
+                [record['estimated_value'] for record in records]
+            )
+            for record, score in zip(records, scores.tolist()):
+                record['priority_score'] = score
+            await self.db_service.create_leads(records)
+            report.imported += len(records)
+            seen.add(batch_keys)
+
+        report.offset = offset
+        report.elapsed = time.perf_counter() - started
+        self._save_checkpoint(path, report, seen)
+        logger.info(f"Import of {path}: {report.rows_read} rows at {report.rows_per_second:.0f} rows/s")
@@ -0,0 +1,119 @@
+from typing import Dict, Any, Awaitable, Callable, List, Optional
+from dataclasses import dataclass
+from datetime import datetime
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+Hook = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class StepResult:
+    """Outcome and duration of one warmup or shutdown step"""
+    name: str
+    duration_ms: float = 0.0
+    ok: bool = True
+    required: bool = True
+    error: Optional[str] = None
+
+
+@dataclass
+class _Step:
+    name: str
+    hook: Hook
+    required: bool = True
+    timeout: Optional[float] = None
+
+
+class AppLifecycle:
+    """Concurrent warmup and ordered shutdown for the application
+
+    Warmup steps run concurrently; the app reports ready once they have all
+    finished and every required step succeeded. Optional steps that fail are
+    logged and reported but do not block readiness. Shutdown steps run in
+    reverse registration order so pools close after the buffers that use
+    them have been drained.
+    """
+
+    def __init__(self):
+        self._warmups: List[_Step] = []
+        self._shutdowns: List[_Step] = []
+        self.warmup_results: Dict[str, StepResult] = {}
+        self.shutdown_results: Dict[str, StepResult] = {}
+        self.started_at: Optional[datetime] = None
+        self.ready_at: Optional[datetime] = None
+        self.warmup_ms: Optional[float] = None
+        self.is_ready = False
+        self.is_stopping = False
+
+    def add_warmup(
+        self,
+        name: str,
+        hook: Hook,
+        required: bool = True,
+        timeout: Optional[float] = None
+    ) -> None:
+        self._warmups.append(_Step(name, hook, required, timeout))
+
+    def add_shutdown(self, name: str, hook: Hook, timeout: Optional[float] = 10.0) -> None:
+        self._shutdowns.append(_Step(name, hook, True, timeout))
+
+    async def start(self) -> bool:
+        """Run every warmup step concurrently and return readiness"""
+        self.started_at = datetime.utcnow()
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self._run(step) for step in self._warmups))
+        self.warmup_results = {result.name: result for result in results}
+        self.warmup_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        failed = [result.name for result in results if result.required and not result.ok]
+        self.is_ready = not failed
+        if self.is_ready:
+            self.ready_at = datetime.utcnow()
+            logger.info(f"Warmup finished in {self.warmup_ms}ms")
+        else:
+            logger.error(f"Warmup failed for required steps: {', '.join(failed)}")
+        return self.is_ready
+
+    async def stop(self) -> None:
+        """Run shutdown steps in reverse order; a failing step does not stop the rest"""
+        self.is_ready = False
+        self.is_stopping = True
+        for step in reversed(self._shutdowns):
+            self.shutdown_results[step.name] = await self._run(step)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'ready': self.is_ready,
+            'stopping': self.is_stopping,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'ready_at': self.ready_at.isoformat() if self.ready_at else None,
+            'warmup_ms': self.warmup_ms,
+            'steps': {
+                name: {
+                    'duration_ms': result.duration_ms,
+                    'ok': result.ok,
+                    'required': result.required,
+                    'error': result.error
+                }
+                for name, result in self.warmup_results.items()
+            }
+        }
+
+    async def _run(self, step: _Step) -> StepResult:
+        start = time.perf_counter()
+        result = StepResult(name=step.name, required=step.required)
+        try:
+            if step.timeout is None:
+                await step.hook()
+            else:
+                await asyncio.wait_for(step.hook(), step.timeout)
+        except Exception as e:
+            result.ok = False
+            result.error = f"{type(e).__name__}: {e}"
+            logger.error(f"Lifecycle step {step.name} failed: {result.error}")
+        result.duration_ms = round((time.perf_counter() - start) * 1000, 2)
+        return result
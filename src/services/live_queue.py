@@ -0,0 +1,323 @@
+from typing import Dict, Any, Callable, Iterable, List, Optional, Sequence, Tuple
+from datetime import datetime
+import asyncio
+import heapq
+import logging
+import time
+from models.lead import LeadStatus
+from models.lead_record import from_epoch_us, to_epoch_us
+
+logger = logging.getLogger(__name__)
+
+CLOSED_STATUSES = {LeadStatus.CLOSED_WON.value, LeadStatus.CLOSED_LOST.value}
+# Lateness (seconds past due) at which a lead enters each overdue bucket;
+# the second threshold is where "overdue" starts
+OVERDUE_THRESHOLDS = (0, 15 * 60, 60 * 60, 4 * 60 * 60, 24 * 60 * 60)
+
+QueueListener = Callable[[Optional[str]], None]
+HeapItem = Tuple[float, int, str]
+
+
+def _due_seconds(value: Any) -> Optional[float]:
+    micros = to_epoch_us(value)
+    return None if micros is None else micros / 1e6
+
+
+def _duration_label(seconds: int) -> str:
+    if seconds and seconds % 3600 == 0:
+        return f"{seconds // 3600}h"
+    return f"{seconds // 60}m" if seconds else "0"
+
+
+def _bucket_labels(thresholds: Sequence[int]) -> List[str]:
+    labels = [_duration_label(seconds) for seconds in thresholds]
+    return [f"{low}-{high}" for low, high in zip(labels, labels[1:])] + [f"{labels[-1]}+"]
+
+
+class LiveCallQueue:
+    """In-memory call queue with live counters, kept in step with lead change events
+
+    A lead is queued while it has a ``next_attempt`` and is not closed.
+    Depth, due-now and overdue counts are kept per agent (None for
+    unassigned leads) and globally, so reads cost O(1). Counts that
+    change with the passage of time are driven by one heap per lateness
+    threshold: advancing the clock pops the leads that crossed it, so each
+    lead costs a constant number of heap operations over its time in the
+    queue. Per-agent and global heaps give the oldest due lead.
+
+    Heap entries are never removed from the middle; a sequence number in
+    each entry identifies the lead's current schedule, stale entries are
+    skipped when they surface, and heaps are compacted once stale entries
+    outnumber live ones. ``reconcile`` periodically rebuilds from the
+    database to correct drift from missed events.
+    """
+
+    _STATE = (
+        '_entries', '_seq', '_heaps', '_all', '_pending', '_depth',
+        '_crossed', '_total', '_total_crossed', '_position'
+    )
+
+    def __init__(self, clock: Callable[[], float] = time.time, thresholds: Sequence[int] = OVERDUE_THRESHOLDS):
+        """Configure the queue
+
+        Args:
+            clock: Current time in epoch seconds
+            thresholds: Ascending lateness thresholds in seconds, starting at 0
+        """
+        self._clock = clock
+        self.thresholds = tuple(thresholds)
+        self.bucket_labels = _bucket_labels(self.thresholds)
+        self._listeners: List[QueueListener] = []
+        self._replay: Optional[List[Dict[str, Any]]] = None
+        self._runner: Optional[asyncio.Task] = None
+        self.is_ready = False
+        self._reset()
+
+    def _reset(self) -> None:
+        levels = len(self.thresholds)
+        self._entries: Dict[str, Tuple[Optional[str], float, int]] = {}
+        self._seq = 0
+        self._heaps: Dict[Optional[str], List[HeapItem]] = {}
+        self._all: List[HeapItem] = []
+        # Leads that have not yet crossed each threshold
+        self._pending: List[List[HeapItem]] = [[] for _ in range(levels)]
+        self._depth: Dict[Optional[str], int] = {}
+        self._crossed: List[Dict[Optional[str], int]] = [{} for _ in range(levels)]
+        self._total = 0
+        self._total_crossed = [0] * levels
+        self._position = self._clock()
+
+    def __len__(self) -> int:
+        return self._total
+
+    def add_listener(self, listener: QueueListener) -> None:
+        """Call listener with the agent ID whenever that agent's queue changes"""
+        self._listeners.append(listener)
+
+    def _notify(self, agent_id: Optional[str]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(agent_id)
+            except Exception as e:
+                logger.error(f"Error in queue listener: {e}")
+
+    def upsert(self, lead: Dict[str, Any]) -> None:
+        """Apply a (partial) lead row or lead change event row"""
+        lead_id = lead.get('id') or lead.get('lead_id')
+        if lead_id is None:
+            return
+        if self._replay is not None:
+            self._replay.append(lead)
+        agent_id, due, _ = self._entries.get(lead_id, (None, None, 0))
+        if 'assigned_agent_id' in lead:
+            agent_id = lead['assigned_agent_id']
+        if 'next_attempt' in lead:
+            due = _due_seconds(lead['next_attempt'])
+        status = lead.get('status')
+        if lead.get('deleted') or (status is not None and getattr(status, 'value', status) in CLOSED_STATUSES):
+            due = None
+        self._set(lead_id, agent_id, due)
+
+    def load(self, leads: Iterable[Dict[str, Any]]) -> int:
+        count = 0
+        for lead in leads:
+            self.upsert(lead)
+            count += 1
+        return count
+
+    def remove(self, lead_id: str) -> None:
+        self._set(lead_id, None, None)
+
+    def clear(self) -> None:
+        agents = list(self._depth)
+        self._reset()
+        for agent_id in agents:
+            self._notify(agent_id)
+
+    def _count(self, agent_id: Optional[str], due: float, step: int) -> None:
+        """Add step to the depth and crossed-threshold counters for one lead"""
+        self._depth[agent_id] = self._depth.get(agent_id, 0) + step
+        self._total += step
+        for level, threshold in enumerate(self.thresholds):
+            if due + threshold > self._position:
+                break
+            crossed = self._crossed[level]
+            crossed[agent_id] = crossed.get(agent_id, 0) + step
+            self._total_crossed[level] += step
+
+    def _set(self, lead_id: str, agent_id: Optional[str], due: Optional[float]) -> None:
+        current = self._entries.get(lead_id)
+        if (current is None and due is None) or (current is not None and current[:2] == (agent_id, due)):
+            return
+        if current is not None:
+            old_agent, old_due, _ = current
+            del self._entries[lead_id]
+            self._count(old_agent, old_due, -1)
+            if old_agent != agent_id:
+                self._notify(old_agent)
+        if due is not None:
+            self._seq += 1
+            item = (due, self._seq, lead_id)
+            self._entries[lead_id] = (agent_id, due, self._seq)
+            self._count(agent_id, due, 1)
+            heap = self._heaps.setdefault(agent_id, [])
+            heapq.heappush(heap, item)
+            heapq.heappush(self._all, item)
+            for level, threshold in enumerate(self.thresholds):
+                if due + threshold > self._position:
+                    heapq.heappush(self._pending[level], item)
+            if len(heap) > 2 * self._depth[agent_id] + 64:
+                self._heaps[agent_id] = self._live(heap)
+            if len(self._all) > 2 * self._total + 64:
+                self._all = self._live(self._all)
+                self._pending = [self._live(pending) for pending in self._pending]
+                self._heaps = {agent: self._live(items) for agent, items in self._heaps.items() if self._depth.get(agent)}
+        self._notify(agent_id)
+
+    def _is_live(self, item: HeapItem) -> bool:
+        entry = self._entries.get(item[2])
+        return entry is not None and entry[2] == item[1]
+
+    def _live(self, heap: List[HeapItem]) -> List[HeapItem]:
+        live = [item for item in heap if self._is_live(item)]
+        heapq.heapify(live)
+        return live
+
+    def advance(self, now: Optional[float] = None) -> None:
+        """Move leads whose due time plus a threshold has passed into that bucket"""
+        now = self._clock() if now is None else now
+        if now <= self._position:
+            return
+        self._position = now
+        changed = set()
+        for level, threshold in enumerate(self.thresholds):
+            pending, crossed = self._pending[level], self._crossed[level]
+            limit = now - threshold
+            while pending and pending[0][0] <= limit:
+                item = heapq.heappop(pending)
+                if self._is_live(item):
+                    agent_id = self._entries[item[2]][0]
+                    crossed[agent_id] = crossed.get(agent_id, 0) + 1
+                    self._total_crossed[level] += 1
+                    changed.add(agent_id)
+        for agent_id in changed:
+            self._notify(agent_id)
+
+    def _head(self, heap: Optional[List[HeapItem]]) -> Optional[HeapItem]:
+        while heap:
+            if self._is_live(heap[0]):
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def peek(self, agent_id: Optional[str]) -> Optional[Tuple[str, datetime]]:
+        """Lead ID and due time of the agent's earliest queued lead"""
+        head = self._head(self._heaps.get(agent_id))
+        return (head[2], from_epoch_us(round(head[0] * 1e6))) if head else None
+
+    def depth(self, agent_id: Optional[str]) -> int:
+        return self._depth.get(agent_id, 0)
+
+    def metrics(self, agent_id: Optional[str] = None, now: Optional[float] = None) -> Dict[str, Any]:
+        """Live queue counters for one agent, or for the whole queue when agent_id is None
+
+        Returns:
+            depth, due_now, overdue (late by more than the first bucket),
+            overdue_histogram (lateness bucket -> count), and the earliest
+            due lead as next_lead_id / oldest_due
+        """
+        self.advance(now)
+        if agent_id is None:
+            depth, crossed, head = self._total, self._total_crossed, self._head(self._all)
+        else:
+            depth = self._depth.get(agent_id, 0)
+            crossed = [counts.get(agent_id, 0) for counts in self._crossed]
+            head = self._head(self._heaps.get(agent_id))
+        beyond = crossed[1:] + [0]
+        return {
+            'depth': depth,
+            'due_now': crossed[0],
+            'overdue': beyond[0],
+            'overdue_histogram': {
+                label: count - later for label, count, later in zip(self.bucket_labels, crossed, beyond)
+            },
+            'next_lead_id': head[2] if head else None,
+            'oldest_due': from_epoch_us(round(head[0] * 1e6)).isoformat() if head else None
+        }
+
+    def agent_state(self, agent_id: Optional[str]) -> Dict[str, Any]:
+        """Live counters for one agent, JSON-ready"""
+        return {'agent_id': agent_id, **self.metrics(agent_id)}
+
+    async def _fetch(self, db_service: Any, page_size: int) -> "LiveCallQueue":
+        fresh = LiveCallQueue(clock=self._clock, thresholds=self.thresholds)
+        offset = 0
+        while True:
+            rows = await db_service.get_queued_leads(limit=page_size, offset=offset)
+            fresh.load(rows or [])
+            offset += len(rows or [])
+            if not rows or len(rows) < page_size:
+                break
+        return fresh
+
+    async def rebuild_from_database(self, db_service: Any, page_size: int = 5000) -> int:
+        """Cold-start the queue from the leads table and return the queued count"""
+        await self.reconcile(db_service, page_size)
+        logger.info(f"Loaded {len(self)} queued leads into the live call queue")
+        return len(self)
+
+    async def reconcile(self, db_service: Any, page_size: int = 5000) -> int:
+        """Rebuild from the database and return how many queued leads had drifted
+
+        A lead has drifted if it was missing, extra, or queued for another
+        agent or time. Events applied while the pages are read are replayed
+        onto the rebuilt state before it replaces the current one.
+        """
+        self._replay = []
+        try:
+            fresh = await self._fetch(db_service, page_size)
+            fresh.load(self._replay)
+        finally:
+            self._replay = None
+
+        agents = set(self._depth) | set(fresh._depth)
+        drift = sum(
+            1 for lead_id in self._entries.keys() | fresh._entries.keys()
+            if self._entries.get(lead_id, ())[:2] != fresh._entries.get(lead_id, ())[:2]
+        )
+        for name in self._STATE:
+            setattr(self, name, getattr(fresh, name))
+        if self.is_ready and drift:
+            logger.warning(f"Live call queue drifted from the database by {drift} leads; reconciled")
+        self.is_ready = True
+        for agent_id in agents:
+            self._notify(agent_id)
+        return drift
+
+    async def _run(self, db_service: Any, reconcile_interval: float, tick_interval: float) -> None:
+        last_reconcile = time.monotonic()
+        while True:
+            await asyncio.sleep(tick_interval)
+            self.advance()
+            if time.monotonic() - last_reconcile >= reconcile_interval:
+                last_reconcile = time.monotonic()
+                try:
+                    await self.reconcile(db_service)
+                except Exception as e:
+                    logger.error(f"Error reconciling live call queue: {e}")
+
+    def start(self, db_service: Any, reconcile_interval: float = 600.0, tick_interval: float = 5.0) -> None:
+        """Advance the due counters every tick and reconcile with the database periodically"""
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.get_running_loop().create_task(
+                self._run(db_service, reconcile_interval, tick_interval)
+            )
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
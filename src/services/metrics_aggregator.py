@@ -0,0 +1,364 @@
+from typing import Dict, Any, Callable, List, Optional, Iterable, Tuple
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
+import logging
+import re
+from models.lead import LeadStatus
+from utils.quantile_sketch import DDSketch
+
+logger = logging.getLogger(__name__)
+
+# Bucket widths in seconds, finest first
+GRANULARITIES: Dict[str, int] = {
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400
+}
+
+# How long buckets of each granularity are kept before pruning (None = forever)
+RETENTION: Dict[str, Optional[int]] = {
+    'minute': 3 * 3600,
+    'hour': 8 * 86400,
+    'day': None
+}
+
+_TIMEFRAME_PATTERN = re.compile(r'^\s*(\d+)\s*([mhdw])\s*$')
+_TIMEFRAME_UNITS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+
+def parse_timeframe(timeframe: str) -> int:
+    """Convert a timeframe string such as "7d" or "24h" into seconds"""
+    match = _TIMEFRAME_PATTERN.match(timeframe or '')
+    if not match:
+        raise ValueError(f"Invalid timeframe: {timeframe!r}")
+    return int(match.group(1)) * _TIMEFRAME_UNITS[match.group(2)]
+
+
+def to_epoch(timestamp: Any) -> int:
+    """Convert a datetime, ISO string or epoch number to UTC epoch seconds
+
+    Naive datetimes are treated as UTC, matching the datetime.utcnow()
+    timestamps written by the agents.
+    """
+    if isinstance(timestamp, (int, float)):
+        return int(timestamp)
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int(timestamp.timestamp())
+
+
+@dataclass
+class MetricBucket:
+    """Running counters and sums for one time bucket"""
+    total_leads: int = 0
+    converted_leads: int = 0
+    total_opportunities: int = 0
+    won_opportunities: int = 0
+    won_deals: int = 0
+    won_revenue: float = 0.0
+    lost_deals: int = 0
+    response_time_total: float = 0.0
+    response_time_count: int = 0
+    qualification_total: int = 0
+    qualification_correct: int = 0
+
+    def merge(self, other: 'MetricBucket') -> 'MetricBucket':
+        """Add another bucket's counters into this one"""
+        for field in fields(self):
+            setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+        return self
+
+    def conversion_rate(self) -> float:
+        if not self.total_leads:
+            return 0.0
+        return (self.converted_leads / self.total_leads) * 100
+
+    def average_deal_size(self) -> float:
+        if not self.won_deals:
+            return 0.0
+        return self.won_revenue / self.won_deals
+
+    def response_time(self) -> float:
+        if not self.response_time_count:
+            return 0.0
+        return self.response_time_total / self.response_time_count
+
+    def qualification_accuracy(self) -> float:
+        if not self.qualification_total:
+            return 0.0
+        return (self.qualification_correct / self.qualification_total) * 100
+
+    def win_rate(self) -> float:
+        if not self.total_opportunities:
+            return 0.0
+        return (self.won_opportunities / self.total_opportunities) * 100
+
+
+def _status(value: Any) -> Optional[LeadStatus]:
+    if value is None or isinstance(value, LeadStatus):
+        return value
+    try:
+        return LeadStatus(value)
+    except ValueError:
+        return None
+
+
+class MetricsAggregator:
+    """Incremental aggregation of lead metric events
+
+    Consumes the events written by LeadManagementAgent._track_metrics, one
+    per status change, and keeps running counters per time bucket
+    (minute/hour/day) and per agent. Timeframe queries merge the
+    pre-aggregated buckets instead of rescanning raw rows, so a query costs
+    O(buckets in the window). Response times are also folded into quantile
+    sketches per bucket, agent and lead source. Buckets past their retention
+    are pruned as recorded events move time forward.
+    """
+
+    GLOBAL = None  # Agent key for team-wide buckets
+
+    def __init__(self, retention: Optional[Dict[str, Optional[int]]] = None):
+        self.retention = {**RETENTION, **(retention or {})}
+        self._buckets: Dict[str, Dict[Tuple[int, Optional[str]], MetricBucket]] = {
+            granularity: {} for granularity in GRANULARITIES
+        }
+        self._sketches: Dict[str, Dict[Tuple[int, str, Optional[str]], DDSketch]] = {
+            granularity: {} for granularity in GRANULARITIES
+        }
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self.is_ready = False
+        self.events_processed = 0
+        self._next_prune = 0
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a callback invoked with each recorded event"""
+        self._listeners.append(listener)
+
+    def reset(self) -> None:
+        """Drop all buckets"""
+        for buckets in self._buckets.values():
+            buckets.clear()
+        for sketches in self._sketches.values():
+            sketches.clear()
+        self.is_ready = False
+        self.events_processed = 0
+        self._next_prune = 0
+
+    def record(self, event: Dict[str, Any]) -> None:
+        """Fold a single metric event into the matching buckets"""
+        delta = self._event_delta(event)
+        epoch = to_epoch(event.get('timestamp') or datetime.utcnow())
+        agent_id = event.get('agent_id')
+
+        for granularity, width in GRANULARITIES.items():
+            start = epoch - epoch % width
+            buckets = self._buckets[granularity]
+            keys = [(start, self.GLOBAL)]
+            if agent_id is not None:
+                keys.append((start, agent_id))
+            for key in keys:
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = MetricBucket()
+                bucket.merge(delta)
+        if event.get('response_time') is not None:
+            self._record_response_time(epoch, agent_id, event.get('source'), float(event['response_time']))
+        self.events_processed += 1
+
+        if epoch >= self._next_prune:
+            # At most once per minute of event time
+            self.prune(datetime.utcfromtimestamp(epoch))
+            self._next_prune = epoch + GRANULARITIES['minute']
+
+        for listener in self._listeners:
+            listener(event)
+
+    def record_many(self, events: Iterable[Dict[str, Any]]) -> int:
+        """Fold a batch of events and return how many were processed"""
+        count = 0
+        for event in events:
+            self.record(event)
+            count += 1
+        return count
+
+    def query(
+        self,
+        timeframe: str,
+        agent_id: Optional[str] = None,
+        now: Optional[datetime] = None
+    ) -> MetricBucket:
+        """Merge the buckets covering the timeframe ending at now"""
+        window = parse_timeframe(timeframe)
+        end = to_epoch(now or datetime.utcnow())
+        granularity = self._granularity_for(window)
+        width = GRANULARITIES[granularity]
+        buckets = self._buckets[granularity]
+
+        result = MetricBucket()
+        start = (end - window) - (end - window) % width
+        for bucket_start in range(start, end + 1, width):
+            bucket = buckets.get((bucket_start, agent_id))
+            if bucket is not None:
+                result.merge(bucket)
+        return result
+
+    def response_time_sketch(
+        self,
+        timeframe: str,
+        agent_id: Optional[str] = None,
+        source: Optional[str] = None,
+        now: Optional[datetime] = None
+    ) -> DDSketch:
+        """Merge the response-time sketches covering the timeframe
+
+        Args:
+            timeframe: Window ending at now, e.g. "7d"
+            agent_id: Restrict to one agent
+            source: Restrict to one lead source
+            now: End of the window, defaults to the current time
+
+        Raises:
+            ValueError: If both agent_id and source are given; sketches are
+                kept per agent and per source, not per combination
+        """
+        if agent_id is not None and source is not None:
+            raise ValueError("Filter response times by agent_id or source, not both")
+        window = parse_timeframe(timeframe)
+        end = to_epoch(now or datetime.utcnow())
+        granularity = self._granularity_for(window)
+        width = GRANULARITIES[granularity]
+        sketches = self._sketches[granularity]
+
+        if agent_id is not None:
+            dimension, key = 'agent', agent_id
+        elif source is not None:
+            dimension, key = 'source', getattr(source, 'value', source)
+        else:
+            dimension, key = 'all', None
+
+        result = DDSketch()
+        start = (end - window) - (end - window) % width
+        for bucket_start in range(start, end + 1, width):
+            sketch = sketches.get((bucket_start, dimension, key))
+            if sketch is not None:
+                result.merge(sketch)
+        return result
+
+    def agents(self) -> List[str]:
+        """Agent ids with at least one retained day bucket"""
+        return sorted({agent for _, agent in self._buckets['day'] if agent is not None})
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """Drop buckets older than their retention and return how many were removed"""
+        end = to_epoch(now or datetime.utcnow())
+        removed = 0
+        for granularity, keep in self.retention.items():
+            if keep is None:
+                continue
+            for store in (self._buckets[granularity], self._sketches[granularity]):
+                expired = [key for key in store if key[0] < end - keep]
+                for key in expired:
+                    del store[key]
+                removed += len(expired)
+        return removed
+
+    async def rebuild_from_history(
+        self,
+        db_service: Any,
+        since: Optional[datetime] = None,
+        page_size: int = 1000
+    ) -> int:
+        """Backfill buckets by replaying the metrics table
+
+        Args:
+            db_service: Database service exposing get_metric_events
+            since: Optional lower bound on event timestamps
+            page_size: Number of rows fetched per page
+
+        Returns:
+            Number of events replayed
+        """
+        self.reset()
+        offset = 0
+        while True:
+            rows = await db_service.get_metric_events(since=since, limit=page_size, offset=offset)
+            if not rows:
+                break
+            self.record_many(rows)
+            offset += len(rows)
+            if len(rows) < page_size:
+                break
+        self.prune()
+        self.is_ready = True
+        logger.info(f"Rebuilt metric aggregates from {offset} events")
+        return offset
+
+    def _record_response_time(
+        self,
+        epoch: int,
+        agent_id: Optional[str],
+        source: Any,
+        response_time: float
+    ) -> None:
+        """Add a response time to the team, agent and source sketches"""
+        keys = [('all', None)]
+        if agent_id is not None:
+            keys.append(('agent', agent_id))
+        if source is not None:
+            keys.append(('source', getattr(source, 'value', source)))
+
+        for granularity, width in GRANULARITIES.items():
+            start = epoch - epoch % width
+            sketches = self._sketches[granularity]
+            for dimension, key in keys:
+                sketch = sketches.get((start, dimension, key))
+                if sketch is None:
+                    sketch = sketches[(start, dimension, key)] = DDSketch()
+                sketch.add(response_time)
+
+    def _granularity_for(self, window: int) -> str:
+        """Pick the finest granularity that is still retained for the whole window"""
+        for granularity in GRANULARITIES:
+            keep = self.retention[granularity]
+            if keep is None or window <= keep - GRANULARITIES[granularity]:
+                if window // GRANULARITIES[granularity] <= 200:
+                    return granularity
+        return 'day'
+
+    @staticmethod
+    def _event_delta(event: Dict[str, Any]) -> MetricBucket:
+        """Translate a metric event into counter increments
+
+        A lead enters the funnel count the first time it moves out of NEW,
+        so each lead is counted once however many events it produces.
+        """
+        delta = MetricBucket()
+        old_status = _status(event.get('old_status'))
+        new_status = _status(event.get('new_status'))
+
+        if old_status in (None, LeadStatus.NEW) and new_status not in (None, LeadStatus.NEW):
+            delta.total_leads = 1
+        if new_status == LeadStatus.OPPORTUNITY:
+            delta.total_opportunities = 1
+
+        if new_status == LeadStatus.CLOSED_WON:
+            delta.converted_leads = 1
+            delta.won_deals = 1
+            delta.won_revenue = float(event.get('revenue') or 0.0)
+            if old_status == LeadStatus.OPPORTUNITY:
+                delta.won_opportunities = 1
+        elif new_status == LeadStatus.CLOSED_LOST:
+            delta.lost_deals = 1
+
+        if new_status in (LeadStatus.CLOSED_WON, LeadStatus.CLOSED_LOST) and 'qualification_complete' in event:
+            delta.qualification_total = 1
+            predicted_win = bool(event['qualification_complete'])
+            delta.qualification_correct = int(predicted_win == (new_status == LeadStatus.CLOSED_WON))
+
+        if event.get('response_time') is not None:
+            delta.response_time_total = float(event['response_time'])
+            delta.response_time_count = 1
+
+        return delta
@@ -1,14 +1,40 @@
-from typing import Dict, Any, Optional
-from slack_sdk.web.async_client import AsyncWebClient
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-from config.settings import SLACK_TOKEN, SENDGRID_API_KEY
+from typing import Dict, Any, Optional, TYPE_CHECKING
+from config.settings import get_settings
 from .interfaces.notification import NotificationServiceInterface
 
+if TYPE_CHECKING:
+    from slack_sdk.web.async_client import AsyncWebClient
+    from sendgrid import SendGridAPIClient
+    from .rate_limiter import RateLimiter
+
 class NotificationService(NotificationServiceInterface):
-    def __init__(self):
-        self.slack_client = AsyncWebClient(token=SLACK_TOKEN)
-        self.sendgrid_client = SendGridAPIClient(SENDGRID_API_KEY)
+    def __init__(self, rate_limiter: Optional["RateLimiter"] = None):
+        self._slack_client: Optional["AsyncWebClient"] = None
+        self._sendgrid_client: Optional["SendGridAPIClient"] = None
+        self._rate_limiter = rate_limiter
+
+    @property
+    def rate_limiter(self) -> "RateLimiter":
+        if self._rate_limiter is None:
+            from .factory import ServiceFactory
+            self._rate_limiter = ServiceFactory.get_rate_limiter()
+        return self._rate_limiter
+
+    @property
+    def slack_client(self) -> "AsyncWebClient":
+        """Slack client, created (and slack_sdk imported) on first use"""
+        if self._slack_client is None:
+            from slack_sdk.web.async_client import AsyncWebClient
+            self._slack_client = AsyncWebClient(token=get_settings().SLACK_BOT_TOKEN)
+        return self._slack_client
+
+    @property
+    def sendgrid_client(self) -> "SendGridAPIClient":
+        """SendGrid client, created (and sendgrid imported) on first use"""
+        if self._sendgrid_client is None:
+            from sendgrid import SendGridAPIClient
+            self._sendgrid_client = SendGridAPIClient(get_settings().SENDGRID_API_KEY)
+        return self._sendgrid_client
 
     async def send_slack_message(
         self,
@@ -30,6 +56,7 @@ class NotificationService(NotificationServiceInterface):
                     ]
                 })
 
+            await self.rate_limiter.acquire('slack')
             await self.slack_client.chat_postMessage(
                 channel=channel,
                 text=message,
@@ -50,6 +77,8 @@ class NotificationService(NotificationServiceInterface):
         template_data: Optional[Dict[str, Any]] = None
     ) -> bool:
         try:
+            from sendgrid.helpers.mail import Mail
+            
             message = Mail(
                 from_email='noreply@attyxai.com',
                 to_emails=recipient,
@@ -62,6 +91,7 @@ class NotificationService(NotificationServiceInterface):
                 if template_data:
                     message.dynamic_template_data = template_data
 
+            await self.rate_limiter.acquire('sendgrid')
             response = await self.sendgrid_client.send(message)
             return response.status_code == 202
             
@@ -0,0 +1,78 @@
+from typing import Dict, Any, List, Optional, Sequence
+from datetime import datetime, timedelta
+from models.lead import LeadStatus
+from .lead_book import LeadBook
+
+OPEN_STATUSES = (
+    LeadStatus.NEW,
+    LeadStatus.CONTACTED,
+    LeadStatus.QUALIFIED,
+    LeadStatus.OPPORTUNITY
+)
+
+
+class PipelineView:
+    """Manager-wide pipeline queries answered from the in-process LeadBook
+
+    Every query is a bitmap filter plus a grouped aggregate over the
+    matching rows, so interactive filters do not touch the database.
+    """
+
+    def __init__(self, book: LeadBook):
+        self.book = book
+
+    def query(self, group_by: str = 'agent', include_ids: int = 0, **conditions: Any) -> Dict[str, Any]:
+        """Filter the book and aggregate the matches
+
+        Args:
+            group_by: 'agent', 'status' or 'source'
+            include_ids: Number of matching lead IDs to return (0 for none)
+            **conditions: LeadBook.filter conditions
+
+        Returns:
+            Total count and value, per-group aggregates and sample lead IDs
+        """
+        rows = self.book.filter(**conditions)
+        groups = self.book.aggregate(rows, by=group_by)
+        result: Dict[str, Any] = {
+            'count': len(rows),
+            'total_value': sum(group['total_value'] for group in groups.values()),
+            'groups': groups
+        }
+        if include_ids:
+            result['lead_ids'] = self.book.lead_ids(rows[:include_ids])
+        return result
+
+    def stale_opportunities(
+        self,
+        min_value: float = 50_000,
+        idle_days: int = 7,
+        agents: Optional[Sequence[str]] = None,
+        now: Optional[datetime] = None,
+        include_ids: int = 100
+    ) -> Dict[str, Any]:
+        """Open leads worth at least min_value with no contact in idle_days, by agent"""
+        cutoff = (now or datetime.utcnow()) - timedelta(days=idle_days)
+        return self.query(
+            group_by='agent',
+            include_ids=include_ids,
+            statuses=OPEN_STATUSES,
+            min_value=min_value,
+            not_contacted_since=cutoff,
+            agents=agents
+        )
+
+    def stage_summary(self, agents: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Lead count and value per pipeline stage"""
+        return self.query(group_by='status', agents=agents)
+
+    def source_summary(self, statuses: Optional[Sequence[Any]] = None) -> Dict[str, Any]:
+        """Lead count and value per lead source"""
+        return self.query(group_by='source', statuses=statuses)
+
+    def agent_load(self) -> Dict[Optional[str], Dict[str, float]]:
+        """Open leads and their value per assigned agent"""
+        return self.query(group_by='agent', statuses=OPEN_STATUSES)['groups']
+
+    def open_lead_ids(self, agent_id: str) -> List[str]:
+        return self.book.lead_ids(self.book.filter(statuses=OPEN_STATUSES, agents=[agent_id]))
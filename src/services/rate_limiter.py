@@ -0,0 +1,204 @@
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Rate limit lanes; lower values are served first"""
+    LIVE = 0
+    INTERACTIVE = 1
+    BATCH = 2
+
+
+_priority: ContextVar[Priority] = ContextVar('rate_limit_priority', default=Priority.INTERACTIVE)
+_tenant: ContextVar[Optional[str]] = ContextVar('rate_limit_tenant', default=None)
+
+
+@contextmanager
+def rate_limit_scope(priority: Optional[Priority] = None, tenant: Optional[str] = None) -> Iterator[None]:
+    """Set the lane and tenant for upstream calls made inside the block"""
+    tokens = []
+    if priority is not None:
+        tokens.append((_priority, _priority.set(priority)))
+    if tenant is not None:
+        tokens.append((_tenant, _tenant.set(tenant)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def current_scope() -> Tuple[Priority, Optional[str]]:
+    """Lane and tenant set by the enclosing rate_limit_scope"""
+    return _priority.get(), _tenant.get()
+
+
+class LocalBucketBackend:
+    """In-process token buckets"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._buckets: Dict[str, List[float]] = {}
+
+    async def take(self, key: str, tokens: float, rate: float, capacity: float, floor: float) -> float:
+        """Take tokens if at least ``floor`` remain afterwards; else return seconds to wait"""
+        now = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [capacity, now]
+        level = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if level - tokens >= floor:
+            bucket[0] = level - tokens
+            return 0.0
+        bucket[0] = level
+        return (floor + tokens - level) / rate
+
+
+# Same algorithm as LocalBucketBackend.take, atomic in Redis.
+# KEYS[1]: bucket hash; ARGV: tokens, rate, capacity, floor, now
+_TAKE_SCRIPT = """
+local tokens = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local capacity = tonumber(ARGV[3])
+local floor = tonumber(ARGV[4])
+local now = tonumber(ARGV[5])
+local state = redis.call('HMGET', KEYS[1], 'level', 'updated')
+local level = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+level = math.min(capacity, level + math.max(0, now - updated) * rate)
+local wait = 0
+if level - tokens >= floor then
+    level = level - tokens
+else
+    wait = (floor + tokens - level) / rate
+end
+redis.call('HSET', KEYS[1], 'level', tostring(level), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RedisBucketBackend:
+    """Token buckets in Redis, so several workers share one budget
+
+    Bucket state lives in a hash per key and is updated by a Lua script,
+    which keeps refill-and-take atomic across workers. Timestamps come from
+    the worker's wall clock, so workers need roughly synchronized clocks.
+    """
+
+    def __init__(self, redis_client: Any, prefix: str = 'ratelimit', clock: Callable[[], float] = time.time):
+        self.redis = redis_client
+        self.prefix = prefix
+        self._clock = clock
+        self._script = redis_client.register_script(_TAKE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisBucketBackend":
+        # Imported here: redis is only needed in distributed mode
+        import redis.asyncio as redis_asyncio
+        return cls(redis_asyncio.from_url(url), **kwargs)
+
+    async def take(self, key: str, tokens: float, rate: float, capacity: float, floor: float) -> float:
+        wait = await self._script(
+            keys=[f"{self.prefix}:{key}"],
+            args=[tokens, rate, capacity, floor, self._clock()]
+        )
+        return float(wait)
+
+
+class RateLimiter:
+    """Async token-bucket rate limiting per upstream and per tenant
+
+    Every upstream has a bucket of ``calls`` tokens refilled over ``window``
+    seconds. When tenant limits are configured, a call also draws from its
+    tenant's bucket for that upstream. Waiters for a bucket are served in
+    priority order, and lower lanes may not dip into the last
+    ``reserve_fraction`` of a bucket, so live-call requests are not starved
+    by batch work.
+    """
+
+    def __init__(
+        self,
+        calls: int = 100,
+        window: float = 3600,
+        limits: Optional[Dict[str, Tuple[int, float]]] = None,
+        tenant_limit: Optional[Tuple[int, float]] = None,
+        reserve_fraction: float = 0.2,
+        backend: Optional[Any] = None
+    ):
+        """Configure the limiter
+
+        Args:
+            calls: Default calls allowed per window for each upstream
+            window: Default window length in seconds
+            limits: Per-upstream (calls, window) overrides
+            tenant_limit: Optional (calls, window) applied per tenant and upstream
+            reserve_fraction: Share of each bucket batch work may not use
+                (interactive work may not use half of it)
+            backend: Bucket storage; in-process unless a Redis backend is given
+        """
+        self.default_limit = (calls, window)
+        self.limits = dict(limits or {})
+        self.tenant_limit = tenant_limit
+        self.reserve_fraction = reserve_fraction
+        self.backend = backend or LocalBucketBackend()
+        self._waiters: Dict[str, List[List[Any]]] = {}
+        self._conditions: Dict[str, asyncio.Condition] = {}
+        self._sequence = itertools.count()
+
+    async def acquire(
+        self,
+        upstream: str,
+        tokens: float = 1,
+        priority: Optional[Priority] = None,
+        tenant: Optional[str] = None
+    ) -> None:
+        """Wait until the call may proceed
+
+        Priority and tenant default to the surrounding rate_limit_scope.
+        """
+        priority = _priority.get() if priority is None else priority
+        tenant = _tenant.get() if tenant is None else tenant
+        if tenant is not None and self.tenant_limit is not None:
+            await self._acquire(f"{upstream}:tenant:{tenant}", self.tenant_limit, tokens, priority)
+        await self._acquire(upstream, self.limits.get(upstream, self.default_limit), tokens, priority)
+
+    async def _acquire(self, key: str, limit: Tuple[int, float], tokens: float, priority: Priority) -> None:
+        calls, window = limit
+        rate = calls / window
+        # Tokens that must remain after this take: none for live calls, the full reserve for batch
+        floor = calls * self.reserve_fraction * priority / (len(Priority) - 1)
+        floor = max(0.0, min(floor, calls - tokens))
+        waiters = self._waiters.setdefault(key, [])
+        condition = self._conditions.setdefault(key, asyncio.Condition())
+        entry = [priority, next(self._sequence)]
+
+        async with condition:
+            heapq.heappush(waiters, entry)
+            # A new arrival may outrank the current head; let it re-check
+            condition.notify_all()
+            try:
+                while True:
+                    wait = None
+                    if waiters[0] is entry:
+                        wait = await self.backend.take(key, tokens, rate, calls, floor)
+                        if wait <= 0:
+                            return
+                    try:
+                        await asyncio.wait_for(condition.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                waiters.remove(entry)
+                heapq.heapify(waiters)
+                condition.notify_all()
@@ -0,0 +1,204 @@
+from typing import Dict, Any, Callable, Iterable, Optional, Set
+import asyncio
+import json
+import logging
+from .snapshot_service import diff_payload
+
+logger = logging.getLogger(__name__)
+
+TopicProducer = Callable[[str], Any]
+
+
+def _encode(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload, separators=(',', ':'), default=str)
+
+
+class _Topic:
+    __slots__ = ('name', 'version', 'state', 'full', 'delta', 'dirty', 'subscribers')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.version = 0
+        self.state: Any = None
+        self.full = ''
+        self.delta: Optional[str] = None
+        self.dirty = True
+        self.subscribers: Set["Connection"] = set()
+
+
+class Connection:
+    """A connected socket, its topics and the topic versions it has seen"""
+    __slots__ = ('socket', 'topics', 'versions', 'sending')
+
+    def __init__(self, socket: Any):
+        self.socket = socket
+        self.topics: Set[str] = set()
+        self.versions: Dict[str, int] = {}
+        self.sending = False
+
+
+class RealtimeGateway:
+    """Batched WebSocket push of queue and pipeline state
+
+    Topics are named ``<kind>`` or ``<kind>:<key>`` (``pipeline``,
+    ``queue:<agent_id>``) and computed by the producer registered for the
+    kind. Producers only mark topics dirty on change; once per batch
+    window each dirty topic with subscribers is recomputed, diffed against
+    its previous version and encoded once, and every affected connection
+    gets one frame. Connections that missed a version get the full state.
+
+    Only the latest state per topic is kept, so a connection whose last
+    send is still in flight is simply revisited in the next window
+    instead of queueing frames, and idle connections cost no work.
+    """
+
+    def __init__(self, batch_window: float = 0.25, send_timeout: float = 5.0):
+        self.batch_window = batch_window
+        self.send_timeout = send_timeout
+        self._producers: Dict[str, TopicProducer] = {}
+        self._topics: Dict[str, _Topic] = {}
+        self._connections: Set[Connection] = set()
+        self._pending: Set[Connection] = set()
+        self._flusher: Optional[asyncio.Task] = None
+        self._sends: Set[asyncio.Task] = set()
+        self.frames_sent = 0
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    def register(self, kind: str, producer: TopicProducer) -> None:
+        """Register the function computing the state of ``kind`` topics from their key"""
+        self._producers[kind] = producer
+
+    def connect(self, socket: Any, topics: Iterable[str] = ()) -> Connection:
+        connection = Connection(socket)
+        self.subscribe(connection, topics)
+        self._connections.add(connection)
+        return connection
+
+    def disconnect(self, connection: Connection) -> None:
+        self.unsubscribe(connection, list(connection.topics))
+        self._connections.discard(connection)
+        self._pending.discard(connection)
+
+    def subscribe(self, connection: Connection, topics: Iterable[str]) -> None:
+        """Add topics to a connection; their state is sent in the next window
+
+        Raises:
+            ValueError: For topics of an unregistered kind
+        """
+        topics = list(topics)
+        for name in topics:
+            if name.partition(':')[0] not in self._producers:
+                raise ValueError(f"Unknown topic: {name}")
+        for name in topics:
+            topic = self._topics.get(name)
+            if topic is None:
+                topic = self._topics[name] = _Topic(name)
+            topic.subscribers.add(connection)
+            connection.topics.add(name)
+        self._pending.add(connection)
+        self._schedule()
+
+    def unsubscribe(self, connection: Connection, topics: Iterable[str]) -> None:
+        for name in topics:
+            connection.topics.discard(name)
+            connection.versions.pop(name, None)
+            topic = self._topics.get(name)
+            if topic is not None:
+                topic.subscribers.discard(connection)
+                if not topic.subscribers:
+                    # Nobody is watching: stop computing it
+                    del self._topics[name]
+
+    def mark_dirty(self, name: str) -> None:
+        """Signal that a topic's state may have changed"""
+        topic = self._topics.get(name)
+        if topic is not None and not topic.dirty:
+            topic.dirty = True
+            self._schedule()
+
+    def _schedule(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop: the next flush picks the changes up
+            return
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.batch_window)
+        self._flusher = None
+        self.flush()
+
+    def _refresh(self, topic: _Topic) -> bool:
+        topic.dirty = False
+        kind, _, key = topic.name.partition(':')
+        try:
+            state = self._producers[kind](key)
+        except Exception as e:
+            logger.error(f"Error computing realtime topic {topic.name}: {e}")
+            return False
+        if topic.version and state == topic.state:
+            return False
+        changes = diff_payload(topic.state, state) if topic.version else None
+        topic.version += 1
+        topic.state = state
+        topic.full = _encode({'topic': topic.name, 'version': topic.version, 'full': state})
+        topic.delta = None if changes is None else _encode(
+            {'topic': topic.name, 'version': topic.version, 'changes': changes}
+        )
+        return True
+
+    def flush(self) -> int:
+        """Recompute dirty topics and start sends; returns the frames started"""
+        visit, self._pending = self._pending, set()
+        for topic in self._topics.values():
+            if topic.dirty and self._refresh(topic):
+                visit.update(topic.subscribers)
+
+        started = 0
+        for connection in visit:
+            if connection not in self._connections:
+                continue
+            if connection.sending:
+                self._pending.add(connection)
+                continue
+            parts = []
+            for name in connection.topics:
+                topic = self._topics[name]
+                seen = connection.versions.get(name, 0)
+                if not topic.version or seen == topic.version:
+                    continue
+                parts.append(topic.delta if seen == topic.version - 1 and topic.delta else topic.full)
+                connection.versions[name] = topic.version
+            if parts:
+                connection.sending = True
+                task = asyncio.get_running_loop().create_task(
+                    self._send(connection, '{"updates":[' + ','.join(parts) + ']}')
+                )
+                # The loop only keeps weak references to tasks
+                self._sends.add(task)
+                task.add_done_callback(self._sends.discard)
+                started += 1
+        if self._pending:
+            self._schedule()
+        return started
+
+    async def _send(self, connection: Connection, frame: str) -> None:
+        try:
+            await asyncio.wait_for(connection.socket.send_text(frame), self.send_timeout)
+            self.frames_sent += 1
+        except Exception as e:
+            logger.info(f"Dropping realtime connection after failed send: {e}")
+            self.disconnect(connection)
+        finally:
+            connection.sending = False
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        if self._sends:
+            await asyncio.wait(set(self._sends), timeout=self.send_timeout)
@@ -0,0 +1,94 @@
+from typing import Dict, Any, Awaitable, Callable, Optional, TypeVar
+import asyncio
+import hashlib
+import json
+import logging
+from .rate_limiter import current_scope
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so re-indented copies of a prompt share a key"""
+    return " ".join(prompt.split())
+
+
+def coalescing_key(model: str, prompt: str, temperature: float, **extra: Any) -> str:
+    payload = json.dumps(
+        {'model': model, 'prompt': normalize_prompt(prompt), 'temperature': temperature, **extra},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class RequestCoalescer:
+    """Single-flight layer for identical in-flight LLM requests
+
+    Concurrent calls with the same key share one upstream call and its
+    result (or exception). Only deterministic requests are coalesced: by
+    default that means temperature 0, and callers can opt out explicitly.
+    Nothing is cached once the shared call completes.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+        self.bypassed_calls = 0
+
+    async def run(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Await the in-flight call for key, starting it if there is none"""
+        future = self._in_flight.get(key)
+        if future is None:
+            self.upstream_calls += 1
+            # A separate task, so one caller's cancellation cannot fail the others
+            future = asyncio.ensure_future(call())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced_calls += 1
+        return await asyncio.shield(future)
+
+    async def completion(
+        self,
+        model: str,
+        prompt: str,
+        temperature: float,
+        call: Callable[[], Awaitable[T]],
+        coalesce: Optional[bool] = None,
+        **key_extra: Any
+    ) -> T:
+        """Run an LLM call, sharing it with identical concurrent requests
+
+        Args:
+            model: Model name, part of the key
+            prompt: Prompt text, normalized into the key
+            temperature: Sampling temperature, part of the key
+            call: Coroutine factory performing the upstream request
+            coalesce: Force (True) or forbid (False) sharing; by default
+                only temperature-0 requests are shared
+            **key_extra: Other request parameters that affect the output
+        """
+        if coalesce is None:
+            coalesce = temperature == 0
+        if not coalesce:
+            self.bypassed_calls += 1
+            return await call()
+        # The shared call is rate limited in its starter's lane and tenant,
+        # so only callers from the same ones may join it
+        priority, tenant = current_scope()
+        key = coalescing_key(model, prompt, temperature, priority=int(priority), tenant=tenant, **key_extra)
+        return await self.run(key, call)
+
+    def stats(self) -> Dict[str, Any]:
+        shared = self.upstream_calls + self.coalesced_calls
+        return {
+            'upstream_calls': self.upstream_calls,
+            'coalesced_calls': self.coalesced_calls,
+            'bypassed_calls': self.bypassed_calls,
+            'in_flight': len(self._in_flight),
+            'dedup_ratio': self.coalesced_calls / shared if shared else 0.0
+        }
@@ -0,0 +1,172 @@
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
+import bisect
+import logging
+import re
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Upper edges of the budget buckets deals are partitioned into
+BUDGET_EDGES = (10000.0, 25000.0, 50000.0, 100000.0)
+
+# Numeric deal features used for nearest-neighbour distance
+FEATURES = ('amount', 'time_in_pipeline', 'total_calls')
+
+BudgetRange = Union[None, float, str, Sequence[float]]
+
+_AMOUNT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*([km])?\b', re.IGNORECASE)
+_UPPER_BOUND_PATTERN = re.compile(r'\b(under|below|less than|up to|max)\b|<', re.IGNORECASE)
+_MULTIPLIERS = {'k': 1_000.0, 'm': 1_000_000.0}
+
+
+def budget_bucket(amount: float) -> int:
+    return bisect.bisect_right(BUDGET_EDGES, amount)
+
+
+def _parse_budget_text(text: str) -> Optional[Tuple[float, float]]:
+    amounts = [
+        float(number) * _MULTIPLIERS.get((suffix or '').lower(), 1.0)
+        for number, suffix in _AMOUNT_PATTERN.findall(text.replace(',', ''))
+    ]
+    if not amounts:
+        return None
+    if _UPPER_BOUND_PATTERN.search(text):
+        return 0.0, max(amounts)
+    return min(amounts), max(amounts)
+
+
+def parse_budget_range(budget_range: BudgetRange) -> Optional[Tuple[float, float]]:
+    """Normalize "10000-25000", "$10k-$25k", (10000, 25000) or a single amount to (low, high)
+
+    Open ranges keep their stated bound: "50000+" is (50000, 50000) and
+    "under 5000" is (0, 5000). Returns None for anything without an amount.
+    """
+    if budget_range is None or budget_range == "":
+        return None
+    if isinstance(budget_range, (int, float)):
+        return float(budget_range), float(budget_range)
+    if isinstance(budget_range, str):
+        return _parse_budget_text(budget_range)
+    try:
+        values = [float(value) for value in budget_range]
+    except (TypeError, ValueError):
+        return None
+    if not values:
+        return None
+    return min(values), max(values)
+
+
+class _Partition:
+    """Deals for one product and budget bucket, with lazily built feature columns"""
+
+    def __init__(self):
+        self.deals: List[Dict[str, Any]] = []
+        self._features: Optional[np.ndarray] = None
+
+    def add(self, deal: Dict[str, Any]) -> None:
+        self.deals.append(deal)
+        self._features = None
+
+    @property
+    def features(self) -> np.ndarray:
+        if self._features is None or len(self._features) != len(self.deals):
+            self._features = np.array(
+                [[float(deal.get(name) or 0) for name in FEATURES] for deal in self.deals],
+                dtype=np.float64
+            ).reshape(len(self.deals), len(FEATURES))
+        return self._features
+
+
+class SimilarDealsIndex:
+    """In-memory k-nearest-neighbour index over closed sales
+
+    Deals are partitioned by product and bucketed by budget range. A lookup
+    only scans the buckets overlapping the requested budget (widening to the
+    whole product when that yields fewer than k deals) and ranks them by
+    scaled distance over amount, time in pipeline and call count.
+    """
+
+    def __init__(self):
+        self._partitions: Dict[str, Dict[int, _Partition]] = {}
+        self._scale = np.ones(len(FEATURES), dtype=np.float64)
+        self.size = 0
+        self.is_ready = False
+
+    def add_sale(self, sale: Dict[str, Any]) -> None:
+        """Index a sale under each of its products"""
+        bucket = budget_bucket(float(sale.get('amount') or 0))
+        for product in sale.get('products') or []:
+            partitions = self._partitions.setdefault(str(product).lower(), {})
+            partitions.setdefault(bucket, _Partition()).add(sale)
+        self.size += 1
+
+    def rebuild(self, sales: Sequence[Dict[str, Any]]) -> None:
+        """Replace the index contents with the given sales"""
+        self._partitions = {}
+        self.size = 0
+        for sale in sales:
+            self.add_sale(sale)
+        amounts = np.array([[float(sale.get(name) or 0) for name in FEATURES] for sale in sales])
+        if len(amounts):
+            spread = amounts.std(axis=0)
+            self._scale = np.where(spread > 0, spread, 1.0)
+        self.is_ready = True
+
+    async def rebuild_from_database(self, db_service: Any, page_size: int = 1000) -> int:
+        """Cold-start the index from the sales table and return the deal count"""
+        sales: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            rows = await db_service.get_sales(limit=page_size, offset=offset)
+            sales.extend(rows or [])
+            offset += len(rows or [])
+            if not rows or len(rows) < page_size:
+                break
+        self.rebuild(sales)
+        logger.info(f"Rebuilt similar deals index from {len(sales)} sales")
+        return len(sales)
+
+    def similar(
+        self,
+        product: Optional[str],
+        budget_range: BudgetRange = None,
+        k: int = 5,
+        time_in_pipeline: Optional[float] = None,
+        total_calls: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Return up to k closed deals most similar to the described lead"""
+        if not product:
+            return []
+        partitions = self._partitions.get(str(product).lower())
+        if not partitions:
+            return []
+
+        budget = parse_budget_range(budget_range)
+        if budget is None:
+            candidates = list(partitions.values())
+        else:
+            low, high = budget_bucket(budget[0]), budget_bucket(budget[1])
+            candidates = [partitions[b] for b in range(low, high + 1) if b in partitions]
+            if sum(len(p.deals) for p in candidates) < k:
+                candidates = list(partitions.values())
+
+        deals = [deal for partition in candidates for deal in partition.deals]
+        if not deals:
+            return []
+        features = np.vstack([partition.features for partition in candidates])
+
+        target = np.median(features, axis=0)
+        if budget is not None:
+            target[0] = (budget[0] + budget[1]) / 2
+        if time_in_pipeline is not None:
+            target[1] = time_in_pipeline
+        if total_calls is not None:
+            target[2] = total_calls
+
+        distances = np.square((features - target) / self._scale).sum(axis=1)
+        if len(deals) > k:
+            nearest = np.argpartition(distances, k)[:k]
+            nearest = nearest[np.argsort(distances[nearest])]
+        else:
+            nearest = np.argsort(distances)
+        return [deals[i] for i in nearest]
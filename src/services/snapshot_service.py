@@ -0,0 +1,163 @@
+from typing import Dict, Any, Awaitable, Callable, Optional, Set, Tuple
+from dataclasses import dataclass, field
+from datetime import datetime
+import asyncio
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+SnapshotProducer = Callable[[str], Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class Snapshot:
+    """Materialized result of a reporting query"""
+    name: str
+    timeframe: str
+    data: Dict[str, Any]
+    etag: str
+    generated_at: datetime = field(default_factory=datetime.utcnow)
+
+
+def compute_etag(data: Dict[str, Any]) -> str:
+    """Stable strong ETag for a JSON-serializable payload"""
+    encoded = json.dumps(data, sort_keys=True, default=str).encode()
+    return '"' + hashlib.sha256(encoded).hexdigest()[:32] + '"'
+
+
+def diff_payload(old: Any, new: Any, path: str = "") -> Dict[str, Any]:
+    """Return {dotted.path: new_value} for every leaf that changed
+
+    Removed keys are reported with a value of None.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes: Dict[str, Any] = {}
+        for key in old.keys() | new.keys():
+            child = f"{path}.{key}" if path else str(key)
+            changes.update(diff_payload(old.get(key), new.get(key), child))
+        return changes
+    if old != new:
+        return {path: new}
+    return {}
+
+
+class DashboardSnapshotService:
+    """Change-driven snapshot cache for the reporting endpoints
+
+    Snapshots are computed on first request and then only recomputed when
+    a lead, sale or metric change is signalled through invalidate(). Bursts
+    of changes inside ``coalesce_window`` seconds trigger a single refresh,
+    and connected dashboards receive only the fields that changed.
+    """
+
+    def __init__(self, coalesce_window: float = 2.0, subscriber_queue_size: int = 32):
+        self.coalesce_window = coalesce_window
+        self.subscriber_queue_size = subscriber_queue_size
+        self._producers: Dict[str, SnapshotProducer] = {}
+        self._snapshots: Dict[Tuple[str, str], Snapshot] = {}
+        self._stale: Set[Tuple[str, str]] = set()
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, producer: SnapshotProducer) -> None:
+        """Register the coroutine that computes a snapshot for a timeframe"""
+        self._producers[name] = producer
+
+    async def get(self, name: str, timeframe: str = "7d") -> Snapshot:
+        """Return the current snapshot, computing it if missing or stale"""
+        key = (name, timeframe)
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and key not in self._stale:
+            return snapshot
+        return await self._refresh(key)
+
+    def invalidate(self, source: str = "metric") -> None:
+        """Signal that underlying data changed and schedule a coalesced refresh
+
+        Args:
+            source: Kind of change ("lead", "sale" or "metric"), for logging
+        """
+        self._stale.update(self._snapshots.keys())
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop: the next get() recomputes the stale snapshots
+            return
+        if self._refresh_task is None or self._refresh_task.done():
+            logger.debug(f"Scheduling snapshot refresh after {source} change")
+            self._refresh_task = loop.create_task(self._refresh_later())
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a dashboard connection for delta pushes"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Let a pending coalesced refresh finish, cancelling it after timeout"""
+        task = self._refresh_task
+        if task is None or task.done():
+            return
+        try:
+            await asyncio.wait_for(task, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            logger.warning("Dropped pending snapshot refresh on shutdown")
+
+    async def _refresh_later(self) -> None:
+        await asyncio.sleep(self.coalesce_window)
+        for key in list(self._stale):
+            try:
+                await self._refresh(key)
+            except Exception as e:
+                logger.error(f"Error refreshing snapshot {key}: {e}")
+
+    async def _refresh(self, key: Tuple[str, str]) -> Snapshot:
+        name, timeframe = key
+        if name not in self._producers:
+            raise KeyError(f"No snapshot producer registered for {name!r}")
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            previous = self._snapshots.get(key)
+            if previous is not None and key not in self._stale:
+                # Another caller refreshed while we waited for the lock
+                return previous
+
+            self._stale.discard(key)
+            try:
+                data = await self._producers[name](timeframe)
+            except Exception:
+                self._stale.add(key)
+                raise
+            snapshot = Snapshot(name=name, timeframe=timeframe, data=data, etag=compute_etag(data))
+            self._snapshots[key] = snapshot
+
+        if previous is not None and previous.etag != snapshot.etag:
+            self._publish({
+                'snapshot': name,
+                'timeframe': timeframe,
+                'etag': snapshot.etag,
+                'changes': diff_payload(previous.data, snapshot.data)
+            }, snapshot)
+        return snapshot
+
+    def _publish(self, delta: Dict[str, Any], snapshot: Snapshot) -> None:
+        for queue in list(self._subscribers):
+            if queue.full():
+                # Slow consumer: drop its backlog and resync with the full snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({
+                    'snapshot': snapshot.name,
+                    'timeframe': snapshot.timeframe,
+                    'etag': snapshot.etag,
+                    'full': snapshot.data
+                })
+            else:
+                queue.put_nowait(delta)
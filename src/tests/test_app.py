@@ -0,0 +1,83 @@
+import os
+from typing import Any, Dict, List
+import pytest
+from fastapi.testclient import TestClient
+
+# main reads settings at import time
+for name, value in {
+    'OPENAI_API_KEY': 'test-key',
+    'SUPABASE_URL': 'http://localhost:54321',
+    'SUPABASE_KEY': 'test-key',
+    'DATABASE_URL': 'postgresql://localhost/test'
+}.items():
+    os.environ.setdefault(name, value)
+
+from services.factory import ServiceFactory  # noqa: E402
+from services.interfaces.database import DatabaseServiceInterface  # noqa: E402
+from services.interfaces.notification import NotificationServiceInterface  # noqa: E402
+
+
+class EmptyDatabase:
+    """Database with no rows, enough for every warmup step"""
+    client = None
+
+    async def _page(self, **kwargs: Any) -> List[Dict[str, Any]]:
+        return []
+
+    get_sales = get_leads = get_queued_leads = get_metric_events = _page
+
+    async def get_sales_metrics(self, timeframe: str) -> Dict[str, Any]:
+        return {}
+
+
+class SilentNotifications:
+    async def send_slack_message(self, channel: str, message: str, lead_data: Any = None) -> bool:
+        return True
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    # Logging writes to ./logs, which the Docker image creates
+    workdir = tmp_path_factory.mktemp("app")
+    (workdir / "logs").mkdir()
+    previous = os.getcwd()
+    os.chdir(workdir)
+    ServiceFactory.reset()
+    ServiceFactory.set_service_implementation(DatabaseServiceInterface, EmptyDatabase())
+    ServiceFactory.set_service_implementation(NotificationServiceInterface, SilentNotifications())
+    import main
+    with TestClient(main.app) as test_client:
+        yield test_client
+    ServiceFactory.reset()
+    os.chdir(previous)
+
+
+class TestAppLifespan:
+    def test_warmup_makes_the_app_ready(self, client):
+        response = client.get("/health/ready")
+        assert response.status_code == 200
+        status = response.json()
+        assert status['ready'] is True
+        assert all(step['ok'] for step in status['steps'].values()), status['steps']
+
+    def test_reporting_snapshots_are_registered(self, client):
+        response = client.get("/api/v1/reporting/pipeline", params={'timeframe': '7d'})
+        assert response.status_code == 200
+        assert response.headers['ETag']
+
+    def test_queue_status_is_served(self, client):
+        response = client.get("/api/v1/queue/status", params={'agent_id': 'agent-1'})
+        assert response.status_code == 200
+        status = response.json()
+        assert status['agent_id'] == 'agent-1'
+        assert status['depth'] == 0 and status['next_lead_id'] is None
+
+    def test_snapshots_warm_up_separately_from_agents(self, client):
+        steps = client.get("/health/ready").json()['steps']
+        assert steps['snapshots']['ok'] and steps['agents']['ok']
+
+    def test_insights_cache_stats_are_served(self, client):
+        response = client.get("/health/insights-cache")
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats['hits'] == 0 and stats['avg_refresh_seconds'] == 0.0
@@ -0,0 +1,151 @@
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import pytest
+
+# The agent reads settings when it is built
+for name, value in {
+    'OPENAI_API_KEY': 'test-key',
+    'SUPABASE_URL': 'http://localhost:54321',
+    'SUPABASE_KEY': 'test-key',
+    'DATABASE_URL': 'postgresql://localhost/test'
+}.items():
+    os.environ.setdefault(name, value)
+
+from models.base import AgentContext  # noqa: E402
+from models.lead import LeadStatus  # noqa: E402
+from services.metrics_aggregator import MetricsAggregator  # noqa: E402
+from utils.business_calendar import BusinessCalendar  # noqa: E402
+from agents.lead_management_agent import LeadManagementAgent  # noqa: E402
+
+CONTEXT = AgentContext(conversation_id="c-1", user_id="u-1", session_id="s-1")
+
+
+class LeadTable:
+    """Leads and tracked metrics kept in memory"""
+
+    def __init__(self):
+        self.leads: Dict[str, Dict[str, Any]] = {}
+        self.metrics: List[Dict[str, Any]] = []
+        self.sales: List[Dict[str, Any]] = []
+
+    def add(self, lead_id: str, created_hours_ago: float, **fields: Any) -> None:
+        created_at = datetime.utcnow() - timedelta(hours=created_hours_ago)
+        self.leads[lead_id] = {
+            'id': lead_id, 'first_name': 'Ada', 'last_name': 'Lovelace', 'source': 'website',
+            'interest_level': 3, 'status': 'new', 'assigned_agent_id': 'agent-1',
+            'created_at': created_at, 'updated_at': created_at, **fields
+        }
+
+    async def get_lead(self, lead_id: str) -> Optional[Dict[str, Any]]:
+        return dict(self.leads[lead_id])
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def update_lead_status(self, lead_id: str, status_data: Dict[str, Any]) -> Dict[str, Any]:
+        self.leads[lead_id]['status'] = LeadStatus(status_data['status']).value
+        return dict(self.leads[lead_id])
+
+    async def record_call_attempt(self, lead_id: str, lead_data: Dict[str, Any], attempt: Dict[str, Any]) -> bool:
+        self.leads[lead_id]['call_attempts'] = lead_data['call_attempts']
+        return True
+
+    async def track_metric(self, metric_data: Dict[str, Any]) -> bool:
+        self.metrics.append(metric_data)
+        return True
+
+    async def create_sale(self, sale_data: Dict[str, Any]) -> str:
+        self.sales.append(sale_data)
+        return f"sale-{len(self.sales)}"
+
+    async def log_loss_reason(self, lead_id: str, **details: Any) -> bool:
+        return True
+
+
+class QuietNotifications:
+    async def notify_sales_team(self, message: str) -> bool:
+        return True
+
+    async def send_slack_message(self, channel: str, message: str, lead_data: Any = None) -> bool:
+        return True
+
+    async def schedule_loss_review(self, **details: Any) -> bool:
+        return True
+
+
+@pytest.fixture
+def table():
+    return LeadTable()
+
+
+@pytest.fixture
+def aggregator():
+    return MetricsAggregator()
+
+
+@pytest.fixture
+def agent(table, aggregator):
+    return LeadManagementAgent(
+        db_service=table,
+        notification_service=QuietNotifications(),
+        metrics_aggregator=aggregator,
+        business_calendar=BusinessCalendar(start_hour=0, end_hour=24, weekend_excluded=False)
+    )
+
+
+async def advance(agent: LeadManagementAgent, lead_id: str, status: LeadStatus, **details: Any) -> None:
+    response = await agent.update_lead_status(lead_id, {'status': status, **details}, CONTEXT)
+    assert response.success, response.message
+
+
+CALL = {'call_outcome': 'connected', 'call_notes': 'Wants a quote'}
+
+
+@pytest.mark.asyncio
+async def test_every_transition_feeds_the_funnel(agent, table, aggregator):
+    table.add('won', created_hours_ago=2)
+    table.add('lost', created_hours_ago=4)
+
+    await advance(agent, 'won', LeadStatus.CONTACTED)
+    await advance(agent, 'won', LeadStatus.QUALIFIED, **CALL)
+    await advance(agent, 'won', LeadStatus.OPPORTUNITY)
+    await advance(agent, 'won', LeadStatus.CLOSED_WON, sale_amount=20000.0, products=['solar'])
+    await advance(agent, 'lost', LeadStatus.CONTACTED)
+    await advance(agent, 'lost', LeadStatus.QUALIFIED, **CALL)
+    await advance(agent, 'lost', LeadStatus.OPPORTUNITY)
+    await advance(agent, 'lost', LeadStatus.CLOSED_LOST, loss_reason='Budget frozen this year')
+
+    assert len(table.metrics) == 8
+    totals = aggregator.query("1d")
+    assert totals.total_leads == 2
+    assert totals.total_opportunities == 2
+    assert totals.conversion_rate() == 50.0
+    assert totals.win_rate() == 50.0
+    assert totals.average_deal_size() == 20000.0
+    assert table.sales[0]['agent_id'] == 'agent-1'
+
+
+@pytest.mark.asyncio
+async def test_first_contact_feeds_response_time_sketches(agent, table, aggregator):
+    table.add('a', created_hours_ago=2)
+    table.add('b', created_hours_ago=6, source='referral', assigned_agent_id='agent-2')
+
+    await advance(agent, 'a', LeadStatus.CONTACTED)
+    await advance(agent, 'b', LeadStatus.CONTACTED)
+    await advance(agent, 'a', LeadStatus.QUALIFIED, **CALL)
+
+    assert aggregator.response_time_sketch("1d").count == 2
+    assert aggregator.response_time_sketch("1d", agent_id='agent-1').max == pytest.approx(2, abs=0.05)
+    assert aggregator.response_time_sketch("1d", source='referral').max == pytest.approx(6, abs=0.1)
+
+    class History:
+        async def get_metric_events(self, since=None, limit=1000, offset=0):
+            return table.metrics[offset:offset + limit]
+
+    # The tracked rows seed a fresh process with the same samples
+    rebuilt = MetricsAggregator()
+    await rebuilt.rebuild_from_history(History())
+    assert rebuilt.response_time_sketch("1d", agent_id='agent-2').count == 1
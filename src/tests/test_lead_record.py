@@ -0,0 +1,50 @@
+from datetime import datetime
+from src.models.lead import Lead, LeadStatus, LeadSource
+from src.models.lead_record import LeadRecord, to_epoch_us
+
+
+class TestLeadRecord:
+    ROW = {
+        'id': 'lead-1',
+        'created_at': '2025-01-06T09:30:00+00:00',
+        'updated_at': '2025-01-07T10:00:00',
+        'first_name': 'Ada',
+        'last_name': 'Lovelace',
+        'email': 'ada@example.com',
+        'status': 'qualified',
+        'source': 'referral',
+        'interest_level': 4,
+        'estimated_value': 52000.0,
+        'budget_confirmed': True,
+        'need_confirmed': True,
+        'call_attempts': [{'timestamp': '2025-01-07T10:00:00', 'outcome': 'connected'}],
+        'metadata': {'campaign': 'spring'}
+    }
+
+    def test_reads_like_lead(self):
+        record = LeadRecord.from_dict(self.ROW)
+        assert record.status == LeadStatus.QUALIFIED and record.status_code == 2
+        assert record.source == LeadSource.REFERRAL
+        assert record.created_at == datetime(2025, 1, 6, 9, 30)
+        assert record.created_at_us == to_epoch_us(datetime(2025, 1, 6, 9, 30))
+        assert record.budget_confirmed and not record.authority_confirmed
+        assert not record.is_qualified()
+        assert len(record.call_attempts) == 1
+        assert not hasattr(record, '__dict__')
+
+    def test_round_trips_through_lead(self):
+        record = LeadRecord.from_dict(self.ROW)
+        lead = record.to_lead()
+        assert isinstance(lead, Lead)
+        assert lead.call_attempts[0].timestamp == datetime(2025, 1, 7, 10)
+        assert record.to_dict() == lead.model_dump(mode='json')
+        assert LeadRecord.from_lead(lead).to_dict() == record.to_dict()
+
+    def test_updates(self):
+        record = LeadRecord.from_dict({**self.ROW, 'call_attempts': [], 'metadata': None})
+        record.add_call_attempt("Left voicemail", next_attempt=datetime(2025, 1, 9, 9))
+        record.update_status(LeadStatus.OPPORTUNITY)
+        assert record.next_follow_up == datetime(2025, 1, 9, 9)
+        assert record.last_contact is not None and record.status == LeadStatus.OPPORTUNITY
+        record.metadata['note'] = 'kept'
+        assert record.to_dict()['metadata'] == {'note': 'kept'}
@@ -0,0 +1,56 @@
+import os
+from typing import Any, Dict, List, Optional
+import pytest
+
+# The agent reads settings when it is built
+for name, value in {
+    'OPENAI_API_KEY': 'test-key',
+    'SUPABASE_URL': 'http://localhost:54321',
+    'SUPABASE_KEY': 'test-key',
+    'DATABASE_URL': 'postgresql://localhost/test'
+}.items():
+    os.environ.setdefault(name, value)
+
+from models.base import AgentContext  # noqa: E402
+from services.factory import ServiceFactory  # noqa: E402
+from services.forecasting import predict_close_probabilities  # noqa: E402
+from services.interfaces.database import DatabaseServiceInterface  # noqa: E402
+from agents.sales_intelligence_agent import SalesIntelligenceAgent  # noqa: E402
+
+LEAD = {
+    'id': 'lead-1', 'budget_sufficient': True, 'is_decision_maker': True,
+    'engagement_score': 50, 'resolved_objections': 1, 'total_objections': 2,
+    'estimated_value': 10000.0, 'product_interest': 'solar', 'status': 'qualified'
+}
+
+
+class LeadDatabase:
+    async def get_lead(self, lead_id: str) -> Optional[Dict[str, Any]]:
+        return dict(LEAD)
+
+    async def get_lead_conversations(self, lead_id: str) -> List[Dict[str, Any]]:
+        return [{'transcript': "Thanks for your time, I will send the proposal tomorrow."}]
+
+    async def get_similar_deals(self, product_interest: Optional[str], budget_range: Any = None) -> List[Dict[str, Any]]:
+        return [{'id': 'sale-1', 'product_interest': product_interest}]
+
+
+@pytest.fixture
+def agent():
+    ServiceFactory.reset()
+    ServiceFactory.set_service_implementation(DatabaseServiceInterface, LeadDatabase())
+    yield SalesIntelligenceAgent()
+    ServiceFactory.reset()
+
+
+@pytest.mark.asyncio
+async def test_lead_insights_use_batch_close_probability(agent):
+    response = await agent.get_lead_insights(
+        'lead-1',
+        AgentContext(conversation_id="c-1", user_id="u-1", session_id="s-1")
+    )
+    assert response.success, response.errors
+    expected = float(predict_close_probabilities([LEAD])[0])
+    assert 0 < expected < 1
+    assert response.data['close_probability'] == pytest.approx(expected)
+    assert response.data['similar_deals'][0]['id'] == 'sale-1'
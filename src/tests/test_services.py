@@ -1 +1,1223 @@
-# Service Tests Implementation
\ No newline at end of file
+# Service Tests Implementation
+import pytest
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from src.models.lead import LeadStatus
+from src.services.metrics_aggregator import MetricsAggregator, parse_timeframe, to_epoch
+from src.services.agent_metrics import AgentMetricsFrame
+from src.services.snapshot_service import DashboardSnapshotService, diff_payload
+from src.services.insights_cache import InsightsCache
+from src.services.forecasting import forecast_pipeline, predict_close_probabilities
+from src.services.conversation_analysis import IncrementalConversationAnalyzer, split_transcript
+from src.services.conversation_heuristics import HeuristicConversationAnalyzer
+from src.services.similar_deals import SimilarDealsIndex, parse_budget_range
+from src.services.lifecycle import AppLifecycle
+from src.services.http_client import CircuitBreaker, ResilientHTTPClient, RetryPolicy
+from src.services.rate_limiter import (
+    LocalBucketBackend, Priority, RateLimiter, RedisBucketBackend, current_scope, rate_limit_scope
+)
+from src.services.request_coalescer import RequestCoalescer
+from src.services.cadence_planner import CadencePlanner
+from src.services.lead_import import LeadImporter, fast_validate
+from src.services.lead_book import LeadBook
+from src.services.pipeline_view import PipelineView
+from src.services.event_bus import (
+    CallAttemptRecorded, EventBus, InMemoryTransport, LeadCreated, LeadStatusChanged, SaleCreated
+)
+from src.services.database_service import DatabaseService
+from src.services.live_queue import LiveCallQueue
+from src.services.realtime_gateway import RealtimeGateway
+from src.utils.business_calendar import BusinessCalendar
+from exceptions import CircuitOpenError, UpstreamError
+
+NOW = datetime(2025, 1, 8, 12, 0)
+
+def make_event(new_status, old_status=LeadStatus.NEW, agent_id="agent-1", minutes_ago=5, **details):
+    return {
+        'timestamp': NOW - timedelta(minutes=minutes_ago),
+        'lead_id': 'lead-1',
+        'agent_id': agent_id,
+        'old_status': old_status,
+        'new_status': new_status,
+        **details
+    }
+
+class TestMetricsAggregator:
+    def test_parse_timeframe(self):
+        assert parse_timeframe("7d") == 7 * 86400
+        assert parse_timeframe("24h") == 86400
+        with pytest.raises(ValueError):
+            parse_timeframe("weekly")
+
+    def test_query_merges_buckets(self):
+        aggregator = MetricsAggregator()
+        aggregator.record(make_event(LeadStatus.CONTACTED))
+        aggregator.record(make_event(LeadStatus.CONTACTED, agent_id="agent-2"))
+        aggregator.record(make_event(
+            LeadStatus.CLOSED_WON, old_status=LeadStatus.OPPORTUNITY,
+            minutes_ago=60 * 30, revenue=20000.0, qualification_complete=True
+        ))
+
+        totals = aggregator.query("7d", now=NOW)
+        assert totals.total_leads == 2
+        assert totals.won_deals == 1
+        assert totals.average_deal_size() == 20000.0
+        assert totals.qualification_accuracy() == 100.0
+
+        agent_totals = aggregator.query("7d", agent_id="agent-2", now=NOW)
+        assert agent_totals.total_leads == 1
+        assert agent_totals.won_deals == 0
+
+    def test_timeframe_excludes_older_buckets(self):
+        aggregator = MetricsAggregator()
+        aggregator.record(make_event(LeadStatus.CONTACTED, minutes_ago=10))
+        aggregator.record(make_event(LeadStatus.CONTACTED, minutes_ago=60 * 24 * 3))
+
+        assert aggregator.query("1h", now=NOW).total_leads == 1
+        assert aggregator.query("7d", now=NOW).total_leads == 2
+
+    def test_response_time_percentiles_by_agent_and_source(self):
+        aggregator = MetricsAggregator()
+        for i in range(1, 101):
+            aggregator.record(make_event(
+                LeadStatus.CONTACTED, agent_id="agent-1" if i <= 50 else "agent-2",
+                source="website", response_time=float(i)
+            ))
+
+        overall = aggregator.response_time_sketch("1h", now=NOW)
+        assert overall.count == 100
+        assert abs(overall.quantile(0.9) - 90) <= 1
+
+        agent_sketch = aggregator.response_time_sketch("1h", agent_id="agent-1", now=NOW)
+        assert agent_sketch.max == 50
+        assert aggregator.response_time_sketch("1h", source="website", now=NOW).count == 100
+        assert aggregator.response_time_sketch("1h", source="referral", now=NOW).count == 0
+        with pytest.raises(ValueError):
+            aggregator.response_time_sketch("1h", agent_id="agent-1", source="website", now=NOW)
+
+    def test_recording_prunes_expired_buckets(self):
+        aggregator = MetricsAggregator()
+        aggregator.record(make_event(LeadStatus.CONTACTED, minutes_ago=60 * 5, response_time=1.0))
+        aggregator.record(make_event(LeadStatus.CONTACTED, response_time=2.0))
+
+        latest = to_epoch(NOW - timedelta(minutes=5)) // 60 * 60
+        assert {key[0] for key in aggregator._buckets['minute']} == {latest}
+        assert {key[0] for key in aggregator._sketches['minute']} == {latest}
+        assert aggregator.query("7d", now=NOW).total_leads == 2
+
+    @pytest.mark.asyncio
+    async def test_rebuild_from_history(self):
+        events = [make_event(LeadStatus.CONTACTED, minutes_ago=i) for i in range(5)]
+
+        class HistoryStub:
+            async def get_metric_events(self, since=None, limit=1000, offset=0):
+                return events[offset:offset + limit]
+
+        aggregator = MetricsAggregator()
+        replayed = await aggregator.rebuild_from_history(HistoryStub(), page_size=2)
+        assert replayed == 5
+        assert aggregator.is_ready
+        assert aggregator.query("30d", now=NOW).total_leads == 5
+
+class TestAgentMetricsFrame:
+    PAYLOAD = {
+        'leads': [
+            {'assigned_agent_id': 'agent-1', 'status': 'closed_won'},
+            {'assigned_agent_id': 'agent-1', 'status': 'contacted'},
+            {'assigned_agent_id': 'agent-2', 'status': 'closed_won'},
+            {'assigned_agent_id': None, 'status': 'new'}
+        ],
+        'won_deals': [
+            {'agent_id': 'agent-1', 'amount': 10000.0},
+            {'agent_id': 'agent-2', 'amount': 30000.0},
+            {'agent_id': 'agent-2', 'amount': 50000.0}
+        ],
+        'response_times': [
+            {'agent_id': 'agent-1', 'response_time': 2.0},
+            {'agent_id': 'agent-1', 'response_time': 4.0},
+            {'agent_id': 'agent-1', 'response_time': None},
+            5.0
+        ]
+    }
+
+    def test_grouped_metrics(self):
+        per_agent = AgentMetricsFrame.from_payload(self.PAYLOAD).compute()
+        assert per_agent['agent-1'] == {
+            'personal_conversion_rate': 50.0,
+            'average_deal_size': 10000.0,
+            'response_time': 3.0
+        }
+        assert per_agent['agent-2']['average_deal_size'] == 40000.0
+        assert per_agent['agent-2']['response_time'] == 0.0
+
+    def test_leaderboard_ranking(self):
+        board = AgentMetricsFrame.from_payload(self.PAYLOAD).leaderboard(sort_by='average_deal_size')
+        assert [row['agent_id'] for row in board] == ['agent-2', 'agent-1']
+        assert board[0]['rank'] == 1
+
+    def test_empty_payload(self):
+        assert AgentMetricsFrame.from_payload({}).compute() == {}
+
+class TestDashboardSnapshotService:
+    def _service(self, calls):
+        service = DashboardSnapshotService(coalesce_window=0.01)
+
+        async def producer(timeframe):
+            calls.append(timeframe)
+            return {'timeframe': timeframe, 'metrics': {'won': len(calls)}}
+
+        service.register('performance', producer)
+        return service
+
+    @pytest.mark.asyncio
+    async def test_snapshot_is_cached_until_invalidated(self):
+        calls = []
+        service = self._service(calls)
+        first = await service.get('performance', '7d')
+        second = await service.get('performance', '7d')
+        assert first is second
+        assert calls == ['7d']
+
+    @pytest.mark.asyncio
+    async def test_invalidations_are_coalesced_and_pushed(self):
+        calls = []
+        service = self._service(calls)
+        before = await service.get('performance', '7d')
+        queue = service.subscribe()
+
+        for _ in range(10):
+            service.invalidate('metric')
+        delta = await asyncio.wait_for(queue.get(), timeout=1)
+
+        assert len(calls) == 2
+        assert delta['changes'] == {'metrics.won': 2}
+        assert delta['etag'] != before.etag
+
+    def test_diff_payload_reports_removed_keys(self):
+        assert diff_payload({'a': 1, 'b': {'c': 2}}, {'b': {'c': 3}}) == {'a': None, 'b.c': 3}
+
+class TestInsightsCache:
+    def _cache(self):
+        self.now = 0.0
+        return InsightsCache(ttl=60, stale_ttl=300, clock=lambda: self.now)
+
+    @pytest.mark.asyncio
+    async def test_hit_until_ttl_expires(self):
+        cache = self._cache()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return {'insights': len(calls)}
+
+        assert await cache.get('7d', {'won': 1}, compute) == {'insights': 1}
+        self.now = 30
+        assert await cache.get('7d', {'won': 1}, compute) == {'insights': 1}
+        assert len(calls) == 1
+        assert cache.stats()['hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_changed_metrics_serve_stale_and_revalidate(self):
+        cache = self._cache()
+
+        async def compute_old():
+            return 'old'
+
+        async def compute_new():
+            return 'new'
+
+        await cache.get('7d', {'won': 1}, compute_old)
+        assert await cache.get('7d', {'won': 2}, compute_new) == 'old'
+        await asyncio.sleep(0)
+        assert await cache.get('7d', {'won': 2}, compute_new) == 'new'
+        assert cache.stats()['stale_hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_call(self):
+        cache = self._cache()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'insights'
+
+        results = await asyncio.gather(*(cache.get('7d', {}, compute) for _ in range(10)))
+        assert results == ['insights'] * 10
+        assert len(calls) == 1
+        assert cache.stats()['shared_calls'] == 9
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_strand_followers(self):
+        cache = self._cache()
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return 'insights'
+
+        leader = asyncio.create_task(cache.get('7d', {}, compute))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get('7d', {}, compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.wait_for(follower, 1) == 'insights'
+        assert leader.cancelled() and cache._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_recomputes(self):
+        cache = self._cache()
+
+        async def compute():
+            return self.now
+
+        await cache.get('7d', {}, compute)
+        self.now = 1000
+        assert await cache.get('7d', {}, compute) == 1000
+        assert cache.stats()['misses'] == 2
+
+class TestForecasting:
+    LEADS = [
+        {
+            'budget_sufficient': True, 'is_decision_maker': True, 'timeline_match': True,
+            'engagement_score': 100, 'resolved_objections': 2, 'total_objections': 2,
+            'estimated_value': 10000.0, 'assigned_agent_id': 'agent-1', 'status': 'opportunity'
+        },
+        {
+            'engagement_score': 50, 'resolved_objections': 1, 'total_objections': 0,
+            'estimated_value': 20000.0, 'assigned_agent_id': 'agent-2', 'status': 'qualified'
+        },
+        {'estimated_value': 5000.0, 'status': 'qualified'}
+    ]
+
+    def test_batch_probabilities_align_with_input(self):
+        probabilities = predict_close_probabilities(self.LEADS)
+        assert probabilities.shape == (3,)
+        assert probabilities[0] == pytest.approx(1.0)
+        # Zero objections falls back to a denominator of one
+        assert probabilities[1] == pytest.approx(0.1 + 0.15)
+        assert probabilities[2] == 0.0
+
+    def test_expected_revenue_rollups(self):
+        forecast = forecast_pipeline(self.LEADS)
+        assert forecast.revenue_by_agent == {
+            'agent-1': pytest.approx(10000.0),
+            'agent-2': pytest.approx(5000.0),
+            'unassigned': 0.0
+        }
+        assert forecast.revenue_by_stage['qualified'] == pytest.approx(5000.0)
+        assert forecast.total_expected_revenue == pytest.approx(15000.0)
+
+    def test_empty_batch(self):
+        assert forecast_pipeline([]).probabilities.size == 0
+
+class TestIncrementalConversationAnalyzer:
+    def test_split_keeps_prefix_chunks_stable(self):
+        transcript = "".join(f"Line {i} of the call\n" for i in range(50))
+        longer = transcript + "Customer asked about financing\n"
+        before = split_transcript(transcript, chunk_size=200)
+        after = split_transcript(longer, chunk_size=200)
+        assert after[:len(before) - 1] == before[:-1]
+        assert "".join(after) == longer
+
+    @pytest.mark.asyncio
+    async def test_only_new_chunks_are_analyzed(self):
+        analyzer = IncrementalConversationAnalyzer(chunk_size=100)
+        analyzed = []
+
+        async def analyze_chunk(chunk):
+            analyzed.append(chunk)
+            return {'objections': ['price'], 'follow_up_opportunities': [f"chunk {len(analyzed)}"]}
+
+        transcript = "".join(f"Rep: point {i}\n" for i in range(30))
+        first = await analyzer.analyze('lead-1', transcript, analyze_chunk)
+        initial_calls = len(analyzed)
+        assert first['objections'] == ['price']
+
+        await analyzer.analyze('lead-1', transcript, analyze_chunk)
+        assert len(analyzed) == initial_calls
+
+        summary = await analyzer.analyze('lead-1', transcript + "Customer: send a quote\n", analyze_chunk)
+        assert len(analyzed) - initial_calls <= 2
+        assert len(summary['follow_up_opportunities']) > 1
+
+class TestHeuristicConversationAnalyzer:
+    def test_objections_signals_and_next_steps(self):
+        analyzer = HeuristicConversationAnalyzer()
+        result = analyzer.analyze(
+            "Customer: Honestly it sounds too expensive. I need to talk to my wife.\n"
+            "Rep: We have financing options.\n"
+            "Customer: OK, send me a quote and call me back next week."
+        )
+        assert result['objections_handled'] == {'price': 1, 'authority': 1}
+        assert 'financing' in result['buying_signals']
+        assert set(result['next_steps']) == {'Send quote', 'Follow-up call'}
+        assert result['needs_deep_analysis']
+
+    def test_sentiment_handles_negation(self):
+        analyzer = HeuristicConversationAnalyzer()
+        assert analyzer.sentiment("This is great, thanks!") > 0
+        assert analyzer.sentiment("This is not good at all") < 0
+        assert analyzer.sentiment("") == 0.0
+
+    def test_topics_prefer_distinctive_terms(self):
+        analyzer = HeuristicConversationAnalyzer()
+        for _ in range(5):
+            analyzer.add_transcript("We talked about the roof and the weather today")
+        topics = analyzer.analyze("The battery storage for the solar panels and the weather")['key_topics']
+        assert 'weather' not in topics[:2]
+        assert 'battery' in topics
+
+    def test_reanalysis_leaves_corpus_unchanged(self):
+        analyzer = HeuristicConversationAnalyzer()
+        analyzer.add_transcript("We talked about the roof and the weather today")
+        transcript = "The weather delayed the roof, and the solar panels too"
+        first = analyzer.analyze(transcript)['key_topics']
+        for _ in range(5):
+            assert analyzer.analyze(transcript)['key_topics'] == first
+        assert analyzer._document_count == 1
+
+class TestSimilarDealsIndex:
+    SALES = [
+        {'id': 's1', 'products': ['solar'], 'amount': 18000, 'time_in_pipeline': 20, 'total_calls': 4},
+        {'id': 's2', 'products': ['solar'], 'amount': 22000, 'time_in_pipeline': 35, 'total_calls': 6},
+        {'id': 's3', 'products': ['solar', 'battery'], 'amount': 60000, 'time_in_pipeline': 60, 'total_calls': 9},
+        {'id': 's4', 'products': ['hvac'], 'amount': 9000, 'time_in_pipeline': 10, 'total_calls': 2}
+    ]
+
+    def test_parse_budget_range(self):
+        assert parse_budget_range("$10,000 - 25000") == (10000.0, 25000.0)
+        assert parse_budget_range((5000, 1000)) == (1000.0, 5000.0)
+        assert parse_budget_range(None) is None
+
+    def test_parse_budget_range_degrades_on_free_text(self):
+        assert parse_budget_range("$10k-$25k") == (10000.0, 25000.0)
+        assert parse_budget_range("50000+") == (50000.0, 50000.0)
+        assert parse_budget_range("under 5000") == (0.0, 5000.0)
+        assert parse_budget_range("1.5M") == (1500000.0, 1500000.0)
+        assert parse_budget_range("TBD") is None
+        assert parse_budget_range(("low", "high")) is None
+        index = SimilarDealsIndex()
+        index.rebuild(self.SALES)
+        assert len(index.similar('solar', 'not sure yet', k=2)) == 2
+
+    def test_nearest_deals_within_product_and_budget(self):
+        index = SimilarDealsIndex()
+        index.rebuild(self.SALES)
+        deals = index.similar('Solar', '15000-25000', k=2, time_in_pipeline=18)
+        assert [deal['id'] for deal in deals] == ['s1', 's2']
+        assert index.similar('roofing', '15000-25000') == []
+
+    def test_widens_to_product_when_bucket_is_sparse(self):
+        index = SimilarDealsIndex()
+        index.rebuild(self.SALES)
+        index.add_sale({'id': 's5', 'products': ['battery'], 'amount': 12000, 'time_in_pipeline': 5, 'total_calls': 1})
+        deals = index.similar('battery', '10000-12000', k=2)
+        assert [deal['id'] for deal in deals] == ['s5', 's3']
+
+class TestServiceFactoryAgents:
+    def teardown_method(self):
+        from src.services.factory import ServiceFactory
+        ServiceFactory.reset()
+
+    def test_agents_built_once_on_first_use(self):
+        from src.services.factory import ServiceFactory
+
+        class FakeAgent:
+            instances = 0
+
+            def __init__(self):
+                FakeAgent.instances += 1
+
+        assert FakeAgent.instances == 0
+        first = ServiceFactory.get_agent(FakeAgent)
+        assert ServiceFactory.get_agent(FakeAgent) is first
+        assert FakeAgent.instances == 1
+        ServiceFactory.reset()
+        assert ServiceFactory.get_agent(FakeAgent) is not first
+
+    def test_workflow_construction_defers_agents(self):
+        # Workflows import the top-level packages, like the agents and main
+        from services.factory import ServiceFactory
+        from workflows.lead_workflow import LeadWorkflow
+        LeadWorkflow()
+        assert ServiceFactory._agents == {}
+
+    def test_concurrent_first_use_builds_one_agent(self):
+        from src.services.factory import ServiceFactory
+
+        class SlowAgent:
+            instances = 0
+
+            def __init__(self):
+                SlowAgent.instances += 1
+                time.sleep(0.05)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            agents = list(pool.map(lambda _: ServiceFactory.get_agent(SlowAgent), range(4)))
+        assert SlowAgent.instances == 1
+        assert all(agent is agents[0] for agent in agents)
+
+class TestAppLifecycle:
+    @pytest.mark.asyncio
+    async def test_warmup_runs_concurrently_and_reports_timings(self):
+        lifecycle = AppLifecycle()
+        lifecycle.add_warmup('a', lambda: asyncio.sleep(0.05))
+        lifecycle.add_warmup('b', lambda: asyncio.sleep(0.05))
+        assert await lifecycle.start() is True
+        status = lifecycle.status()
+        assert status['ready'] is True
+        assert status['warmup_ms'] < 90
+        assert status['steps']['a']['duration_ms'] >= 40
+
+    @pytest.mark.asyncio
+    async def test_only_required_failures_block_readiness(self):
+        async def fail():
+            raise ConnectionError("database unavailable")
+
+        lifecycle = AppLifecycle()
+        lifecycle.add_warmup('cache', fail, required=False)
+        assert await lifecycle.start() is True
+        assert lifecycle.status()['steps']['cache']['error'] == "ConnectionError: database unavailable"
+
+        lifecycle.add_warmup('database', fail)
+        assert await lifecycle.start() is False
+
+    @pytest.mark.asyncio
+    async def test_shutdown_runs_in_reverse_order(self):
+        calls = []
+
+        async def step(name):
+            calls.append(name)
+            if name == 'buffers':
+                raise RuntimeError("flush failed")
+
+        lifecycle = AppLifecycle()
+        lifecycle.add_shutdown('pools', lambda: step('pools'))
+        lifecycle.add_shutdown('buffers', lambda: step('buffers'))
+        await lifecycle.stop()
+        assert calls == ['buffers', 'pools']
+        assert lifecycle.is_ready is False
+
+class TestResilientHTTPClient:
+    @staticmethod
+    def make_client(handler, **kwargs):
+        return ResilientHTTPClient(
+            transport=httpx.MockTransport(handler),
+            retry_policy=RetryPolicy(max_retries=2, base_delay=0),
+            http2=False,
+            **kwargs
+        )
+
+    @pytest.mark.asyncio
+    async def test_retries_retryable_statuses_honoring_retry_after(self):
+        statuses = iter([429, 503, 200])
+
+        def handler(request):
+            return httpx.Response(next(statuses), headers={'Retry-After': '0'}, json={'ok': True})
+
+        client = self.make_client(handler)
+        response = await client.post('completions', 'https://api.test/v1/chat')
+        assert response.json() == {'ok': True}
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_raised_without_retry(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(400)
+
+        client = self.make_client(handler)
+        with pytest.raises(UpstreamError) as error:
+            await client.get('property_info', 'https://api.test/property')
+        assert error.value.status_code == 400
+        assert len(calls) == 1
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_circuit_opens_and_sheds_load(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503)
+
+        client = self.make_client(handler, failure_threshold=3)
+        with pytest.raises(UpstreamError):
+            await client.post('embeddings', 'https://api.test/v1/embeddings')
+        with pytest.raises(CircuitOpenError):
+            await client.post('embeddings', 'https://api.test/v1/embeddings')
+        assert len(calls) == 3
+        assert client.breaker('completions').state == 'closed'
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_throttling_is_retried_without_opening_the_circuit(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(429, headers={'Retry-After': '0'})
+
+        client = self.make_client(handler, failure_threshold=2)
+        for _ in range(2):
+            with pytest.raises(UpstreamError) as error:
+                await client.post('completions', 'https://api.test/v1/chat')
+            assert error.value.status_code == 429
+        assert len(calls) == 6
+        assert client.breaker('completions').state == 'closed'
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_half_open_trial_without_outcome_is_released(self):
+        release = asyncio.Event()
+        responses = []
+
+        async def handler(request):
+            if request.url.path == '/hang':
+                await release.wait()
+            if request.url.path == '/garbled':
+                raise httpx.DecodingError("bad gzip")
+            responses.append(request)
+            return httpx.Response(200)
+
+        now = [0.0]
+        client = self.make_client(handler, failure_threshold=1, reset_timeout=10)
+        breaker = client.breaker('property_info')
+        breaker._clock = lambda: now[0]
+        breaker.record_failure()
+        now[0] = 10
+
+        trial = asyncio.create_task(client.get('property_info', 'https://api.test/hang'))
+        await asyncio.sleep(0.01)
+        with pytest.raises(CircuitOpenError):
+            await client.get('property_info', 'https://api.test/ok')
+        trial.cancel()
+        await asyncio.gather(trial, return_exceptions=True)
+
+        with pytest.raises(httpx.DecodingError):
+            await client.get('property_info', 'https://api.test/garbled')
+        await client.get('property_info', 'https://api.test/ok')
+        assert breaker.state == 'closed' and len(responses) == 1
+        await client.aclose()
+
+    def test_half_open_trial_closes_or_reopens(self):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+        breaker.record_failure()
+        assert not breaker.allow()
+        now[0] = 10
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == 'open'
+        now[0] = 20
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == 'closed'
+
+class TestRateLimiter:
+    @staticmethod
+    def make_limiter(backend=None, **kwargs):
+        now = [0.0]
+        backend = backend or LocalBucketBackend(clock=lambda: now[0])
+        return RateLimiter(backend=backend, **kwargs), now
+
+    @pytest.mark.asyncio
+    async def test_bucket_allows_burst_then_waits_for_refill(self):
+        limiter, now = self.make_limiter(calls=3, window=0.3, reserve_fraction=0)
+        for _ in range(3):
+            await limiter.acquire('openai')
+        assert await limiter.backend.take('openai', 1, 10.0, 3, 0) == pytest.approx(0.1)
+        now[0] = 0.1
+        await asyncio.wait_for(limiter.acquire('openai'), 0.1)
+
+    @pytest.mark.asyncio
+    async def test_batch_cannot_use_live_reserve(self):
+        limiter, _ = self.make_limiter(calls=10, window=1000, reserve_fraction=0.5)
+        for _ in range(5):
+            await limiter.acquire('openai', priority=Priority.BATCH)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter.acquire('openai', priority=Priority.BATCH), 0.05)
+        for _ in range(5):
+            await asyncio.wait_for(limiter.acquire('openai', priority=Priority.LIVE), 0.05)
+
+    @pytest.mark.asyncio
+    async def test_live_waiters_are_served_before_batch(self):
+        limiter, now = self.make_limiter(calls=1, window=0.1, reserve_fraction=0)
+        await limiter.acquire('openai')
+        order = []
+
+        async def call(name, priority):
+            await limiter.acquire('openai', priority=priority)
+            order.append(name)
+
+        batch = asyncio.create_task(call('batch', Priority.BATCH))
+        await asyncio.sleep(0)
+        with rate_limit_scope(Priority.LIVE):
+            live = asyncio.create_task(call('live', Priority.LIVE))
+        await asyncio.sleep(0)
+        now[0] = 0.1
+        await asyncio.wait_for(live, 0.5)
+        now[0] = 0.2
+        await asyncio.wait_for(batch, 0.5)
+        assert order == ['live', 'batch']
+
+    @pytest.mark.asyncio
+    async def test_tenant_budget_is_separate_from_upstream(self):
+        limiter, _ = self.make_limiter(calls=100, window=1000, tenant_limit=(2, 1000), reserve_fraction=0)
+        with rate_limit_scope(tenant='acme'):
+            await limiter.acquire('slack')
+            await limiter.acquire('slack')
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(limiter.acquire('slack'), 0.05)
+        await asyncio.wait_for(limiter.acquire('slack', tenant='globex'), 0.05)
+
+    @pytest.mark.asyncio
+    async def test_redis_backend_shares_budget_between_workers(self):
+        fakeredis = pytest.importorskip('fakeredis')
+        pytest.importorskip('lupa')
+        server = fakeredis.FakeServer()
+        now = [1000.0]
+        workers = [
+            RateLimiter(
+                calls=4, window=4, reserve_fraction=0,
+                backend=RedisBucketBackend(fakeredis.FakeAsyncRedis(server=server), clock=lambda: now[0])
+            )
+            for _ in range(2)
+        ]
+        for worker in workers:
+            await worker.acquire('openai')
+            await worker.acquire('openai')
+        wait = await workers[0].backend.take('openai', 1, 1.0, 4, 0)
+        assert wait == pytest.approx(1.0)
+        now[0] += 1
+        await asyncio.wait_for(workers[1].acquire('openai'), 0.1)
+
+class TestRequestCoalescer:
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_prompts_share_one_call(self):
+        coalescer = RequestCoalescer()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "solar facts"
+
+        results = await asyncio.gather(*(
+            coalescer.completion("gpt-4", "key information about  solar\n", 0, call)
+            for _ in range(10)
+        ))
+        assert results == ["solar facts"] * 10
+        assert len(calls) == 1
+        assert coalescer.stats()['coalesced_calls'] == 9
+        assert coalescer.stats()['in_flight'] == 0
+
+    @pytest.mark.asyncio
+    async def test_sampled_requests_are_not_coalesced(self):
+        coalescer = RequestCoalescer()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0)
+            return len(calls)
+
+        await asyncio.gather(
+            coalescer.completion("gpt-4", "pitch", 0.7, call),
+            coalescer.completion("gpt-4", "pitch", 0.7, call),
+            coalescer.completion("gpt-4", "pitch", 0, call, coalesce=False)
+        )
+        assert len(calls) == 3
+        assert coalescer.stats()['bypassed_calls'] == 3
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared_and_cancellation_is_isolated(self):
+        coalescer = RequestCoalescer()
+        release = asyncio.Event()
+
+        async def call():
+            await release.wait()
+            raise RuntimeError("upstream down")
+
+        first = asyncio.create_task(coalescer.completion("gpt-4", "q", 0, call))
+        second = asyncio.create_task(coalescer.completion("gpt-4", "q", 0, call))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        with pytest.raises(RuntimeError):
+            await second
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_calls_are_only_shared_within_a_rate_limit_lane(self):
+        coalescer = RequestCoalescer()
+        release = asyncio.Event()
+        lanes = []
+
+        async def call():
+            lanes.append(current_scope()[0])
+            await release.wait()
+            return "facts"
+
+        async def ask(priority):
+            with rate_limit_scope(priority=priority):
+                return await coalescer.completion("gpt-4", "q", 0, call)
+
+        batch = [asyncio.create_task(ask(Priority.BATCH)) for _ in range(2)]
+        await asyncio.sleep(0)
+        live = asyncio.create_task(ask(Priority.LIVE))
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*batch, live) == ["facts"] * 3
+        assert sorted(lanes) == [Priority.LIVE, Priority.BATCH]
+        assert coalescer.stats()['coalesced_calls'] == 1
+
+class TestCadencePlanner:
+    MONDAY = datetime(2025, 1, 6)
+
+    def test_delays_follow_business_hours(self):
+        planner = CadencePlanner(BusinessCalendar(9, 17))
+        friday_evening = datetime(2025, 1, 3, 16, 50)
+        # Due exactly at closing means due at the next opening
+        assert planner.next_attempt(1, friday_evening) == self.MONDAY.replace(hour=9)
+        assert planner.next_attempt(2, friday_evening) == self.MONDAY.replace(hour=9, minute=20)
+        # A one-day delay is one working day, not 24 hours
+        assert planner.next_attempt(9, friday_evening) == self.MONDAY.replace(hour=16, minute=50)
+
+    def test_plan_many_matches_next_attempt(self):
+        planner = CadencePlanner(BusinessCalendar(9, 17, holidays=["2025-01-20"]))
+        last = [self.MONDAY + timedelta(minutes=97 * i) for i in range(300)]
+        attempts = [i % 7 for i in range(300)]
+        planned = planner.plan_many(attempts, last).astype(datetime).tolist()
+        assert planned == [planner.next_attempt(a, t) for a, t in zip(attempts, last)]
+
+    def test_spread_smooths_monday_backlog(self):
+        planner = CadencePlanner(BusinessCalendar(9, 17), slot_minutes=15, calls_per_agent_per_hour=8)
+        opening = self.MONDAY.replace(hour=9)
+        due = [opening] * 25 + [opening + timedelta(hours=3)]
+        spread = planner.spread(due, agents=5).astype(datetime).tolist()
+
+        capacity = planner.slot_capacity(5)
+        assert capacity == 10
+        slots = {}
+        for time in spread:
+            assert planner.calendar.is_business_time(time)
+            slots[time] = slots.get(time, 0) + 1
+        assert max(slots.values()) <= capacity
+        assert spread[:25] == sorted(spread[:25])
+        assert spread[-1] == opening + timedelta(hours=3)
+        assert all(time >= original for time, original in zip(spread, due))
+
+class FakeLeadStore:
+    def __init__(self, fail_on_batch=None):
+        self.batches = []
+        self.fail_on_batch = fail_on_batch
+
+    async def create_leads(self, leads):
+        if len(self.batches) == self.fail_on_batch:
+            self.fail_on_batch = None
+            raise ConnectionError("database unavailable")
+        self.batches.append(leads)
+        return [lead['id'] for lead in leads]
+
+    @property
+    def leads(self):
+        return [lead for batch in self.batches for lead in batch]
+
+class TestLeadImporter:
+    HEADER = "first_name,last_name,email,phone,source,interest_level,estimated_value,campaign\n"
+
+    def write_csv(self, tmp_path, rows):
+        path = tmp_path / "partner.csv"
+        path.write_text(self.HEADER + "".join(rows))
+        return str(path)
+
+    @pytest.mark.asyncio
+    async def test_imports_validates_normalizes_and_scores(self, tmp_path):
+        path = self.write_csv(tmp_path, [
+            'Ada,Lovelace,ADA@Example.com,(212) 555-0101,website,4,25000,"spring\nlaunch"\n',
+            'Bad,Source,b@example.com,212-555-0102,billboard,3,,x\n',
+            'Too,Keen,k@example.com,212-555-0103,referral,9,,x\n',
+            'Ada,Again,ada@example.com,,website, 2,,x\n',
+        ])
+        store = FakeLeadStore()
+        report = await LeadImporter(store, batch_size=10).run(path)
+
+        assert (report.rows_read, report.imported, report.rejected, report.duplicates) == (4, 1, 2, 1)
+        assert [row for row, _ in report.errors] == [2, 3]
+        assert report.errors[0][1].startswith("source")
+        lead = store.leads[0]
+        assert lead['phone'] == "+12125550101" and lead['email'] == "ada@example.com"
+        assert lead['metadata'] == {'campaign': "spring\nlaunch"}
+        assert lead['priority_score'] == pytest.approx(48 + 15 + 2.5)
+        assert not os.path.exists(LeadImporter(store).checkpoint_path(path))
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_checkpoint_after_failure(self, tmp_path):
+        rows = [f"Lead,{i},l{i}@example.com,,website,3,,x\n" for i in range(25)]
+        path = self.write_csv(tmp_path, rows)
+        store = FakeLeadStore(fail_on_batch=2)
+        with pytest.raises(ConnectionError):
+            await LeadImporter(store, batch_size=10).run(path)
+        assert len(store.leads) == 20
+
+        report = await LeadImporter(store, batch_size=10).run(path)
+        assert report.resumed_rows == 20 and report.rows_read == 25
+        assert sorted(int(lead['last_name']) for lead in store.leads) == list(range(25))
+
+    @pytest.mark.asyncio
+    async def test_duplicates_are_found_across_batches_and_resumes(self, tmp_path):
+        rows = [f"Lead,{i},,212-555-01{i % 7:02d},website,3,,x\n" for i in range(25)]
+        path = self.write_csv(tmp_path, rows)
+        store = FakeLeadStore(fail_on_batch=1)
+        with pytest.raises(ConnectionError):
+            await LeadImporter(store, batch_size=5).run(path)
+        assert len(store.leads) == 5
+
+        report = await LeadImporter(store, batch_size=5).run(path)
+        assert (report.imported, report.duplicates) == (7, 18)
+        assert sorted(lead['phone'] for lead in store.leads) == [f"+121255501{i:02d}" for i in range(7)]
+        assert not os.path.exists(LeadImporter(store).contacts_path(path))
+
+    @pytest.mark.asyncio
+    async def test_jsonl_rows_and_fast_path(self, tmp_path):
+        path = tmp_path / "partner.jsonl"
+        path.write_text(
+            '{"first_name": "Grace", "last_name": "Hopper", "source": "social", "interest_level": 5}\n'
+            'not json\n'
+            '{"first_name": "Alan", "last_name": "Turing", "source": "other", "interest_level": "5"}\n'
+        )
+        store = FakeLeadStore()
+        report = await LeadImporter(store).run(str(path))
+        assert (report.imported, report.rejected) == (2, 1)
+        assert fast_validate({"first_name": "A", "last_name": "B", "source": "other", "interest_level": 1.5}) is None
+
+
+class TestLeadBook:
+    NOW = datetime(2025, 3, 17, 12, 0)
+
+    def make_book(self):
+        book = LeadBook(capacity=8)
+        book.load([
+            {'id': f"lead-{i}", 'status': status, 'source': source, 'assigned_agent_id': agent,
+             'estimated_value': value, 'last_contact': contact}
+            for i, (status, source, agent, value, contact) in enumerate([
+                ('new', 'website', 'agent-1', 60000.0, None),
+                ('qualified', 'referral', 'agent-1', 80000.0, self.NOW - timedelta(days=10)),
+                ('qualified', 'referral', 'agent-2', 75000.0, self.NOW - timedelta(days=1)),
+                ('opportunity', 'website', 'agent-2', 20000.0, None),
+                ('closed_won', 'website', 'agent-1', 90000.0, self.NOW - timedelta(days=30)),
+                ('contacted', 'social', None, None, None),
+            ] * 3)
+        ])
+        return book
+
+    def test_filters_match_a_row_by_row_scan(self):
+        book = self.make_book()
+        assert len(book) == 18
+        rows = book.filter(statuses=['qualified', LeadStatus.OPPORTUNITY], sources='website')
+        assert len(rows) == 3
+        assert book.count(statuses='qualified', agents=['agent-2'], min_value=70000) == 3
+        assert book.count(not_contacted_since=self.NOW - timedelta(days=7)) == 15
+        assert book.count(agents=['nobody']) == 0
+
+    def test_events_move_rows_between_bitmaps(self):
+        book = self.make_book()
+        book.apply_event({'lead_id': 'lead-0', 'agent_id': 'agent-3', 'new_status': LeadStatus.CONTACTED})
+        assert book.count(statuses='new') == 2
+        assert book.lead_ids(book.filter(agents=['agent-3'])) == ['lead-0']
+        book.upsert({'id': 'lead-1', 'deleted': True})
+        assert book.count(statuses='qualified') == 5
+        book.upsert({'id': 'lead-new', 'source': 'referral'})
+        assert book.filter(statuses='new', sources='referral').tolist() == [1]
+
+    def test_grows_past_capacity(self):
+        book = LeadBook(capacity=8)
+        book.load({'id': str(i), 'status': 'qualified', 'source': 'other'} for i in range(100))
+        assert book.count(statuses='qualified', sources='other') == 100
+        book.load([{'id': '7', 'status': 'new'}, {'id': '100', 'status': 'new'}])
+        assert book.lead_ids(book.filter(statuses='new')) == ['7', '100']
+
+    def test_pipeline_view_groups_stale_opportunities(self):
+        view = PipelineView(self.make_book())
+        stale = view.stale_opportunities(min_value=50000, idle_days=7, now=self.NOW)
+        assert stale['count'] == 6
+        assert stale['groups'] == {'agent-1': {'count': 6, 'total_value': 420000.0, 'average_value': 70000.0}}
+        stages = view.stage_summary()['groups']
+        assert stages['contacted'] == {'count': 3, 'total_value': 0.0, 'average_value': 0.0}
+        assert view.agent_load()[None]['count'] == 3
+        with pytest.raises(ValueError):
+            view.query(group_by='company')
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def eq(self, column, value):
+        return self
+
+    async def execute(self):
+        return type('Result', (), {'data': self.rows})()
+
+
+class FakeTable:
+    def __init__(self, name):
+        self.name = name
+
+    def insert(self, data):
+        rows = data if isinstance(data, list) else [data]
+        return FakeQuery([{'id': f"{self.name}-{i}", **row} for i, row in enumerate(rows)])
+
+    def update(self, data):
+        return FakeQuery([{'assigned_agent_id': 'agent-1', **data}])
+
+
+class FakeSupabase:
+    def table(self, name):
+        return FakeTable(name)
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+class TestEventBus:
+    @pytest.mark.asyncio
+    async def test_fans_out_to_handlers_and_bounded_subscriptions(self):
+        bus = EventBus(subscriber_queue_size=2)
+        handled = []
+        bus.add_handler(handled.append, SaleCreated)
+        leads = bus.subscribe(LeadStatusChanged)
+        for i in range(3):
+            await bus.publish(LeadStatusChanged(lead_id=f"lead-{i}", new_status='contacted'))
+        await bus.publish(SaleCreated(sale_id='sale-1', amount=100.0))
+
+        assert [event.sale_id for event in handled] == ['sale-1']
+        assert leads.dropped == 1
+        assert [(await leads.get()).lead_id for _ in range(2)] == ['lead-1', 'lead-2']
+        leads.close()
+        await bus.publish(LeadStatusChanged(lead_id='lead-3', new_status='new'))
+        assert leads.queue.empty()
+
+    @pytest.mark.asyncio
+    async def test_transport_delivers_to_other_workers_only(self):
+        first_transport = InMemoryTransport()
+        first, second = EventBus(first_transport), EventBus(first_transport.peer())
+        received = {'first': [], 'second': []}
+        first.add_handler(received['first'].append)
+        second.add_handler(received['second'].append)
+        await first.start()
+        await second.start()
+        await asyncio.sleep(0)  # readers tail from the end, like XREAD $
+
+        attempt = CallAttemptRecorded(lead_id='lead-1', outcome='no_answer', timestamp=datetime(2025, 3, 3, 10))
+        await first.publish(attempt)
+        await asyncio.sleep(0.01)
+        await first.close()
+        await second.close()
+
+        assert received['first'] == [attempt]
+        assert received['second'] == [attempt]
+        assert isinstance(received['second'][0].timestamp, datetime)
+
+    @pytest.mark.asyncio
+    async def test_database_writes_publish_after_commit(self):
+        bus = EventBus()
+        handled = []
+        bus.add_handler(handled.append)
+        db = DatabaseService(client=FakeSupabase(), event_bus=bus)
+
+        await db.create_lead({'first_name': 'Ada'})
+        assert isinstance(handled[-1], LeadCreated) and handled[-1].lead['first_name'] == 'Ada'
+
+        async with db.transaction():
+            await db.update_lead_status('lead-1', {'status': 'qualified', 'current_status': 'contacted'})
+            await db.create_sale({'lead_id': 'lead-1', 'agent_id': 'agent-1', 'amount': 900})
+            assert len(handled) == 1
+        assert [event.event_type for event in handled[1:]] == ['LeadStatusChanged', 'SaleCreated']
+        assert handled[1].old_status == 'contacted' and handled[1].agent_id == 'agent-1'
+        assert handled[2].agent_id == 'agent-1'
+
+        with pytest.raises(RuntimeError):
+            async with db.transaction():
+                await db.update_lead('lead-1', {'estimated_value': 10})
+                raise RuntimeError("rolled back")
+        assert len(handled) == 3
+
+    @pytest.mark.asyncio
+    async def test_similar_deals_only_index_committed_sales(self):
+        bus = EventBus()
+        index = SimilarDealsIndex()
+        bus.add_handler(lambda event: index.add_sale(event.sale_row()), SaleCreated)
+        db = DatabaseService(client=FakeSupabase(), event_bus=bus)
+
+        with pytest.raises(RuntimeError):
+            async with db.transaction():
+                await db.create_sale({'lead_id': 'lead-1', 'amount': 900, 'products': ['solar']})
+                raise RuntimeError("rolled back")
+        assert index.size == 0
+
+        async with db.transaction():
+            await db.create_sale({'lead_id': 'lead-2', 'amount': 1200, 'products': ['solar']})
+        assert [deal['lead_id'] for deal in index.similar('solar')] == ['lead-2']
+
+
+class TestLiveCallQueue:
+    START = datetime(2025, 3, 3, 8, tzinfo=timezone.utc).timestamp()
+
+    def make_queue(self):
+        clock = [self.START]
+        return LiveCallQueue(clock=lambda: clock[0]), clock
+
+    def test_heap_tracks_reschedules_reassignments_and_closes(self):
+        queue, _ = self.make_queue()
+        changed = []
+        queue.add_listener(changed.append)
+        queue.load([
+            {'id': 'a', 'assigned_agent_id': 'agent-1', 'next_attempt': '2025-03-03T10:00:00'},
+            {'id': 'b', 'assigned_agent_id': 'agent-1', 'next_attempt': '2025-03-03T09:00:00'},
+            {'id': 'c', 'assigned_agent_id': 'agent-2', 'next_attempt': None},
+        ])
+        assert queue.agent_state('agent-1') == {
+            'agent_id': 'agent-1', 'depth': 2, 'due_now': 0, 'overdue': 0,
+            'overdue_histogram': {'0-15m': 0, '15m-1h': 0, '1h-4h': 0, '4h-24h': 0, '24h+': 0},
+            'next_lead_id': 'b', 'oldest_due': '2025-03-03T09:00:00'
+        }
+        assert queue.depth('agent-2') == 0 and changed == ['agent-1', 'agent-1']
+
+        queue.upsert({'id': 'b', 'next_attempt': datetime(2025, 3, 4, 9)})
+        assert queue.peek('agent-1')[0] == 'a'
+        queue.upsert({'id': 'a', 'assigned_agent_id': 'agent-2'})
+        assert queue.peek('agent-2')[0] == 'a' and queue.depth('agent-1') == 1
+        queue.upsert({'id': 'b', 'status': LeadStatus.CLOSED_WON})
+        assert queue.peek('agent-1') is None and len(queue) == 1
+
+    def test_compacts_stale_heap_entries(self):
+        queue = LiveCallQueue()
+        for minute in range(1000):
+            queue.upsert({'id': 'a', 'assigned_agent_id': 'agent-1', 'next_attempt': datetime(2025, 3, 3, 9) + timedelta(minutes=minute)})
+        assert len(queue._heaps['agent-1']) < 100
+        assert queue.peek('agent-1') == ('a', datetime(2025, 3, 3, 9) + timedelta(minutes=999))
+
+    def test_due_and_overdue_counters_follow_the_clock(self):
+        queue, clock = self.make_queue()
+        changed = []
+        queue.add_listener(changed.append)
+        queue.load([
+            {'id': 'a', 'assigned_agent_id': 'agent-1', 'next_attempt': '2025-03-03T09:00:00'},
+            {'id': 'b', 'assigned_agent_id': 'agent-1', 'next_attempt': '2025-03-03T10:00:00'},
+            {'id': 'c', 'assigned_agent_id': 'agent-2', 'next_attempt': '2025-03-03T07:30:00'},
+            {'id': 'd', 'next_attempt': '2025-03-01T08:00:00'},
+        ])
+        metrics = queue.metrics()
+        assert (metrics['depth'], metrics['due_now'], metrics['overdue']) == (4, 2, 2)
+        assert metrics['overdue_histogram'] == {'0-15m': 0, '15m-1h': 1, '1h-4h': 0, '4h-24h': 0, '24h+': 1}
+        assert (metrics['next_lead_id'], metrics['oldest_due']) == ('d', '2025-03-01T08:00:00')
+        assert queue.metrics('agent-1')['due_now'] == 0
+
+        changed.clear()
+        clock[0] = self.START + 2 * 3600 + 60  # 10:01
+        metrics = queue.metrics('agent-1')
+        assert (metrics['due_now'], metrics['overdue']) == (2, 1)
+        assert metrics['overdue_histogram']['0-15m'] == 1 and metrics['overdue_histogram']['1h-4h'] == 1
+        assert queue.metrics('agent-2')['overdue_histogram']['1h-4h'] == 1
+        assert sorted(changed, key=str) == ['agent-1', 'agent-2']
+
+        # Calling or rescheduling a lead takes it out of the buckets it had crossed
+        queue.upsert({'id': 'a', 'next_attempt': '2025-03-04T09:00:00'})
+        queue.upsert({'id': 'd', 'status': LeadStatus.CLOSED_LOST})
+        metrics = queue.metrics()
+        assert (metrics['depth'], metrics['due_now'], metrics['overdue']) == (3, 2, 1)
+        assert metrics['overdue_histogram'] == {'0-15m': 1, '15m-1h': 0, '1h-4h': 1, '4h-24h': 0, '24h+': 0}
+        assert metrics['next_lead_id'] == 'c'
+
+    @pytest.mark.asyncio
+    async def test_reconcile_corrects_drift_and_replays_concurrent_events(self):
+        queue, _ = self.make_queue()
+
+        class FakeDatabase:
+            rows = [
+                {'id': 'a', 'assigned_agent_id': 'agent-1', 'next_attempt': '2025-03-03T07:00:00', 'status': 'new'},
+                {'id': 'b', 'assigned_agent_id': 'agent-2', 'next_attempt': '2025-03-03T09:00:00', 'status': 'new'},
+                {'id': 'c', 'assigned_agent_id': 'agent-2', 'next_attempt': '2025-03-03T11:00:00', 'status': 'new'},
+            ]
+
+            async def get_queued_leads(self, limit, offset):
+                # A call is recorded while the pages are read
+                queue.upsert({'id': 'b', 'next_attempt': None})
+                return self.rows[offset:offset + limit]
+
+        assert not queue.is_ready
+        assert await queue.rebuild_from_database(FakeDatabase(), page_size=2) == 2
+        assert queue.is_ready and queue.depth('agent-2') == 1
+
+        queue.remove('a')  # a missed event
+        queue.upsert({'id': 'z', 'assigned_agent_id': 'agent-1', 'next_attempt': '2025-03-03T07:00:00'})
+        database = FakeDatabase()
+        database.rows = database.rows[:1] + database.rows[2:]
+        assert await queue.reconcile(database) == 2
+        metrics = queue.metrics()
+        assert (metrics['depth'], metrics['due_now'], metrics['next_lead_id']) == (2, 1, 'a')
+
+
+class FakeSocket:
+    def __init__(self, fail=False):
+        self.frames = []
+        self.fail = fail
+
+    async def send_text(self, frame):
+        if self.fail:
+            raise ConnectionError("gone")
+        self.frames.append(json.loads(frame))
+
+
+class TestRealtimeGateway:
+    def make_gateway(self):
+        state = {'agent-1': {'depth': 1, 'next_lead_id': 'a'}}
+        gateway = RealtimeGateway(batch_window=0.01)
+        gateway.register('queue', lambda agent_id: dict(state[agent_id]))
+        return gateway, state
+
+    @pytest.mark.asyncio
+    async def test_sends_full_state_then_batched_diffs(self):
+        gateway, state = self.make_gateway()
+        socket, late = FakeSocket(), FakeSocket()
+        gateway.connect(socket, ['queue:agent-1'])
+        await asyncio.sleep(0.05)
+        assert socket.frames == [{'updates': [{'topic': 'queue:agent-1', 'version': 1, 'full': state['agent-1']}]}]
+
+        for depth in (2, 3, 4):
+            state['agent-1']['depth'] = depth
+            gateway.mark_dirty('queue:agent-1')
+        gateway.mark_dirty('queue:agent-9')  # nobody subscribed
+        gateway.connect(late, ['queue:agent-1'])
+        await asyncio.sleep(0.05)
+        assert socket.frames[1] == {'updates': [{'topic': 'queue:agent-1', 'version': 2, 'changes': {'depth': 4}}]}
+        assert late.frames[0]['updates'][0]['full'] == {'depth': 4, 'next_lead_id': 'a'}
+
+        gateway.mark_dirty('queue:agent-1')
+        await asyncio.sleep(0.05)
+        assert len(socket.frames) == 2 and gateway.frames_sent == 3
+
+    @pytest.mark.asyncio
+    async def test_drops_failed_connections_and_rejects_unknown_topics(self):
+        gateway, _ = self.make_gateway()
+        gateway.connect(FakeSocket(fail=True), ['queue:agent-1'])
+        with pytest.raises(ValueError):
+            gateway.connect(FakeSocket(), ['pipeline'])
+        await asyncio.sleep(0.05)
+        assert len(gateway) == 0
+        await gateway.close()
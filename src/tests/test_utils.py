@@ -1,3 +1,5 @@
+import json
+import random
 import pytest
 from datetime import datetime, timedelta
 from src.utils.validators import (
@@ -14,6 +16,18 @@ from src.utils.helpers import (
     is_business_hours,
     mask_sensitive_data
 )
+from src.utils.quantile_sketch import DDSketch
+from src.utils.aho_corasick import AhoCorasick
+from src.utils.business_calendar import BusinessCalendar
+from src.utils.pii_masker import PIIMasker
+from src.utils.contact_normalizer import ContactError, ContactNormalizer, find_duplicates
+from src.utils.prompt_builder import (
+    PromptBuilder,
+    count_tokens,
+    dedupe_passages,
+    metrics_table,
+    truncate_to_tokens
+)
 
 class TestValidators:
     def test_phone_validation(self):
@@ -75,4 +89,243 @@ class TestHelpers:
         assert "[EMAIL]" in masked
         assert "[PHONE]" in masked
         assert "john@example.com" not in masked
-        assert "(123) 456-7890" not in masked
\ No newline at end of file
+        assert "(123) 456-7890" not in masked
+
+class TestDDSketch:
+    def _exact_quantile(self, values, q):
+        ordered = sorted(values)
+        return ordered[int(q * (len(ordered) - 1))]
+
+    def test_quantile_accuracy(self):
+        rng = random.Random(42)
+        values = [rng.lognormvariate(3, 1.5) for _ in range(20000)]
+        sketch = DDSketch(relative_accuracy=0.01)
+        sketch.add_many(values)
+
+        for q in (0.5, 0.9, 0.99):
+            exact = self._exact_quantile(values, q)
+            assert abs(sketch.quantile(q) - exact) <= exact * 0.01 + 1e-9
+
+    def test_merge_matches_single_sketch(self):
+        rng = random.Random(7)
+        values = [rng.expovariate(0.1) for _ in range(5000)]
+        combined = DDSketch()
+        combined.add_many(values)
+        left, right = DDSketch(), DDSketch()
+        left.add_many(values[:2000])
+        right.add_many(values[2000:])
+
+        merged = left.merge(right)
+        assert merged.count == combined.count
+        for q in (0.5, 0.9, 0.99):
+            assert merged.quantile(q) == combined.quantile(q)
+
+    def test_serialization_round_trip(self):
+        sketch = DDSketch()
+        sketch.add_many([0, 1.5, 30, 240, 3600])
+        restored = DDSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+        assert restored.count == 5
+        assert restored.quantile(0.5) == sketch.quantile(0.5)
+        assert restored.quantile(0) == 0.0
+
+    def test_bins_are_bounded(self):
+        sketch = DDSketch(relative_accuracy=0.01, max_bins=64)
+        sketch.add_many(10 ** (i / 100) for i in range(1000))
+        assert len(sketch.bins) <= 64
+        assert sketch.quantile(1.0) == sketch.max
+
+class TestAhoCorasick:
+    def test_overlapping_patterns(self):
+        matcher = AhoCorasick([("he", "he"), ("she", "she"), ("hers", "hers")], whole_words=False)
+        found = sorted((start, payload) for start, _, payload in matcher.iter_matches("ushers"))
+        assert found == [(1, "she"), (2, "he"), (2, "hers")]
+
+    def test_whole_word_matching_is_case_insensitive(self):
+        matcher = AhoCorasick([("too expensive", "price"), ("cost", "price")])
+        assert matcher.count("It's TOO expensive and the costs add up") == {"price": 1}
+
+class TestPromptBuilder:
+    PASSAGE = "Solar panels on south facing roofs produce the most energy across the year. "
+
+    @pytest.fixture
+    def approximate_tokens(self, monkeypatch):
+        # Keep the budgets deterministic and offline: no tiktoken download
+        import src.utils.prompt_builder as module
+        monkeypatch.setattr(module, "_encoding", lambda model: None)
+
+    def test_failed_encoding_load_falls_back_once(self, monkeypatch):
+        import sys
+        import types
+        import src.utils.prompt_builder as module
+        attempts = []
+
+        def encoding_for_model(model):
+            attempts.append(model)
+            raise ConnectionError("offline")
+
+        monkeypatch.setitem(sys.modules, "tiktoken", types.SimpleNamespace(encoding_for_model=encoding_for_model))
+        module._encoding.cache_clear()
+        try:
+            assert count_tokens("two words", model="offline-model") == 3
+            assert count_tokens("and three more", model="offline-model") == 4
+        finally:
+            module._encoding.cache_clear()
+        assert attempts == ["offline-model"]
+
+    def test_truncate_respects_budget_and_sentences(self, approximate_tokens):
+        text = self.PASSAGE * 40
+        truncated = truncate_to_tokens(text, 50)
+        assert count_tokens(truncated) <= 50
+        assert truncated.endswith(".")
+
+    def test_dedupe_drops_copies_and_contained_passages(self):
+        passages = [
+            self.PASSAGE + "Battery storage adds backup power.",
+            self.PASSAGE,
+            "Heat pumps replace both furnace and air conditioner."
+        ]
+        assert dedupe_passages(passages) == [0, 2]
+
+    def test_metrics_table_flattens_and_caps_rows(self):
+        table = metrics_table({'revenue': {'total': 12345.678, 'by_product': {'solar': 10000}}, 'deals': [1, 2]})
+        assert table.splitlines() == ['revenue.total | 1.235e+04', 'revenue.by_product.solar | 10000', 'deals | 1, 2']
+        assert metrics_table({f"k{i}": i for i in range(5)}, max_rows=2).endswith("3 more rows omitted")
+
+    def test_builder_fits_ranked_passages_to_budget(self, approximate_tokens):
+        rng = random.Random(7)
+        words = [f"word{i}" for i in range(500)]
+        passages = [f"Passage {i}: " + " ".join(rng.choices(words, k=60)) for i in range(10)]
+        prompt = (
+            PromptBuilder(max_tokens=300)
+            .add_section("Question: which roofs suit solar?")
+            .add_passages(passages, scores=list(range(10)))
+            .add_section("Answer briefly.")
+            .build()
+        )
+        assert count_tokens(prompt) <= 300
+        assert prompt.startswith("Question") and prompt.endswith("Answer briefly.")
+        assert "Passage 9:" in prompt and "Passage 0:" not in prompt
+
+class TestBusinessCalendar:
+    FRIDAY = datetime(2025, 1, 3)
+
+    @staticmethod
+    def brute_force_hours(calendar, start, end):
+        minutes = 0
+        current = start
+        while current < end:
+            if calendar.is_business_time(current):
+                minutes += 1
+            current += timedelta(minutes=1)
+        return minutes / 60
+
+    def test_partial_hours_weekends_and_holidays(self):
+        calendar = BusinessCalendar(9, 17)
+        assert calendar.working_hours(self.FRIDAY.replace(hour=9, minute=30), self.FRIDAY.replace(hour=11, minute=15)) == 1.75
+        monday = self.FRIDAY + timedelta(days=3)
+        assert calendar.working_hours(self.FRIDAY.replace(hour=16), monday.replace(hour=10)) == 2
+        with_holiday = BusinessCalendar(9, 17, holidays=["2025-01-06"])
+        assert with_holiday.working_hours(self.FRIDAY.replace(hour=16), monday.replace(hour=10) + timedelta(days=1)) == 2
+        assert calendar.working_hours(monday, self.FRIDAY) == 0
+
+    def test_matches_brute_force_over_random_spans(self):
+        calendar = BusinessCalendar(8.5, 17, holidays=[datetime(2025, 1, 20).date(), "2025-02-17"])
+        rng = random.Random(3)
+        for _ in range(20):
+            start = self.FRIDAY + timedelta(minutes=rng.randrange(0, 60 * 24 * 60))
+            end = start + timedelta(minutes=rng.randrange(0, 60 * 24 * 10))
+            assert calendar.working_hours(start, end) == pytest.approx(self.brute_force_hours(calendar, start, end))
+
+    def test_vectorized_matches_scalar(self):
+        calendar = BusinessCalendar(9, 17, holidays=["2025-01-20"])
+        rng = random.Random(5)
+        starts = [self.FRIDAY + timedelta(seconds=rng.randrange(0, 86400 * 90)) for _ in range(200)]
+        ends = [start + timedelta(seconds=rng.randrange(-86400, 86400 * 30)) for start in starts]
+        expected = [calendar.working_hours(start, end) for start, end in zip(starts, ends)]
+        assert calendar.working_hours_many(starts, ends).tolist() == pytest.approx(expected)
+
+    def test_timezone_schedule_reads_naive_times_as_utc(self):
+        calendar = BusinessCalendar(9, 17, timezone="America/New_York")
+        # 14:00-22:00 UTC is 09:00-17:00 in New York in January
+        assert calendar.working_hours(datetime(2025, 1, 8, 14), datetime(2025, 1, 8, 22)) == 8
+        assert not calendar.is_business_time(datetime(2025, 1, 8, 9))
+
+    def test_add_working_time_is_inverse_of_working_seconds(self):
+        calendar = BusinessCalendar(9, 17, holidays=["2025-01-06"])
+        # 30 minutes from Friday 16:45 skips the weekend and the Monday holiday
+        assert calendar.add_working_time(self.FRIDAY.replace(hour=16, minute=45), timedelta(minutes=30)) == \
+            datetime(2025, 1, 7, 9, 15)
+        assert calendar.add_working_time(self.FRIDAY.replace(hour=20), timedelta(0)) == datetime(2025, 1, 7, 9)
+
+        rng = random.Random(7)
+        starts = [self.FRIDAY + timedelta(seconds=rng.randrange(0, 86400 * 60)) for _ in range(200)]
+        delays = [rng.randrange(1, 86400 * 3) for _ in starts]
+        many = calendar.add_working_time_many(starts, delays).astype(datetime).tolist()
+        for start, delay, vectorized in zip(starts, delays, many):
+            due = calendar.add_working_time(start, timedelta(seconds=delay))
+            assert due == vectorized
+            assert calendar.working_seconds(start, due) == pytest.approx(delay)
+
+class TestPIIMasker:
+    TEXT = (
+        "Email jane.doe+sales@example.co.uk or call +1 (415) 555-0134. "
+        "Visit 221 Baker Street, pay with 4111-1111-1111-1111; order 1234567890123456."
+    )
+
+    def test_masks_each_kind_in_one_pass(self):
+        masked = PIIMasker().mask(self.TEXT)
+        assert masked == (
+            "Email [EMAIL] or call [PHONE]. "
+            "Visit [ADDRESS], pay with [CARD]; order 1234567890123456."
+        )
+        assert PIIMasker({'email': '<email>'}).mask("x@y.io").startswith("<email>")
+
+    def test_stream_matches_whole_text(self):
+        rng = random.Random(11)
+        text = " ".join(rng.choice([self.TEXT, "no pii here", "call 555.123.4567 now"]) for _ in range(300))
+        masker = PIIMasker()
+        for _ in range(10):
+            cuts = sorted(rng.sample(range(len(text)), rng.choice([3, 40, 400])))
+            chunks = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+            assert "".join(masker.mask_stream(chunks)) == masker.mask(text)
+
+    def test_mask_many_in_worker_processes(self):
+        texts = [self.TEXT, "reach me at 212-555-0199", ""]
+        masker = PIIMasker()
+        assert masker.mask_many(texts, workers=2, min_parallel_bytes=0) == [masker.mask(t) for t in texts]
+
+class TestContactNormalizer:
+    PHONES = ["(415) 555-0134", "+1 415.555.0134", None, "123-456", "555-0100", "212 555 0199"]
+    EMAILS = ["Jane@Example.com", "jane@example.com ", "bob@example.com", "not-an-email", "", "bob@example.com"]
+
+    def test_normalizes_columns_with_error_codes(self):
+        batch = ContactNormalizer(workers=1).normalize(self.PHONES, self.EMAILS)
+        assert batch.phones.tolist() == ["+14155550134", "+14155550134", "", "", "", "+12125550199"]
+        assert batch.phone_errors.tolist() == [
+            ContactError.OK, ContactError.OK, ContactError.MISSING,
+            ContactError.INVALID_NUMBER, ContactError.INVALID_NUMBER, ContactError.OK
+        ]
+        assert batch.emails.tolist()[:2] == ["jane@example.com", "jane@example.com"]
+        assert batch.email_errors.tolist()[3:5] == [ContactError.INVALID_FORMAT, ContactError.MISSING]
+        assert batch.duplicate_of.tolist() == [-1, 0, -1, -1, -1, 2]
+        assert batch.unique_mask.sum() == 4
+
+    def test_formatting_variants_share_one_parse(self, monkeypatch):
+        import src.utils.contact_normalizer as module
+        calls = []
+        real_parse = module.parse_phone
+        monkeypatch.setattr(module, "parse_phone", lambda raw, region="US": calls.append(raw) or real_parse(raw, region))
+        normalizer = module.ContactNormalizer(workers=1)
+        normalizer.normalize_phones(["(415) 555-0134", "415.555.0134", "415-555-0134"])
+        normalizer.normalize_phones(["415 555 0134"])
+        assert len(calls) == 1
+
+    def test_process_pool_matches_serial(self):
+        phones = [f"(212) 555-{i:04d}" for i in range(40)] + ["bogus"]
+        serial = ContactNormalizer(workers=1).normalize_phones(phones)
+        pooled = ContactNormalizer(workers=2, parallel_threshold=1).normalize_phones(phones)
+        assert serial[0].tolist() == pooled[0].tolist()
+        assert serial[1].tolist() == pooled[1].tolist()
+
+    def test_duplicates_link_through_either_field(self):
+        assert find_duplicates(["a", "b", "", "b"], ["x", "x", "y", "y"]).tolist() == [-1, 0, -1, 0]
@@ -0,0 +1,82 @@
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+from collections import deque
+
+class AhoCorasick:
+    """Compiled multi-pattern matcher (Aho-Corasick automaton)
+
+    All patterns are matched in a single pass over the text, independent of
+    how many patterns there are. Patterns are matched case-insensitively and,
+    by default, only on word boundaries.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, Any]], whole_words: bool = True):
+        """Build the automaton
+
+        Args:
+            patterns: (phrase, payload) pairs; the payload is returned on match
+            whole_words: Only report matches bounded by non-word characters
+        """
+        self.whole_words = whole_words
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any]]] = [[]]
+
+        for phrase, payload in patterns:
+            phrase = phrase.lower()
+            if not phrase:
+                continue
+            state = 0
+            for char in phrase:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((len(phrase), payload))
+
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = candidate if candidate != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yield (start, end, payload) for every pattern occurrence"""
+        text = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        length = len(text)
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            end = index + 1
+            for size, payload in output[state]:
+                start = end - size
+                if self.whole_words and (
+                    (start > 0 and text[start - 1].isalnum())
+                    or (end < length and text[end].isalnum())
+                ):
+                    continue
+                yield start, end, payload
+
+    def count(self, text: str) -> Dict[Any, int]:
+        """Count matches per payload"""
+        counts: Dict[Any, int] = {}
+        for _, _, payload in self.iter_matches(text):
+            counts[payload] = counts.get(payload, 0) + 1
+        return counts
@@ -0,0 +1,274 @@
+from typing import Any, Iterable, List, Optional, Sequence, Union
+from datetime import date, datetime, timedelta, timezone as dt_timezone, tzinfo
+import bisect
+import numpy as np
+
+# A Monday; day indices are counted from here so weekday == index % 7
+_EPOCH = date(2000, 1, 3)
+_EPOCH_NP = np.datetime64('2000-01-03', 'D')
+
+TimezoneLike = Union[None, str, tzinfo]
+
+
+def _resolve_timezone(timezone: TimezoneLike) -> Optional[tzinfo]:
+    if timezone is None or isinstance(timezone, tzinfo):
+        return timezone
+    from zoneinfo import ZoneInfo
+    return ZoneInfo(timezone)
+
+
+class BusinessCalendar:
+    """Closed-form business-hours arithmetic
+
+    Working time between two timestamps is W(end) - W(start), where W(t)
+    counts working seconds from a fixed epoch: whole weeks times working
+    days per week, a weekday prefix table for the partial week, a bisect
+    over the holiday table, and the clamped seconds of t's own day. The
+    cost is O(1) plus O(log holidays), whatever the span.
+
+    Hours are wall-clock hours in the calendar's timezone. When one is set,
+    timestamps are converted to it, naive ones being read as UTC like the
+    rest of the codebase; without one, timestamps are used as given.
+    """
+
+    def __init__(
+        self,
+        start_hour: float = 9,
+        end_hour: float = 17,
+        weekend_excluded: bool = True,
+        holidays: Iterable[Union[date, str]] = (),
+        timezone: TimezoneLike = None
+    ):
+        """Define the working schedule
+
+        Args:
+            start_hour: Local start of the working day (fractions allowed)
+            end_hour: Local end of the working day
+            weekend_excluded: Treat Saturday and Sunday as non-working
+            holidays: Non-working dates (date objects or ISO strings)
+            timezone: IANA name or tzinfo of the schedule
+        """
+        if not 0 <= start_hour <= end_hour <= 24:
+            raise ValueError("Business hours must satisfy 0 <= start_hour <= end_hour <= 24")
+        self.day_start = int(round(start_hour * 3600))
+        self.day_end = int(round(end_hour * 3600))
+        self.day_length = self.day_end - self.day_start
+        self.weekend_excluded = weekend_excluded
+        self.timezone = _resolve_timezone(timezone)
+
+        self._workdays = [True] * 5 + [not weekend_excluded] * 2
+        # _week_prefix[k]: working days among the first k days of a week
+        self._week_prefix = [0]
+        for working in self._workdays:
+            self._week_prefix.append(self._week_prefix[-1] + working)
+        self._week_prefix_np = np.array(self._week_prefix, dtype=np.int64)
+        # _working_weekdays[r]: weekday of the r-th working day of a week
+        self._working_weekdays = [day for day, working in enumerate(self._workdays) if working]
+        self._working_weekdays_np = np.array(self._working_weekdays, dtype=np.int64)
+
+        days = {self._day_index(date.fromisoformat(h) if isinstance(h, str) else h) for h in holidays}
+        # Only holidays on working days remove working time
+        self._holidays: List[int] = sorted(day for day in days if self._workdays[day % 7])
+        self._holidays_np = np.array(self._holidays, dtype=np.int64)
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "BusinessCalendar":
+        return cls(
+            start_hour=settings.BUSINESS_START_HOUR,
+            end_hour=settings.BUSINESS_END_HOUR,
+            weekend_excluded=settings.WEEKEND_EXCLUDED,
+            holidays=settings.BUSINESS_HOLIDAYS,
+            timezone=settings.BUSINESS_TIMEZONE
+        )
+
+    @staticmethod
+    def _day_index(day: date) -> int:
+        return (day - _EPOCH).days
+
+    def _local(self, timestamp: datetime) -> datetime:
+        if self.timezone is None:
+            return timestamp.replace(tzinfo=None)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=dt_timezone.utc)
+        return timestamp.astimezone(self.timezone).replace(tzinfo=None)
+
+    def _working_days_before(self, day: int) -> int:
+        weeks, rest = divmod(day, 7)
+        return weeks * self._week_prefix[7] + self._week_prefix[rest] - bisect.bisect_left(self._holidays, day)
+
+    def is_working_day(self, day: Union[date, datetime]) -> bool:
+        if isinstance(day, datetime):
+            day = self._local(day).date()
+        index = self._day_index(day)
+        if not self._workdays[index % 7]:
+            return False
+        position = bisect.bisect_left(self._holidays, index)
+        return not (position < len(self._holidays) and self._holidays[position] == index)
+
+    def is_business_time(self, timestamp: datetime) -> bool:
+        local = self._local(timestamp)
+        seconds = local.hour * 3600 + local.minute * 60 + local.second
+        return self.is_working_day(local.date()) and self.day_start <= seconds < self.day_end
+
+    def _cumulative(self, timestamp: datetime) -> float:
+        """Working seconds from the epoch up to timestamp"""
+        local = self._local(timestamp)
+        day = self._day_index(local.date())
+        total = self._working_days_before(day) * self.day_length
+        if self.is_working_day(local.date()):
+            seconds = local.hour * 3600 + local.minute * 60 + local.second + local.microsecond / 1e6
+            total += min(max(seconds, self.day_start), self.day_end) - self.day_start
+        return total
+
+    def working_seconds(self, start: datetime, end: datetime) -> float:
+        """Working seconds between start and end (0 when end precedes start)"""
+        if end <= start:
+            return 0.0
+        return max(self._cumulative(end) - self._cumulative(start), 0.0)
+
+    def working_hours(self, start: datetime, end: datetime) -> float:
+        return self.working_seconds(start, end) / 3600
+
+    def _nth_working_day(self, n: int) -> int:
+        """Day index of the working day with n working days before it"""
+        per_week = self._week_prefix[7]
+        candidate = n
+        while True:
+            weeks, rank = divmod(candidate, per_week)
+            day = weeks * 7 + self._working_weekdays[rank]
+            # Holidays before the day push it later by as many working days
+            shortfall = n - self._working_days_before(day)
+            if shortfall > 0:
+                candidate += shortfall
+            elif not self.is_working_day(_EPOCH + timedelta(days=day)):
+                candidate += 1
+            else:
+                return day
+
+    def _from_cumulative(self, total: float) -> datetime:
+        """Local time at which the epoch-relative working time reaches total"""
+        days, seconds = divmod(total, self.day_length)
+        day = self._nth_working_day(int(days))
+        return datetime.combine(_EPOCH + timedelta(days=day), datetime.min.time()) + \
+            timedelta(seconds=self.day_start + seconds)
+
+    def _to_caller_time(self, local: datetime, like: datetime) -> datetime:
+        if self.timezone is None:
+            return local.replace(tzinfo=like.tzinfo)
+        aware = local.replace(tzinfo=self.timezone)
+        if like.tzinfo is None:
+            return aware.astimezone(dt_timezone.utc).replace(tzinfo=None)
+        return aware.astimezone(like.tzinfo)
+
+    def add_working_time(self, start: datetime, delay: timedelta) -> datetime:
+        """Timestamp after ``delay`` of working time counted from start
+
+        A zero delay outside business hours lands on the next opening.
+        """
+        if not self.day_length:
+            raise ValueError("Calendar has no working hours")
+        total = self._cumulative(start) + max(delay.total_seconds(), 0.0)
+        return self._to_caller_time(self._from_cumulative(total), start)
+
+    def _cumulative_many(self, timestamps: np.ndarray) -> np.ndarray:
+        days = timestamps.astype('datetime64[D]')
+        index = (days - _EPOCH_NP).astype(np.int64)
+        weeks, rest = np.divmod(index, 7)
+        holidays_before = np.searchsorted(self._holidays_np, index, side='left')
+        working_days = weeks * self._week_prefix[7] + self._week_prefix_np[rest] - holidays_before
+
+        is_holiday = np.zeros(len(index), dtype=bool)
+        if len(self._holidays_np):
+            position = np.minimum(holidays_before, len(self._holidays_np) - 1)
+            is_holiday = self._holidays_np[position] == index
+        working_today = np.array(self._workdays)[rest] & ~is_holiday
+
+        seconds = (timestamps - days).astype('timedelta64[us]').astype(np.int64) / 1e6
+        partial = np.clip(seconds, self.day_start, self.day_end) - self.day_start
+        return working_days * self.day_length + np.where(working_today, partial, 0.0)
+
+    def working_seconds_many(
+        self,
+        starts: Union[Sequence[datetime], np.ndarray],
+        ends: Union[Sequence[datetime], np.ndarray]
+    ) -> np.ndarray:
+        """Vectorized working_seconds over aligned arrays of starts and ends
+
+        Inputs are read like scalar timestamps (datetime64 values as naive
+        datetimes). The arithmetic runs entirely in NumPy; only timezone
+        conversion, when a timezone is set, is done per element.
+        """
+        start_array = self._as_local_array(starts)
+        end_array = self._as_local_array(ends)
+        result = self._cumulative_many(end_array) - self._cumulative_many(start_array)
+        return np.where(end_array > start_array, np.maximum(result, 0.0), 0.0)
+
+    def working_hours_many(
+        self,
+        starts: Union[Sequence[datetime], np.ndarray],
+        ends: Union[Sequence[datetime], np.ndarray]
+    ) -> np.ndarray:
+        return self.working_seconds_many(starts, ends) / 3600
+
+    def working_offsets(self, timestamps: Union[Sequence[datetime], np.ndarray]) -> np.ndarray:
+        """Working seconds from the calendar epoch to each timestamp
+
+        Differences of offsets are working time, so batches can be shifted,
+        sorted and bucketed in working-time coordinates and mapped back with
+        at_working_offsets.
+        """
+        return self._cumulative_many(self._as_local_array(timestamps))
+
+    def at_working_offsets(self, offsets: Union[Sequence[float], np.ndarray]) -> np.ndarray:
+        """Inverse of working_offsets, as datetime64[us]
+
+        Results follow the input convention: local wall-clock time, or naive
+        UTC when the calendar has a timezone.
+        """
+        if not self.day_length:
+            raise ValueError("Calendar has no working hours")
+        days, seconds = np.divmod(np.asarray(offsets, dtype=np.float64), self.day_length)
+        target = days.astype(np.int64)
+
+        per_week = self._week_prefix[7]
+        candidate = target.copy()
+        while True:
+            weeks, rank = np.divmod(candidate, per_week)
+            day = weeks * 7 + self._working_weekdays_np[rank]
+            holidays_before = np.searchsorted(self._holidays_np, day, side='left')
+            shortfall = target - (weeks * per_week + rank - holidays_before)
+            on_holiday = np.zeros(len(day), dtype=bool)
+            if len(self._holidays_np):
+                position = np.minimum(holidays_before, len(self._holidays_np) - 1)
+                on_holiday = self._holidays_np[position] == day
+            step = np.where(shortfall > 0, shortfall, on_holiday.astype(np.int64))
+            if not step.any():
+                break
+            candidate += step
+
+        local = (
+            _EPOCH_NP + day.astype('timedelta64[D]')
+        ).astype('datetime64[us]') + np.round((self.day_start + seconds) * 1e6).astype('timedelta64[us]')
+        if self.timezone is None:
+            return local
+        return np.array(
+            [self._to_caller_time(value, value) for value in local.astype(datetime)],
+            dtype='datetime64[us]'
+        )
+
+    def add_working_time_many(
+        self,
+        starts: Union[Sequence[datetime], np.ndarray],
+        delays: Union[Sequence[float], np.ndarray]
+    ) -> np.ndarray:
+        """Vectorized add_working_time; delays are working seconds"""
+        offsets = self.working_offsets(starts) + np.maximum(np.asarray(delays, dtype=np.float64), 0.0)
+        return self.at_working_offsets(offsets)
+
+    def _as_local_array(self, values: Union[Sequence[datetime], np.ndarray]) -> np.ndarray:
+        if isinstance(values, np.ndarray) and np.issubdtype(values.dtype, np.datetime64):
+            values = values.astype('datetime64[us]')
+            if self.timezone is None:
+                return values
+            values = values.astype(datetime)
+        return np.array([self._local(value) for value in values], dtype='datetime64[us]')
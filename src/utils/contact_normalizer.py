@@ -0,0 +1,165 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from enum import IntEnum
+from functools import partial
+import re
+import numpy as np
+import phonenumbers
+from .validators import EMAIL_PATTERN
+
+_PHONE_PUNCTUATION = re.compile(r"[\s().\-/]")
+
+
+class ContactError(IntEnum):
+    """Per-field status codes in normalization results"""
+    OK = 0
+    MISSING = 1
+    INVALID_FORMAT = 2
+    INVALID_NUMBER = 3
+
+
+def parse_phone(raw: str, region: str = "US") -> Tuple[str, int]:
+    """E.164 form of a phone number and its ContactError code"""
+    try:
+        number = phonenumbers.parse(raw, region)
+    except phonenumbers.NumberParseException:
+        return "", ContactError.INVALID_FORMAT
+    if not phonenumbers.is_valid_number(number):
+        return "", ContactError.INVALID_NUMBER
+    return phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164), ContactError.OK
+
+
+def phone_cache_key(raw: str) -> str:
+    """Formatting-insensitive key: "(415) 555-0134" and "415.555.0134" share one parse"""
+    return _PHONE_PUNCTUATION.sub("", raw)
+
+
+@dataclass
+class ContactBatch:
+    """Column-oriented normalization result
+
+    Values are empty strings where the matching error code is not OK;
+    duplicate_of holds the index of the first lead sharing a normalized
+    phone or email, or -1.
+    """
+    phones: np.ndarray
+    phone_errors: np.ndarray
+    emails: np.ndarray
+    email_errors: np.ndarray
+    duplicate_of: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.duplicate_of)
+
+    @property
+    def unique_mask(self) -> np.ndarray:
+        return self.duplicate_of < 0
+
+
+class ContactNormalizer:
+    """Batch phone and email normalization for list imports
+
+    Phones are parsed once per distinct value (after stripping formatting)
+    and the results are kept across batches. When a batch brings many new
+    values, the phonenumbers parsing is spread over a process pool.
+    """
+
+    def __init__(
+        self,
+        region: str = "US",
+        workers: Optional[int] = None,
+        parallel_threshold: int = 5000,
+        max_cache_size: int = 500_000
+    ):
+        """Configure the normalizer
+
+        Args:
+            region: Default region for numbers without a country code
+            workers: Process pool size (None for CPU count, 1 to disable)
+            parallel_threshold: New distinct phones needed to use the pool
+            max_cache_size: Parsed phones kept before the cache is cleared
+        """
+        self.region = region
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
+        self.max_cache_size = max_cache_size
+        self._phone_cache: Dict[str, Tuple[str, int]] = {}
+
+    def _parse_new(self, keys: List[str]) -> List[Tuple[str, int]]:
+        parse = partial(parse_phone, region=self.region)
+        if self.workers == 1 or len(keys) < self.parallel_threshold:
+            return [parse(key) for key in keys]
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(parse, keys, chunksize=512))
+
+    def normalize_phones(self, raws: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """E.164 phones and ContactError codes for a column of raw values"""
+        keys = [phone_cache_key(raw) if raw else "" for raw in raws]
+        cache = self._phone_cache
+        new = list({key for key in keys if key and key not in cache})
+        if new:
+            if len(cache) + len(new) > self.max_cache_size:
+                cache.clear()
+            cache.update(zip(new, self._parse_new(new)))
+
+        missing = ("", ContactError.MISSING)
+        results = [cache[key] if key else missing for key in keys]
+        phones = np.array([phone for phone, _ in results], dtype='<U16')
+        errors = np.array([code for _, code in results], dtype=np.uint8)
+        return phones, errors
+
+    @staticmethod
+    def normalize_emails(raws: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Lower-cased emails and ContactError codes for a column of raw values"""
+        emails: List[str] = []
+        errors = np.empty(len(raws), dtype=np.uint8)
+        match = EMAIL_PATTERN.match
+        for index, raw in enumerate(raws):
+            email = raw.strip() if raw else ""
+            if not email:
+                code = ContactError.MISSING
+            elif match(email):
+                code = ContactError.OK
+            else:
+                code, email = ContactError.INVALID_FORMAT, ""
+            emails.append(email.lower())
+            errors[index] = code
+        return np.array(emails, dtype=str), errors
+
+    def normalize(
+        self,
+        phones: Sequence[Optional[str]],
+        emails: Sequence[Optional[str]]
+    ) -> ContactBatch:
+        """Normalize aligned phone and email columns and flag duplicates"""
+        if len(phones) != len(emails):
+            raise ValueError("Phone and email columns must have the same length")
+        phone_values, phone_errors = self.normalize_phones(phones)
+        email_values, email_errors = self.normalize_emails(emails)
+        return ContactBatch(
+            phones=phone_values,
+            phone_errors=phone_errors,
+            emails=email_values,
+            email_errors=email_errors,
+            duplicate_of=find_duplicates(phone_values.tolist(), email_values.tolist())
+        )
+
+
+def find_duplicates(phones: Sequence[str], emails: Sequence[str]) -> np.ndarray:
+    """Index of the first earlier lead sharing a phone or email, else -1
+
+    Empty values never match. A lead matching two earlier groups is
+    attributed to the older one.
+    """
+    first_seen: Dict[Tuple[int, str], int] = {}
+    duplicate_of = np.full(len(phones), -1, dtype=np.int64)
+    for index, keys in enumerate(zip(phones, emails)):
+        keyed = [(field, value) for field, value in enumerate(keys) if value]
+        owners = [first_seen[key] for key in keyed if key in first_seen]
+        owner = min(owners) if owners else index
+        if owners:
+            duplicate_of[index] = owner
+        for key in keyed:
+            first_seen.setdefault(key, owner)
+    return duplicate_of
@@ -0,0 +1,169 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import re
+
+_LOCAL_CHARS = r"a-zA-Z0-9._%+-"
+
+# Every detectable value contains '@' or a digit, so the scanner only looks
+# at those characters and runs the detectors anchored there
+_TRIGGER = re.compile(r"[@\d]")
+_DIGIT_RUN = re.compile(r"\d+")
+_EMAIL_LOCAL = re.compile(rf"[{_LOCAL_CHARS}]{{1,64}}\Z")
+_EMAIL_DOMAIN = re.compile(r"@[a-zA-Z0-9.-]{1,190}\.[a-zA-Z]{2,24}")
+_NUMBER = re.compile(
+    r"(?<!\w)(?:"
+    r"(?P<card>(?:\d[ -]?){12,18}\d(?!\d))"
+    r"|(?P<phone>(?:\+?1[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}(?!\d))"
+    r"|(?P<address>\d{1,6}\s{1,3}(?:[A-Za-z0-9.'-]{1,30}\s{1,3}){0,4}?"
+    r"(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr|Court|Ct"
+    r"|Way|Place|Pl|Parkway|Pkwy|Highway|Hwy)\b\.?)"
+    r")"
+)
+_PHONE = re.compile(r"(?:\+?1[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}(?!\d)")
+
+# Longest possible match, and how far before its trigger a match may start
+_MAX_MATCH = 512
+_LOOKBACK = 65
+
+DEFAULT_LABELS = {
+    'email': '[EMAIL]',
+    'phone': '[PHONE]',
+    'address': '[ADDRESS]',
+    'card': '[CARD]'
+}
+
+
+def luhn_valid(digits: str) -> bool:
+    total = 0
+    for index, char in enumerate(reversed(digits)):
+        value = ord(char) - 48
+        if index % 2:
+            value = value * 2 - 9 if value > 4 else value * 2
+        total += value
+    return total % 10 == 0
+
+
+class PIIMasker:
+    """Single-pass masking of emails, phones, street addresses and cards
+
+    Instead of one regex pass per kind, the text is scanned once for the
+    characters every value must contain ('@' and digits) and the detectors
+    run anchored at those positions, so plain prose is skipped at C speed.
+    Card candidates must pass the Luhn check; other long digit runs are
+    still checked for a phone number.
+    """
+
+    def __init__(self, labels: Optional[Dict[str, str]] = None):
+        self.labels = {**DEFAULT_LABELS, **(labels or {})}
+
+    def _scan(self, text: str, start: int, stop: int) -> Tuple[List[str], int]:
+        """Mask values triggered in text[start:stop]
+
+        Returns the output pieces and the position up to which text has
+        been emitted; the caller appends the rest.
+        """
+        pieces: List[str] = []
+        emitted = pos = start
+        labels = self.labels
+        while True:
+            trigger = _TRIGGER.search(text, pos, stop)
+            if trigger is None:
+                return pieces, emitted
+            index = trigger.start()
+
+            if text[index] == '@':
+                domain = _EMAIL_DOMAIN.match(text, index)
+                local = domain and _EMAIL_LOCAL.search(text, max(emitted, index - 64), index)
+                if local:
+                    pieces.append(text[emitted:local.start()])
+                    pieces.append(labels['email'])
+                    emitted = pos = domain.end()
+                else:
+                    pos = index + 1
+                continue
+
+            match = None
+            if index > emitted and text[index - 1] in '(+':
+                match = _NUMBER.match(text, index - 1)
+            match = match or _NUMBER.match(text, index)
+            kind = match and match.lastgroup
+            if kind == 'card' and not luhn_valid(re.sub(r"\D", "", match.group())):
+                match = _PHONE.match(text, match.start())
+                kind = 'phone' if match else None
+            if kind:
+                pieces.append(text[emitted:match.start()])
+                pieces.append(labels[kind])
+                emitted = pos = match.end()
+            else:
+                pos = _DIGIT_RUN.match(text, index).end()
+
+    def mask(self, text: str) -> str:
+        pieces, emitted = self._scan(text, 0, len(text))
+        if not pieces:
+            return text
+        pieces.append(text[emitted:])
+        return "".join(pieces)
+
+    def mask_stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Mask a chunked transcript without joining it
+
+        Yields masked text as soon as it is final. A short tail of each
+        chunk is held back until the next one arrives, so values split
+        across chunks are still masked; the output joins to mask(text).
+        """
+        carry = ""
+        # carry[:context] is a character already emitted, kept for lookbehinds
+        context = 0
+        for chunk in chunks:
+            buffer = carry + chunk
+            safe = len(buffer) - _MAX_MATCH
+            if safe <= context:
+                carry = buffer
+                continue
+            pieces, emitted = self._scan(buffer, context, safe)
+            cut = max(emitted, safe - _LOOKBACK)
+            pieces.append(buffer[emitted:cut])
+            output = "".join(pieces)
+            if output:
+                yield output
+            if cut:
+                carry, context = buffer[cut - 1:], 1
+            else:
+                carry = buffer
+        pieces, emitted = self._scan(carry, context, len(carry))
+        pieces.append(carry[emitted:])
+        output = "".join(pieces)
+        if output:
+            yield output
+
+    def mask_many(
+        self,
+        texts: Sequence[str],
+        workers: Optional[int] = None,
+        min_parallel_bytes: int = 4 * 1024 * 1024,
+        chunksize: int = 64
+    ) -> List[str]:
+        """Mask a batch of texts, across worker processes for large jobs
+
+        Batches smaller than ``min_parallel_bytes`` are masked in-process,
+        where pickling texts to workers would cost more than it saves.
+        """
+        if workers == 1 or sum(len(text) for text in texts) < min_parallel_bytes:
+            return [self.mask(text) for text in texts]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self.labels,)) as pool:
+            return list(pool.map(_mask_in_worker, texts, chunksize=chunksize))
+
+
+_worker_masker: Optional[PIIMasker] = None
+
+
+def _init_worker(labels: Dict[str, str]) -> None:
+    global _worker_masker
+    _worker_masker = PIIMasker(labels)
+
+
+def _mask_in_worker(text: str) -> str:
+    return _worker_masker.mask(text)
+
+
+default_masker = PIIMasker()
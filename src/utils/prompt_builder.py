@@ -0,0 +1,200 @@
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from functools import lru_cache
+import logging
+import math
+import re
+
+logger = logging.getLogger(__name__)
+
+_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str) -> Any:
+    """tiktoken encoding for a model, or None when it cannot be loaded
+
+    tiktoken downloads its BPE files on first use, so an offline host gets
+    None here too. The result is cached either way, so a failed load is
+    attempted and logged once per model.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Cannot load tiktoken encoding for {model}, approximating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """Count prompt tokens locally
+
+    Uses tiktoken when its encoding loads; otherwise approximates BPE tokenization
+    as one token per punctuation mark and per four characters of a word.
+    """
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return sum(math.ceil(len(piece) / 4) for piece in _PIECE_PATTERN.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "gpt-4") -> str:
+    """Cut text to a token budget, preferring a sentence boundary"""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    kept: List[str] = []
+    used = 0
+    for sentence in _SENTENCE_END.split(text):
+        size = count_tokens(sentence, model) + 1
+        if used + size > max_tokens:
+            break
+        kept.append(sentence)
+        used += size
+    if kept:
+        return " ".join(kept)
+    # A single long sentence: fall back to whole words
+    words = text.split()
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(" ".join(words[:middle]), model) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return " ".join(words[:low])
+
+
+def _shingles(text: str, size: int = 5) -> set:
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def dedupe_passages(passages: Sequence[str], threshold: float = 0.6) -> List[int]:
+    """Indices of passages to keep, dropping near-duplicates of earlier ones
+
+    A passage is dropped when most of its word 5-grams (``threshold`` of
+    them) already appear in a kept passage, which catches both copies and
+    passages contained in another.
+    """
+    kept: List[int] = []
+    kept_shingles: List[set] = []
+    for index, passage in enumerate(passages):
+        shingles = _shingles(passage)
+        if not shingles:
+            continue
+        if any(len(shingles & other) / len(shingles) >= threshold for other in kept_shingles):
+            continue
+        kept.append(index)
+        kept_shingles.append(shingles)
+    return kept
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    if isinstance(value, (list, tuple, set)):
+        if all(isinstance(item, (int, float, str)) for item in value) and len(value) <= 5:
+            return ", ".join(_format_value(item) for item in value)
+        return f"[{len(value)} items]"
+    return str(value)
+
+
+def metrics_table(metrics: Dict[str, Any], max_rows: int = 60) -> str:
+    """Flatten a (nested) metrics dict into a compact "key | value" table"""
+    rows: List[Tuple[str, str]] = []
+
+    def walk(prefix: str, value: Any) -> None:
+        if isinstance(value, dict):
+            for key, item in value.items():
+                walk(f"{prefix}.{key}" if prefix else str(key), item)
+        elif value is not None and value != "":
+            rows.append((prefix, _format_value(value)))
+
+    walk("", metrics or {})
+    lines = [f"{key} | {value}" for key, value in rows[:max_rows]]
+    if len(rows) > max_rows:
+        lines.append(f"... {len(rows) - max_rows} more rows omitted")
+    return "\n".join(lines)
+
+
+class PromptBuilder:
+    """Assemble a prompt within a token budget
+
+    Fixed sections (instructions, the question) are always kept. Retrieved
+    passages are deduplicated, ranked by score and added until the budget
+    is spent; the last passage that does not fit is truncated.
+    """
+
+    def __init__(self, max_tokens: int = 3000, model: str = "gpt-4", name: str = "prompt"):
+        self.max_tokens = max_tokens
+        self.model = model
+        self.name = name
+        self._sections: List[Tuple[str, Any, bool]] = []
+
+    def add_section(self, text: str, title: Optional[str] = None) -> "PromptBuilder":
+        self._sections.append((title or "", text.strip(), False))
+        return self
+
+    def add_passages(
+        self,
+        passages: Sequence[str],
+        scores: Optional[Sequence[float]] = None,
+        title: str = "Retrieved knowledge"
+    ) -> "PromptBuilder":
+        """Add retrieval results; without scores, earlier passages rank higher"""
+        keep = dedupe_passages(passages)
+        if scores is None:
+            scores = [-index for index in range(len(passages))]
+        ranked = sorted(keep, key=lambda index: -scores[index])
+        self._sections.append((title, [passages[index] for index in ranked], True))
+        return self
+
+    def build(self) -> str:
+        fixed = sum(
+            count_tokens(self._render(title, text), self.model)
+            for title, text, flexible in self._sections if not flexible
+        )
+        remaining = max(self.max_tokens - fixed, 0)
+
+        parts = []
+        for title, text, flexible in self._sections:
+            if flexible:
+                budget = remaining - count_tokens(self._render(title, ""), self.model)
+                text = self._fit_passages(text, budget)
+                remaining -= count_tokens(self._render(title, text), self.model)
+            if text:
+                parts.append(self._render(title, text))
+        prompt = "\n\n".join(parts)
+        logger.info(f"Built {self.name} with {count_tokens(prompt, self.model)} prompt tokens")
+        return prompt
+
+    def _fit_passages(self, passages: List[str], budget: int) -> str:
+        lines: List[str] = []
+        used = 0
+        for passage in passages:
+            line = "- " + " ".join(passage.split())
+            size = count_tokens(line, self.model) + 1
+            if used + size > budget:
+                truncated = truncate_to_tokens(line, budget - used - 1, self.model)
+                # Only keep a truncated passage if a meaningful part survives
+                if count_tokens(truncated, self.model) >= 20:
+                    lines.append(truncated)
+                break
+            lines.append(line)
+            used += size
+        return "\n".join(lines)
+
+    @staticmethod
+    def _render(title: str, text: str) -> str:
+        return f"{title}:\n{text}" if title else text
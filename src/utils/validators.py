@@ -4,6 +4,8 @@ from datetime import datetime
 from pydantic import BaseModel, ValidationError, validator
 import phonenumbers
 
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 class ValidationResult(BaseModel):
     is_valid: bool
     errors: List[str] = []
@@ -20,8 +22,7 @@ def validate_phone_number(phone: str) -> ValidationResult:
         return ValidationResult(is_valid=False, errors=[str(e)])
 
 def validate_email(email: str) -> ValidationResult:
-    email_regex = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
-    is_valid = bool(email_regex.match(email))
+    is_valid = bool(EMAIL_PATTERN.match(email))
     return ValidationResult(
         is_valid=is_valid,
         errors=[] if is_valid else ["Invalid email format"]
@@ -1,30 +1,45 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, TYPE_CHECKING
 from datetime import datetime
-from ..agents.call_queue_agent import CallQueueAgent
-from ..agents.knowledge_management_agent import KnowledgeManagementAgent
-from ..models.base import AgentContext, BaseResponse
+from models.base import AgentContext, BaseResponse
+from services.factory import ServiceFactory
+from services.rate_limiter import Priority, rate_limit_scope
+
+if TYPE_CHECKING:
+    from agents.call_queue_agent import CallQueueAgent
+    from agents.knowledge_management_agent import KnowledgeManagementAgent
 
 class CallQueueWorkflow:
-    def __init__(self):
-        self.queue_agent = CallQueueAgent()
-        self.knowledge_agent = KnowledgeManagementAgent()
+    @property
+    def queue_agent(self) -> "CallQueueAgent":
+        """Call queue agent, built on first use and shared per process"""
+        from agents.call_queue_agent import CallQueueAgent
+        return ServiceFactory.get_agent(CallQueueAgent)
+
+    @property
+    def knowledge_agent(self) -> "KnowledgeManagementAgent":
+        """Knowledge agent, built on first use and shared per process"""
+        from agents.knowledge_management_agent import KnowledgeManagementAgent
+        return ServiceFactory.get_agent(KnowledgeManagementAgent)
 
     async def get_next_call(
         self,
         agent_id: str,
         context: AgentContext
     ) -> BaseResponse:
-        # Get next lead from queue
-        queue_response = await self.queue_agent.get_next_lead(agent_id)
-        if not queue_response.success or not queue_response.data:
-            return queue_response
-
-        # Get relevant knowledge for the lead
-        lead_data = queue_response.data
-        knowledge_response = await self.knowledge_agent.query(
-            f"key information about {lead_data.get('product_interest')}",
-            context
-        )
+        # An agent is waiting on this call: its upstream requests take the live lane
+        tenant = (context.metadata or {}).get('tenant_id')
+        with rate_limit_scope(Priority.LIVE, tenant=tenant):
+            # Get next lead from queue
+            queue_response = await self.queue_agent.get_next_lead(agent_id)
+            if not queue_response.success or not queue_response.data:
+                return queue_response
+
+            # Get relevant knowledge for the lead
+            lead_data = queue_response.data
+            knowledge_response = await self.knowledge_agent.query(
+                f"key information about {lead_data.get('product_interest')}",
+                context
+            )
         
         if knowledge_response.success:
             queue_response.data['knowledge_base'] = knowledge_response.data
@@ -43,7 +58,7 @@ class CallQueueWorkflow:
     async def get_queue_status(
         self,
         agent_id: Optional[str] = None,
-        context: AgentContext
+        context: Optional[AgentContext] = None
     ) -> BaseResponse:
         # Get queue metrics
         return await self.queue_agent.get_queue_status(agent_id, context)
\ No newline at end of file
@@ -1,10 +1,16 @@
-from typing import Dict, Any, List
-from ..agents.knowledge_management_agent import KnowledgeManagementAgent
-from ..models.base import AgentContext, BaseResponse, KnowledgeItem
+from typing import Dict, Any, List, TYPE_CHECKING
+from models.base import AgentContext, BaseResponse, KnowledgeItem
+from services.factory import ServiceFactory
+
+if TYPE_CHECKING:
+    from agents.knowledge_management_agent import KnowledgeManagementAgent
 
 class KnowledgeManagementWorkflow:
-    def __init__(self):
-        self.knowledge_agent = KnowledgeManagementAgent()
+    @property
+    def knowledge_agent(self) -> "KnowledgeManagementAgent":
+        """Knowledge agent, built on first use and shared per process"""
+        from agents.knowledge_management_agent import KnowledgeManagementAgent
+        return ServiceFactory.get_agent(KnowledgeManagementAgent)
 
     async def process_query(
         self,
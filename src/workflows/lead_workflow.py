@@ -1,15 +1,31 @@
-from typing import Dict, Any
+from typing import Dict, Any, TYPE_CHECKING
 from datetime import datetime
-from ..agents.lead_management_agent import LeadManagementAgent
-from ..agents.knowledge_management_agent import KnowledgeManagementAgent
-from ..agents.sales_intelligence_agent import SalesIntelligenceAgent
-from ..models.base import AgentContext, BaseResponse
+from models.base import AgentContext, BaseResponse
+from services.factory import ServiceFactory
+
+if TYPE_CHECKING:
+    from agents.lead_management_agent import LeadManagementAgent
+    from agents.knowledge_management_agent import KnowledgeManagementAgent
+    from agents.sales_intelligence_agent import SalesIntelligenceAgent
 
 class LeadWorkflow:
-    def __init__(self):
-        self.lead_agent = LeadManagementAgent()
-        self.knowledge_agent = KnowledgeManagementAgent()
-        self.sales_intelligence = SalesIntelligenceAgent()
+    @property
+    def lead_agent(self) -> "LeadManagementAgent":
+        """Lead agent, built on first use and shared per process"""
+        from agents.lead_management_agent import LeadManagementAgent
+        return ServiceFactory.get_agent(LeadManagementAgent)
+
+    @property
+    def knowledge_agent(self) -> "KnowledgeManagementAgent":
+        """Knowledge agent, built on first use and shared per process"""
+        from agents.knowledge_management_agent import KnowledgeManagementAgent
+        return ServiceFactory.get_agent(KnowledgeManagementAgent)
+
+    @property
+    def sales_intelligence(self) -> "SalesIntelligenceAgent":
+        """Sales intelligence agent, built on first use and shared per process"""
+        from agents.sales_intelligence_agent import SalesIntelligenceAgent
+        return ServiceFactory.get_agent(SalesIntelligenceAgent)
 
     async def process_new_lead(
         self,
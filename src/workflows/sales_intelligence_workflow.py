@@ -1,10 +1,16 @@
-from typing import Dict, Any, Optional
-from ..agents.sales_intelligence_agent import SalesIntelligenceAgent
-from ..models.base import AgentContext, BaseResponse
+from typing import Dict, Any, Optional, TYPE_CHECKING
+from models.base import AgentContext, BaseResponse
+from services.factory import ServiceFactory
+
+if TYPE_CHECKING:
+    from agents.sales_intelligence_agent import SalesIntelligenceAgent
 
 class SalesIntelligenceWorkflow:
-    def __init__(self):
-        self.sales_intelligence = SalesIntelligenceAgent()
+    @property
+    def sales_intelligence(self) -> "SalesIntelligenceAgent":
+        """Sales intelligence agent, built on first use and shared per process"""
+        from agents.sales_intelligence_agent import SalesIntelligenceAgent
+        return ServiceFactory.get_agent(SalesIntelligenceAgent)
 
     async def get_lead_analysis(
         self,
@@ -17,7 +23,7 @@ class SalesIntelligenceWorkflow:
         self,
         timeframe: str = "7d",
         agent_id: Optional[str] = None,
-        context: AgentContext
+        context: Optional[AgentContext] = None
     ) -> BaseResponse:
         return await self.sales_intelligence.get_sales_performance(timeframe, context)
 